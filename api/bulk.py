@@ -0,0 +1,266 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers, status
+
+from api.serializers import DevSessionBulkItemSerializer, ResourceLinkBulkItemSerializer, TaskBulkItemSerializer
+from core.helper import TeamPermissionService
+from core.models import DevSession, ResourceLink, Task, TeamMembership
+from core.services import SessionService
+
+MAX_ITEMS = 1000
+
+RESULT_CREATED = 'created'
+RESULT_UPDATED = 'updated'
+RESULT_ERROR = 'error'
+
+
+def bulk_items(data) -> list:
+    """The items of a bulk payload, sent either as a bare list or as ``{"items": [...]}``."""
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise serializers.ValidationError({'items': ['Expected a non-empty list.']})
+    if len(items) > MAX_ITEMS:
+        raise serializers.ValidationError({'items': [f'At most {MAX_ITEMS} items per request.']})
+    return items
+
+
+class BulkUpsert:
+    """
+    Create or update many objects in one request and one transaction.
+
+    Each item is validated on its own by ``item_serializer_class`` with no
+    database lookups. ``prepare`` then checks every item against the
+    database with a few batched queries and turns the valid ones into
+    unsaved or updated instances, which ``write`` saves at once. Invalid
+    items are reported by index and skipped, so one bad item does not fail
+    the rest.
+    """
+    item_serializer_class: type[serializers.Serializer]
+
+    def __init__(self, request):
+        self.request = request
+        self.user = request.user
+
+    def is_partial(self, item) -> bool:
+        """Updates may send only the fields they change."""
+        return isinstance(item, dict) and item.get('id') is not None
+
+    def prepare(self, valid: dict[int, dict]) -> tuple[dict[int, object], dict[int, dict]]:
+        """Instances to save and errors, both keyed by item index."""
+        raise NotImplementedError
+
+    def write(self, created: list, updated: list, fields: set[str]) -> None:
+        raise NotImplementedError
+
+    def run(self, data) -> tuple[dict, int]:
+        items = bulk_items(data)
+        results = [{'index': index, 'status': RESULT_ERROR} for index in range(len(items))]
+
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = self.item_serializer_class(
+                data=item, partial=self.is_partial(item), context={'request': self.request},
+            )
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index]['errors'] = serializer.errors
+
+        instances, errors = self.prepare(valid)
+        for index, item_errors in errors.items():
+            results[index]['errors'] = item_errors
+
+        created = [obj for obj in instances.values() if obj.pk is None]
+        updated = [obj for obj in instances.values() if obj.pk is not None]
+        fields = {name for index in instances for name in valid[index] if name != 'id'}
+        outcome = {index: RESULT_CREATED if obj.pk is None else RESULT_UPDATED for index, obj in instances.items()}
+        with transaction.atomic():
+            self.write(created, updated, fields)
+
+        for index, obj in instances.items():
+            results[index].update(status=outcome[index], id=obj.pk)
+
+        counts = {key: 0 for key in (RESULT_CREATED, RESULT_UPDATED, RESULT_ERROR)}
+        for result in results:
+            counts[result['status']] += 1
+
+        if not counts[RESULT_ERROR]:
+            code = status.HTTP_200_OK
+        elif counts[RESULT_ERROR] < len(items):
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return {**counts, 'results': results}, code
+
+    @staticmethod
+    def duplicate_errors(valid: dict[int, dict], key, message: str) -> dict[int, dict]:
+        """Errors for every item whose ``key(item)`` repeats an earlier item's."""
+        seen, errors = set(), {}
+        for index, item in valid.items():
+            value = key(item)
+            if value is None:
+                continue
+            if value in seen:
+                errors[index] = {'non_field_errors': [message]}
+            seen.add(value)
+        return errors
+
+
+class TaskBulkUpsert(BulkUpsert):
+    """
+    Tasks keyed on ``external_source`` + ``external_id``.
+
+    Items with a known key update that task, all others create one. A task
+    created concurrently with the same key is updated rather than failing
+    the batch.
+    """
+
+    item_serializer_class = TaskBulkItemSerializer
+
+    def is_partial(self, item) -> bool:
+        return False
+
+    @staticmethod
+    def key(item: dict):
+        if not item.get('external_id'):
+            return None
+        return item.get('external_source', Task.SOURCE_MANUAL), item['external_id']
+
+    def prepare(self, valid):
+        errors = self.duplicate_errors(valid, self.key, 'Duplicate external_source and external_id in this request.')
+
+        teams = {item['team'] for item in valid.values() if item.get('team') is not None}
+        if teams:
+            allowed = TeamPermissionService.team_ids(self.user, TeamMembership.ROLE_MEMBER)
+            for index, item in valid.items():
+                if item.get('team') is not None and item['team'] not in allowed:
+                    errors.setdefault(index, {})['team'] = ['Invalid team.']
+
+        keys = [self.key(item) for index, item in valid.items() if index not in errors and self.key(item)]
+        existing = {}
+        if keys:
+            by_source: dict[str, list[str]] = {}
+            for source, external_id in keys:
+                by_source.setdefault(source, []).append(external_id)
+            lookup = Q()
+            for source, external_ids in by_source.items():
+                lookup |= Q(external_source=source, external_id__in=external_ids)
+            existing = {(task.external_source, task.external_id): task for task in Task.objects.filter(lookup)}
+
+        instances = {}
+        for index, item in valid.items():
+            if index in errors:
+                continue
+            values = {('team_id' if name == 'team' else name): value for name, value in item.items()}
+            task = existing.get(self.key(item)) or Task()
+            for name, value in values.items():
+                setattr(task, name, value)
+            instances[index] = task
+        return instances, errors
+
+    def write(self, created, updated, fields):
+        columns = sorted(fields | {'updated_at'})
+        if created:
+            Task.objects.bulk_create(
+                created,
+                update_conflicts=True,
+                unique_fields=['external_source', 'external_id'],
+                update_fields=columns,
+            )
+        if updated:
+            now = timezone.now()
+            for task in updated:
+                task.updated_at = now
+            Task.objects.bulk_update(updated, columns)
+
+
+class DevSessionBulkUpsert(BulkUpsert):
+    """
+    The user's sessions: items with an ``id`` update that session, all
+    others create one. Rollups and caches are kept in step by
+    ``SessionService.bulk_save``.
+    """
+
+    item_serializer_class = DevSessionBulkItemSerializer
+
+    def prepare(self, valid):
+        errors = self.duplicate_errors(valid, lambda item: item.get('id'), 'Duplicate id in this request.')
+        ids = {item['id'] for item in valid.values() if item.get('id') is not None}
+        owned = DevSession.objects.filter(user=self.user).in_bulk(ids) if ids else {}
+
+        instances = {}
+        for index, item in valid.items():
+            if index in errors:
+                continue
+            values = dict(item)
+            pk = values.pop('id', None)
+            if pk is None:
+                session = DevSession(user=self.user)
+            elif pk not in owned:
+                errors[index] = {'id': ['Invalid session.']}
+                continue
+            elif 'started_at' in values and values['started_at'] != owned[pk].started_at:
+                # Rollups are keyed on the start day.
+                errors[index] = {'started_at': ['Cannot be changed.']}
+                continue
+            else:
+                session = owned[pk]
+            for name, value in values.items():
+                setattr(session, name, value)
+            instances[index] = session
+        return instances, errors
+
+    def write(self, created, updated, fields):
+        SessionService.bulk_save(created, updated, sorted(fields))
+
+
+class ResourceLinkBulkUpsert(BulkUpsert):
+    """Links on the user's sessions: items with an ``id`` update that link, all others create one."""
+
+    item_serializer_class = ResourceLinkBulkItemSerializer
+
+    def prepare(self, valid):
+        errors = self.duplicate_errors(valid, lambda item: item.get('id'), 'Duplicate id in this request.')
+        ids = {item['id'] for item in valid.values() if item.get('id') is not None}
+        links = ResourceLink.objects.filter(dev_session__user=self.user).in_bulk(ids) if ids else {}
+        session_ids = {item['dev_session'] for item in valid.values() if item.get('dev_session') is not None}
+        sessions = set(
+            DevSession.objects.filter(pk__in=session_ids, user=self.user).values_list('id', flat=True)
+        ) if session_ids else set()
+        task_ids = {item['task'] for item in valid.values() if item.get('task') is not None}
+        tasks = set(Task.objects.filter(pk__in=task_ids).values_list('id', flat=True)) if task_ids else set()
+
+        instances = {}
+        for index, item in valid.items():
+            if index in errors:
+                continue
+            values = dict(item)
+            pk = values.pop('id', None)
+            item_errors = {}
+            if pk is not None and pk not in links:
+                item_errors['id'] = ['Invalid resource link.']
+            if pk is None and values.get('dev_session') is None:
+                item_errors['dev_session'] = ['This field is required.']
+            elif 'dev_session' in values and values['dev_session'] not in sessions:
+                item_errors['dev_session'] = ['Invalid session.']
+            if values.get('task') is not None and values['task'] not in tasks:
+                item_errors['task'] = ['Invalid task.']
+            if item_errors:
+                errors[index] = item_errors
+                continue
+
+            link = links[pk] if pk is not None else ResourceLink()
+            for name, value in values.items():
+                setattr(link, f'{name}_id' if name in ('dev_session', 'task') else name, value)
+            instances[index] = link
+        return instances, errors
+
+    def write(self, created, updated, fields):
+        if created:
+            ResourceLink.objects.bulk_create(created)
+        if updated:
+            now = timezone.now()
+            for link in updated:
+                link.updated_at = now
+            ResourceLink.objects.bulk_update(updated, sorted(fields | {'updated_at'}))
@@ -0,0 +1,209 @@
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from api.models import ApiRequestLog
+
+logger = logging.getLogger(__name__)
+
+POLICY_DROP_OLDEST = 'drop_oldest'
+POLICY_DROP_NEWEST = 'drop_newest'
+POLICY_BLOCK = 'block'
+
+OVERFLOW_POLICIES = {POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_BLOCK}
+
+
+@dataclass
+class BufferStats:
+    enqueued: int = 0
+    flushed: int = 0
+    dropped: int = 0
+    failed: int = 0
+    flushes: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def write_api_request_logs(records: list[dict], batch_size: int) -> None:
+    ApiRequestLog.objects.bulk_create(
+        [ApiRequestLog(**record) for record in records],
+        batch_size=batch_size,
+    )
+
+
+class ApiRequestLogBuffer:
+    """
+    Bounded in-process buffer for ApiRequestLog rows.
+
+    Records are plain dicts of model field values. In background mode a daemon
+    thread flushes them with ``bulk_create`` whenever ``batch_size`` records are
+    pending or ``flush_interval`` seconds have elapsed, so the request thread
+    only pays for a deque append. When the buffer is full the overflow policy
+    decides whether the oldest record is evicted, the new one is dropped, or the
+    caller blocks for up to ``block_timeout`` seconds waiting for a flush.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        overflow_policy: str = POLICY_DROP_OLDEST,
+        block_timeout: float = 0.05,
+        background: bool = True,
+        writer: Optional[Callable[[list[dict], int], None]] = None,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy: {overflow_policy}')
+
+        self.max_size = max(int(max_size), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.background = background
+        self.writer = writer or write_api_request_logs
+
+        self.stats = BufferStats()
+
+        self._records: deque[dict] = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._stopped = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._records)
+
+    def add(self, record: dict) -> bool:
+        with self._cond:
+            if len(self._records) >= self.max_size and not self._make_room():
+                self.stats.dropped += 1
+                return False
+
+            self._records.append(record)
+            self.stats.enqueued += 1
+            if len(self._records) >= self.batch_size:
+                self._cond.notify_all()
+
+        if self.background:
+            self._ensure_thread()
+        else:
+            self.flush()
+        return True
+
+    def _make_room(self) -> bool:
+        if self.overflow_policy == POLICY_DROP_OLDEST:
+            self._records.popleft()
+            self.stats.dropped += 1
+            return True
+
+        if self.overflow_policy == POLICY_BLOCK and self.background:
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: len(self._records) < self.max_size,
+                timeout=self.block_timeout,
+            )
+
+        return False
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._cond:
+                batch = list(self._records)
+                self._records.clear()
+                self._cond.notify_all()
+
+            if not batch:
+                return 0
+
+            try:
+                self.writer(batch, self.batch_size)
+            except Exception:
+                logger.exception('Failed to flush %d API request log records', len(batch))
+                with self._cond:
+                    self.stats.failed += len(batch)
+                return 0
+
+            with self._cond:
+                self.stats.flushed += len(batch)
+                self.stats.flushes += 1
+            return len(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._pid != os.getpid():
+            # Forked worker: the parent's flusher thread does not exist here.
+            self._pid = os.getpid()
+            self._thread = None
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._cond:
+            if self._stopped or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name='api-request-log-flusher',
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopped or len(self._records) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                stopped = self._stopped
+
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+            if stopped:
+                return
+
+
+_buffer: Optional[ApiRequestLogBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_request_log_buffer() -> ApiRequestLogBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = getattr(settings, 'API_REQUEST_LOG_BUFFER', {})
+                _buffer = ApiRequestLogBuffer(
+                    max_size=config.get('MAX_SIZE', 10000),
+                    batch_size=config.get('BATCH_SIZE', 500),
+                    flush_interval=config.get('FLUSH_INTERVAL', 2.0),
+                    overflow_policy=config.get('OVERFLOW_POLICY', POLICY_DROP_OLDEST),
+                    block_timeout=config.get('BLOCK_TIMEOUT', 0.05),
+                    background=config.get('BACKGROUND', True),
+                )
+                atexit.register(_buffer.close)
+    return _buffer
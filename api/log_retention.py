@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from api.models import ApiRequestLog, ApiRequestLogHourly
+
+HOUR = timedelta(hours=1)
+
+
+def retention_settings() -> dict:
+    config = getattr(settings, 'API_REQUEST_LOG_RETENTION', {})
+    return {
+        'RAW_DAYS': config.get('RAW_DAYS', 14),
+        'HOURLY_DAYS': config.get('HOURLY_DAYS', 365),
+        'DELETE_BATCH_SIZE': config.get('DELETE_BATCH_SIZE', 5000),
+    }
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ApiRequestLogRetention:
+    """
+    Downsampling and deletion of old ApiRequestLog rows.
+
+    Raw rows older than ``RAW_DAYS`` are rolled up one hour at a time into
+    ApiRequestLogHourly, then deleted in primary-key batches of
+    ``DELETE_BATCH_SIZE``, one short transaction each, so no statement
+    holds the table for long. An hour whose rollup already exists is only
+    deleted, never counted again, so a run that stops halfway can simply be
+    repeated. Hourly rows are kept for ``HOURLY_DAYS``.
+    """
+
+    @staticmethod
+    def rollup_hour(hour: datetime) -> int:
+        """Aggregate the raw rows of ``[hour, hour + 1h)``; returns the number of rows read."""
+        rows = (
+            ApiRequestLog.objects
+            .filter(created_at__gte=hour, created_at__lt=hour + HOUR)
+            .order_by()
+            .values_list('route', 'path', 'method', 'status_code', 'duration_ms')
+        )
+        groups: dict[tuple[str, str], list] = {}
+        read = 0
+        for route, path, method, status_code, duration_ms in rows.iterator(chunk_size=5000):
+            # Rows logged before routes were recorded fall back to their path.
+            group = groups.setdefault((route or path, method), [0, []])
+            group[0] += int(status_code >= 500)
+            group[1].append(duration_ms)
+            read += 1
+
+        aggregates = []
+        for (route, method), (errors, durations) in groups.items():
+            durations.sort()
+            aggregates.append(ApiRequestLogHourly(
+                hour=hour,
+                route=route[:512],
+                method=method,
+                count=len(durations),
+                error_count=errors,
+                total_duration_ms=sum(durations),
+                max_duration_ms=durations[-1],
+                p50_ms=percentile(durations, 0.5),
+                p95_ms=percentile(durations, 0.95),
+                p99_ms=percentile(durations, 0.99),
+            ))
+        ApiRequestLogHourly.objects.bulk_create(aggregates)
+        return read
+
+    @staticmethod
+    def delete_raw(start: datetime, end: datetime, batch_size: int) -> int:
+        raw = ApiRequestLog.objects.filter(created_at__gte=start, created_at__lt=end)
+        db = router.db_for_write(ApiRequestLog)
+        deleted = 0
+        while True:
+            ids = list(raw.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            with transaction.atomic(using=db):
+                count, _ = ApiRequestLog.objects.filter(pk__in=ids).delete()
+            deleted += count
+
+    @staticmethod
+    def run(now: Optional[datetime] = None, raw_days: Optional[int] = None, batch_size: Optional[int] = None) -> dict:
+        config = retention_settings()
+        now = now or timezone.now()
+        raw_days = config['RAW_DAYS'] if raw_days is None else raw_days
+        batch_size = batch_size or config['DELETE_BATCH_SIZE']
+        cutoff = floor_hour(now - timedelta(days=raw_days))
+        db = router.db_for_write(ApiRequestLog)
+
+        expired_raw = ApiRequestLog.objects.filter(created_at__lt=cutoff)
+        hours = rolled = deleted = 0
+        # Each pass deletes its hour, so the oldest remaining row names the next
+        # hour to process and empty hours cost nothing.
+        while (oldest := expired_raw.aggregate(oldest=Min('created_at'))['oldest']) is not None:
+            hour = floor_hour(oldest)
+            if not ApiRequestLogHourly.objects.filter(hour=hour).exists():
+                with transaction.atomic(using=db):
+                    rolled += ApiRequestLogRetention.rollup_hour(hour)
+                hours += 1
+            deleted += ApiRequestLogRetention.delete_raw(hour, hour + HOUR, batch_size)
+
+        hourly_cutoff = now - timedelta(days=config['HOURLY_DAYS'])
+        expired, _ = ApiRequestLogHourly.objects.filter(hour__lt=hourly_cutoff).delete()
+        return {'hours': hours, 'rolled_up': rolled, 'deleted': deleted, 'expired_hourly': expired}
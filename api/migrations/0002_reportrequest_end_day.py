@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportrequest',
+            name='end_day',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reportrequest',
+            name='type',
+            field=models.CharField(choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('RANGE', 'Date range')], default='DAILY', max_length=16),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_reportrequest_end_day'),
+        ('core', '0006_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reportrequest',
+            index=models.Index(fields=['user', '-created_at'], name='reportreq_user_created_idx'),
+        ),
+    ]
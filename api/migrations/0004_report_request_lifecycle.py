@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_active_requests(apps, schema_editor):
+    """Of identical pending or running requests, keep the oldest and fail the rest."""
+    ReportRequest = apps.get_model('api', 'ReportRequest')
+    ReportRequest.objects.filter(end_day__isnull=False).exclude(type='RANGE').update(end_day=None)
+
+    seen = {}
+    duplicates = []
+    rows = (
+        ReportRequest.objects
+        .filter(status__in=['PENDING', 'RUNNING'], day__isnull=False)
+        .order_by('id')
+        .values_list('id', 'user_id', 'type', 'day', 'end_day')
+    )
+    for pk, *key in rows.iterator():
+        if tuple(key) in seen:
+            duplicates.append((pk, seen[tuple(key)]))
+        else:
+            seen[tuple(key)] = pk
+    for pk, original in duplicates:
+        ReportRequest.objects.filter(pk=pk).update(status='FAILED', error_message=f'Duplicate of request #{original}.')
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_reportrequest_indexes'),
+        ('core', '0007_fulltext_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportrequest',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reportrequest',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reportrequest',
+            index=models.Index(fields=['status', 'updated_at'], name='reportreq_status_updated_idx'),
+        ),
+        migrations.RunPython(fail_duplicate_active_requests, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reportrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'RUNNING'])), fields=('user', 'type', 'day', 'end_day'), name='unique_active_report_request'),
+        ),
+        migrations.AddConstraint(
+            model_name='reportrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_day__isnull', True), ('status__in', ['PENDING', 'RUNNING'])), fields=('user', 'type', 'day'), name='unique_active_report_request_open_end'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_report_request_lifecycle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apirequestlog',
+            name='db_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apirequestlog',
+            name='db_queries',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apirequestlog',
+            name='response_bytes',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apirequestlog',
+            name='serializer_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_request_log_metrics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiRequestLogHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('route', models.CharField(max_length=512)),
+                ('method', models.CharField(max_length=8)),
+                ('count', models.PositiveIntegerField()),
+                ('error_count', models.PositiveIntegerField()),
+                ('total_duration_ms', models.FloatField()),
+                ('max_duration_ms', models.FloatField()),
+                ('p50_ms', models.FloatField()),
+                ('p95_ms', models.FloatField()),
+                ('p99_ms', models.FloatField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='apirequestlog',
+            name='route',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+        migrations.AlterField(
+            model_name='apirequestlog',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='apirequestlog',
+            index=models.Index(fields=['created_at'], name='apilog_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='apirequestloghourly',
+            constraint=models.UniqueConstraint(fields=('hour', 'route', 'method'), name='unique_apilog_hour_route'),
+        ),
+    ]
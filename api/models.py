@@ -7,10 +7,12 @@ from core.models import TimeStampedModel, GeneratedReport
 class ReportRequest(TimeStampedModel):
     TYPE_DAILY = 'DAILY'
     TYPE_WEEKLY = 'WEEKLY'
+    TYPE_RANGE = 'RANGE'
 
     TYPE_CHOICES = [
         (TYPE_DAILY, 'Daily'),
         (TYPE_WEEKLY, 'Weekly'),
+        (TYPE_RANGE, 'Date range'),
     ]
 
     STATUS_PENDING = 'PENDING'
@@ -24,13 +26,17 @@ class ReportRequest(TimeStampedModel):
         (STATUS_DONE, 'Done'),
         (STATUS_FAILED, 'Failed'),
     ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
 
     user = models.ForeignKey(AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_requests')
     type = models.CharField(max_length=16, choices=TYPE_CHOICES, default=TYPE_DAILY)
     day = models.DateField(blank=True, null=True)
+    end_day = models.DateField(blank=True, null=True)
 
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
     error_message = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    claimed_at = models.DateTimeField(blank=True, null=True)
 
     result_report = models.ForeignKey(
         GeneratedReport,
@@ -40,6 +46,26 @@ class ReportRequest(TimeStampedModel):
         related_name='requests',
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='reportreq_user_created_idx'),
+            models.Index(fields=['status', 'updated_at'], name='reportreq_status_updated_idx'),
+        ]
+        # At most one pending or running request per user, type and period.
+        # end_day is NULL except for ranges, and NULLs never collide, hence two constraints.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'type', 'day', 'end_day'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='unique_active_report_request',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'type', 'day'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING'], end_day__isnull=True),
+                name='unique_active_report_request_open_end',
+            ),
+        ]
+
     def __str__(self):
         return f"ReportRequest #{self.pk} ({self.type}, {self.status})"
 
@@ -49,15 +75,54 @@ class ApiRequestLog(TimeStampedModel):
         AUTH_USER_MODEL,
         null=True,
         blank=True,
-        on_delete=models.SET_NULL,
+        # The log may live in its own database (API_REQUEST_LOG_DATABASE), so
+        # there is no constraint and deleting a user leaves its logs alone:
+        # SET_NULL would run its UPDATE against the user's database. Logs of
+        # deleted users keep a dangling user_id.
+        on_delete=models.DO_NOTHING,
         related_name='api_logs',
+        db_constraint=False,
     )
     path = models.CharField(max_length=512)
+    # URL name, e.g. "api-v1:session-detail"; blank for unmatched paths.
+    route = models.CharField(max_length=128, blank=True)
     method = models.CharField(max_length=8)
     status_code = models.PositiveIntegerField()
     duration_ms = models.FloatField()
+    # Null when the request was not sampled (see METRICS['SAMPLE_RATE']).
+    db_queries = models.PositiveIntegerField(null=True, blank=True)
+    db_ms = models.FloatField(null=True, blank=True)
+    serializer_ms = models.FloatField(null=True, blank=True)
+    response_bytes = models.PositiveIntegerField(null=True, blank=True)
     user_agent = models.CharField(max_length=512, blank=True)
     remote_addr = models.GenericIPAddressField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='apilog_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} [{self.status_code}]"
+
+
+class ApiRequestLogHourly(models.Model):
+    """ApiRequestLog rows past retention, rolled up per hour, route and method."""
+    hour = models.DateTimeField()
+    route = models.CharField(max_length=512)
+    method = models.CharField(max_length=8)
+    count = models.PositiveIntegerField()
+    error_count = models.PositiveIntegerField()
+    total_duration_ms = models.FloatField()
+    max_duration_ms = models.FloatField()
+    p50_ms = models.FloatField()
+    p95_ms = models.FloatField()
+    p99_ms = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'route', 'method'], name='unique_apilog_hour_route'),
+        ]
+
     def __str__(self):
-        return f"{self.method} {self.path} [{self.status_code}]"
\ No newline at end of file
+        return f"{self.method} {self.route} @ {self.hour:%Y-%m-%d %H}:00 ({self.count})"
\ No newline at end of file
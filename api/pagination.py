@@ -0,0 +1,159 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def queryset_ordering(queryset, default: str) -> str:
+    order_by = queryset.query.order_by
+    if order_by and isinstance(order_by[0], str) and '__' not in order_by[0] and order_by[0] != '?':
+        return order_by[0]
+    return default
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Forward-only keyset pagination on ``(<ordering field>, id)``.
+
+    The ordering field is whatever the view ordered the queryset by (first
+    ``order_by`` term, ``-created_at`` by default); ``id`` in the same
+    direction breaks ties. The opaque cursor stores the last row's key, so
+    each page is a single indexed range scan no matter how deep it is.
+    NULLs in nullable ordering fields are always sorted last.
+    """
+    page_size = api_settings.PAGE_SIZE or 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+        nullable = self._is_nullable(queryset.model, field)
+
+        queryset = queryset.order_by(
+            OrderBy(F(field), descending=descending, nulls_last=True if nullable else None),
+            OrderBy(F('pk'), descending=descending),
+        )
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self._after(field, descending, nullable, *cursor))
+
+        rows = list(queryset[:self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        rows = rows[:self.limit]
+
+        self.next_key = None
+        if self.has_next and rows:
+            last = rows[-1]
+            self.next_key = (getattr(last, field), last.pk)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'page_size': self.limit,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'page_size': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                value = int(raw)
+            except ValueError:
+                value = 0
+            if value > 0:
+                return min(value, self.max_page_size)
+        return self.page_size
+
+    def get_ordering(self, queryset) -> str:
+        return queryset_ordering(queryset, self.default_ordering)
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*self.next_key))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def encode_cursor(self, value, pk) -> str:
+        if isinstance(value, datetime):
+            encoded = {'t': 'dt', 'v': value.isoformat()}
+        elif isinstance(value, date):
+            encoded = {'t': 'd', 'v': value.isoformat()}
+        elif isinstance(value, Decimal):
+            encoded = {'t': 'dec', 'v': str(value)}
+        else:
+            encoded = {'v': value}
+        payload = json.dumps({'o': self.ordering, 'k': encoded, 'pk': pk}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+
+        try:
+            padded = raw + '=' * (-len(raw) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if data['o'] != self.ordering:
+                raise ValueError('ordering changed')
+            key = data['k']
+            kind, value = key.get('t'), key['v']
+            if kind == 'dt':
+                value = datetime.fromisoformat(value)
+            elif kind == 'd':
+                value = date.fromisoformat(value)
+            elif kind == 'dec':
+                value = Decimal(value)
+            return value, data['pk']
+        except (KeyError, TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _is_nullable(model, field: str) -> bool:
+        try:
+            return model._meta.get_field(field).null
+        except FieldDoesNotExist:
+            return False
+
+    @staticmethod
+    def _after(field: str, descending: bool, nullable: bool, value, pk) -> Q:
+        op = 'lt' if descending else 'gt'
+        if value is None:
+            return Q(**{f'{field}__isnull': True, f'pk__{op}': pk})
+
+        condition = Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+        if nullable:
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
@@ -0,0 +1,42 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class _ExportRenderer(BaseRenderer):
+    """
+    Lets ``?format=csv`` / ``?format=ndjson`` pass DRF content negotiation.
+
+    Export actions return a StreamingHttpResponse directly, so these renderers
+    only ever render error payloads (e.g. 403), which are emitted as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data).encode(self.charset)
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Plain-text Prometheus exposition; the view hands it a ready-made string."""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return json.dumps(data).encode(self.charset)
@@ -0,0 +1,179 @@
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, InterfaceError, OperationalError, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from api.models import ReportRequest
+from core.events import publish_event, EVENT_REPORT_REQUEST_STATUS
+from core.models import GeneratedReport
+
+# Errors worth another attempt; anything else fails the request at once.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+def queue_settings() -> dict:
+    config = getattr(settings, 'REPORT_REQUESTS', {})
+    return {
+        'MAX_ATTEMPTS': config.get('MAX_ATTEMPTS', 3),
+        'RETRY_BACKOFF': config.get('RETRY_BACKOFF', 30),
+        'MAX_BACKOFF': config.get('MAX_BACKOFF', 600),
+        'STUCK_AFTER': config.get('STUCK_AFTER', 900),
+    }
+
+
+def publish_report_request_status(req: ReportRequest) -> None:
+    publish_event(req.user_id, EVENT_REPORT_REQUEST_STATUS, {
+        'id': req.id,
+        'type': req.type,
+        'status': req.status,
+        'result_report': req.result_report_id,
+        'error_message': req.error_message,
+    })
+
+
+class ReportRequestQueue:
+    """
+    State transitions of a ReportRequest.
+
+    Every transition is a conditional ``UPDATE ... WHERE status = <from>``,
+    so two workers (or a worker and the reaper) racing on the same row
+    cannot both win. ``update()`` skips post_save, so each transition
+    publishes its own status event.
+    """
+
+    @staticmethod
+    def submit(user, type=ReportRequest.TYPE_DAILY, day=None, end_day=None) -> tuple[ReportRequest, bool]:
+        """The user's pending or running identical request if there is one, otherwise a new one."""
+        day = day or timezone.now().date()
+        if type != ReportRequest.TYPE_RANGE:
+            end_day = None
+        active = ReportRequest.objects.filter(
+            user=user, type=type, day=day, end_day=end_day, status__in=ReportRequest.ACTIVE_STATUSES,
+        )
+
+        existing = active.order_by('pk').first()
+        if existing is not None:
+            return existing, False
+        try:
+            with transaction.atomic():
+                req = ReportRequest.objects.create(user=user, type=type, day=day, end_day=end_day)
+        except IntegrityError:
+            # A concurrent submit won the unique constraint.
+            existing = active.order_by('pk').first()
+            if existing is None:
+                raise
+            return existing, False
+        return req, True
+
+    @staticmethod
+    def claim(request_id: int) -> Optional[ReportRequest]:
+        """Move a pending request to running. ``None`` if another worker has it or it is finished."""
+        now = timezone.now()
+        claimed = ReportRequest.objects.filter(pk=request_id, status=ReportRequest.STATUS_PENDING).update(
+            status=ReportRequest.STATUS_RUNNING, claimed_at=now, attempts=F('attempts') + 1, updated_at=now,
+        )
+        if not claimed:
+            return None
+        req = ReportRequest.objects.select_related('user').get(pk=request_id)
+        publish_report_request_status(req)
+        return req
+
+    @staticmethod
+    def complete(req: ReportRequest, report: GeneratedReport) -> bool:
+        return ReportRequestQueue._transition(
+            req, ReportRequest.STATUS_RUNNING, ReportRequest.STATUS_DONE,
+            result_report=report, error_message=None,
+        )
+
+    @staticmethod
+    def fail(req: ReportRequest, error: str) -> bool:
+        return ReportRequestQueue._transition(
+            req, ReportRequest.STATUS_RUNNING, ReportRequest.STATUS_FAILED, error_message=error,
+        )
+
+    @staticmethod
+    def release(req: ReportRequest, error: str) -> bool:
+        """Hand a running request back to the queue for another attempt."""
+        return ReportRequestQueue._transition(
+            req, ReportRequest.STATUS_RUNNING, ReportRequest.STATUS_PENDING, error_message=error, claimed_at=None,
+        )
+
+    @staticmethod
+    def can_retry(req: ReportRequest) -> bool:
+        return req.attempts < queue_settings()['MAX_ATTEMPTS']
+
+    @staticmethod
+    def retry_delay(attempts: int) -> int:
+        config = queue_settings()
+        return min(config['RETRY_BACKOFF'] * 2 ** max(attempts - 1, 0), config['MAX_BACKOFF'])
+
+    @staticmethod
+    def _transition(req: ReportRequest, from_status: str, to_status: str, **fields) -> bool:
+        now = timezone.now()
+        changed = ReportRequest.objects.filter(pk=req.pk, status=from_status).update(
+            status=to_status, updated_at=now, **fields,
+        )
+        if not changed:
+            return False
+        req.status = to_status
+        req.updated_at = now
+        for name, value in fields.items():
+            setattr(req, name, value)
+        publish_report_request_status(req)
+        return True
+
+    @staticmethod
+    def reap(now=None) -> dict:
+        """
+        Recover requests older than ``STUCK_AFTER`` seconds.
+
+        Running requests whose worker died go back to pending while they
+        have attempts left, and fail otherwise. Pending requests whose
+        queue message was lost are returned for re-enqueueing. Returns the
+        ids to enqueue and the number of requests failed.
+        """
+        now = now or timezone.now()
+        config = queue_settings()
+        cutoff = now - timedelta(seconds=config['STUCK_AFTER'])
+        requeue: list[int] = []
+        failed = 0
+
+        stuck = ReportRequest.objects.filter(status=ReportRequest.STATUS_RUNNING, claimed_at__lt=cutoff)
+        for req in stuck.only('id', 'user_id', 'type', 'attempts', 'result_report_id'):
+            if req.attempts < config['MAX_ATTEMPTS']:
+                if ReportRequestQueue.release(req, f'Worker lost after {config["STUCK_AFTER"]}s; retrying.'):
+                    requeue.append(req.pk)
+            elif ReportRequestQueue.fail(req, f'Gave up after {req.attempts} attempts.'):
+                failed += 1
+
+        lost = ReportRequest.objects.filter(status=ReportRequest.STATUS_PENDING, updated_at__lt=cutoff)
+        lost_ids = list(lost.values_list('pk', flat=True))
+        # Touch them so the next reap does not enqueue them again.
+        ReportRequest.objects.filter(pk__in=lost_ids, status=ReportRequest.STATUS_PENDING).update(updated_at=now)
+        requeue.extend(lost_ids)
+        return {'requeue': requeue, 'failed': failed}
+
+    @staticmethod
+    def stats(now=None) -> dict:
+        """Per-state counts and queue depth from one grouped query over the status index."""
+        now = now or timezone.now()
+        counts = {value: 0 for value, _ in ReportRequest.STATUS_CHOICES}
+        oldest_pending = None
+        rows = (
+            ReportRequest.objects
+            .order_by()
+            .values('status')
+            .annotate(count=Count('id'), oldest=Min('updated_at'))
+        )
+        for row in rows:
+            counts[row['status']] = row['count']
+            if row['status'] == ReportRequest.STATUS_PENDING:
+                oldest_pending = row['oldest']
+        return {
+            'counts': counts,
+            'queue_depth': counts[ReportRequest.STATUS_PENDING] + counts[ReportRequest.STATUS_RUNNING],
+            'oldest_pending_seconds': round((now - oldest_pending).total_seconds(), 1) if oldest_pending else None,
+        }
@@ -1,20 +1,78 @@
+from collections.abc import Mapping
+
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework import serializers
 
 from api.models import ReportRequest
 from core.models import Task, DevSession, SessionTask, ContextSwitch, ResourceLink, GeneratedReport, Team, \
     TeamMembership, Insight
+from core.metrics import current_request_metrics
+from core.services import ContextSwitchService, ReportService
 
 User = get_user_model()
 
 
-class TaskSerializer(serializers.ModelSerializer):
+def requested_fields(request) -> set[str]:
+    if request is None:
+        return set()
+    raw = request.query_params.get('fields', '')
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+class TimedSerializerMixin:
+    """Adds the time spent in ``to_representation`` to the sampled request's serializer time."""
+
+    def to_representation(self, instance):
+        metrics = current_request_metrics()
+        if metrics is None:
+            return super().to_representation(instance)
+        return metrics.time_serializer(super().to_representation, instance)
+
+
+class SparseFieldsetMixin:
+    """Drops every field not listed in ``?fields=a,b,c`` (when given)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get('request'))
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class TaskSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'external_id', 'type', 'priority', 'created_at', 'updated_at']
 
+    def validate_external_id(self, value):
+        if not value:
+            return None
+
+        source = self.instance.external_source if self.instance else Task.SOURCE_MANUAL
+        qs = Task.objects.filter(external_source=source, external_id=value)
+        if self.instance is not None:
+            qs = qs.exclude(pk=self.instance.pk)
+        if qs.exists():
+            raise serializers.ValidationError('A task with this external id already exists.')
+        return value
+
+
+class TaskBulkItemSerializer(serializers.ModelSerializer):
+    """One task of a bulk upsert. Uniqueness and the team are checked per batch by ``TaskBulkUpsert``."""
+    team = serializers.IntegerField(required=False, allow_null=True)
 
-class DevSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'type', 'priority', 'team', 'external_source', 'external_id', 'external_url']
+        validators = []
+
+    def validate_external_id(self, value):
+        return value or None
+
+
+class DevSessionSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = DevSession
         fields = [
@@ -26,8 +84,33 @@ class DevSessionSerializer(serializers.ModelSerializer):
         read_only_fields = ['switch_count', 'last_switch_at', 'total_focus_minutes']
 
 
+class DevSessionBulkItemSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = DevSession
+        fields = ['id', 'title', 'description', 'status', 'started_at', 'ended_at']
+
+    def validate(self, attrs):
+        started_at, ended_at = attrs.get('started_at'), attrs.get('ended_at')
+        if started_at and ended_at and ended_at < started_at:
+            raise serializers.ValidationError({'ended_at': ['Must not be before started_at.']})
+        return attrs
+
+
+class SessionTaskEntrySerializer(serializers.ModelSerializer):
+    """A task attached to a session, with its ``role`` in that session."""
+
+    class Meta:
+        model = SessionTask
+        fields = ['role']
+
+    def to_representation(self, instance):
+        return {**TaskSerializer(instance.task).data, 'role': instance.role}
+
+
 class DevSessionDetailSerializer(DevSessionSerializer):
-    tasks = TaskSerializer(source='tasks', many=True, read_only=True)
+    tasks = SessionTaskEntrySerializer(source='session_tasks', many=True, read_only=True)
 
     class Meta(DevSessionSerializer.Meta):
         fields = DevSessionSerializer.Meta.fields + ['tasks']
@@ -43,13 +126,13 @@ class CreateDevSessionSerializer(serializers.ModelSerializer):
         return DevSession.objects.create(user=user, **validated_data)
 
 
-class SessionTaskSerializer(serializers.ModelSerializer):
+class SessionTaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = SessionTask
         fields = ['id', 'dev_session', 'task', 'role', 'created_at', 'updated_at']
 
 
-class ContextSwitchSerializer(serializers.ModelSerializer):
+class ContextSwitchSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ContextSwitch
         fields = [
@@ -58,7 +141,64 @@ class ContextSwitchSerializer(serializers.ModelSerializer):
         ]
 
 
-class ResourceLinkSerializer(serializers.ModelSerializer):
+class ContextSwitchBulkItemSerializer(serializers.Serializer):
+    dev_session = serializers.IntegerField()
+    from_task = serializers.IntegerField(required=False, allow_null=True)
+    to_task = serializers.IntegerField(required=False, allow_null=True)
+    reason = serializers.ChoiceField(choices=ContextSwitch.REASON_CHOICES, default=ContextSwitch.REASON_OTHER)
+    happened_at = serializers.DateTimeField(required=False)
+
+
+class ContextSwitchBulkSerializer(serializers.Serializer):
+    MAX_ITEMS = 1000
+
+    switches = ContextSwitchBulkItemSerializer(many=True, allow_empty=False)
+
+    def validate_switches(self, items):
+        if len(items) > self.MAX_ITEMS:
+            raise serializers.ValidationError(f'At most {self.MAX_ITEMS} switches per request.')
+
+        user = self.context['request'].user
+        session_ids = {item['dev_session'] for item in items}
+        owned = set(
+            DevSession.objects.filter(pk__in=session_ids, user=user).values_list('id', flat=True)
+        )
+        task_ids = {
+            item[key] for item in items for key in ('from_task', 'to_task')
+            if item.get(key) is not None
+        }
+        existing_tasks = set(Task.objects.filter(pk__in=task_ids).values_list('id', flat=True))
+
+        errors = []
+        for item in items:
+            item_errors = {}
+            if item['dev_session'] not in owned:
+                item_errors['dev_session'] = ['Invalid session.']
+            for key in ('from_task', 'to_task'):
+                if item.get(key) is not None and item[key] not in existing_tasks:
+                    item_errors[key] = ['Invalid task.']
+            errors.append(item_errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    def create(self, validated_data):
+        now = timezone.now()
+        switches = [
+            ContextSwitch(
+                dev_session_id=item['dev_session'],
+                from_task_id=item.get('from_task'),
+                to_task_id=item.get('to_task'),
+                reason=item['reason'],
+                happened_at=item.get('happened_at') or now,
+            )
+            for item in validated_data['switches']
+        ]
+        return ContextSwitchService.record_bulk(switches)
+
+
+class ResourceLinkSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ResourceLink
         fields = [
@@ -67,37 +207,81 @@ class ResourceLinkSerializer(serializers.ModelSerializer):
         ]
 
 
-class GeneratedReportSerializer(serializers.ModelSerializer):
+class ResourceLinkBulkItemSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    dev_session = serializers.IntegerField(required=False, allow_null=True)
+    task = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = ResourceLink
+        fields = ['id', 'dev_session', 'task', 'type', 'title', 'url']
+
+
+class GeneratedReportSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = GeneratedReport
-        fields = ['id', 'type', 'payload', 'created_at']
+        fields = ['id', 'type', 'day', 'payload', 'created_at']
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Team
         fields = ['id', 'name', 'slug', 'owner', 'created_at', 'updated_at']
         read_only_fields = ['owner']
 
 
-class TeamMembershipSerializer(serializers.ModelSerializer):
+class TeamMembershipSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TeamMembership
         fields = ['id', 'team', 'user', 'role', 'created_at', 'updated_at']
 
 
-class ReportRequestSerializer(serializers.ModelSerializer):
+class ReportRequestSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ReportRequest
         fields = [
-            'id', 'type', 'day',
-            'status', 'error_message',
+            'id', 'type', 'day', 'end_day',
+            'status', 'error_message', 'attempts',
             'result_report', 'created_at', 'updated_at',
         ]
-        read_only_fields = ['status', 'error_message', 'result_report']
+        read_only_fields = ['status', 'error_message', 'attempts', 'result_report']
+
+    def validate(self, attrs):
+        if attrs.get('type') == ReportRequest.TYPE_RANGE:
+            day, end_day = attrs.get('day'), attrs.get('end_day')
+            if day is None or end_day is None:
+                raise serializers.ValidationError('day and end_day are required for range reports.')
+            if end_day < day:
+                raise serializers.ValidationError('end_day must not be before day.')
+            if (end_day - day).days >= ReportService.MAX_RANGE_DAYS:
+                raise serializers.ValidationError(f'Range is limited to {ReportService.MAX_RANGE_DAYS} days.')
+        return attrs
+
+
+class ReportDaySerializer(serializers.Serializer):
+    """Body of the daily and weekly report endpoints; a missing or empty ``date`` means today."""
+    date = serializers.DateField(required=False, allow_null=True)
+
+    def to_internal_value(self, data):
+        if isinstance(data, Mapping) and data.get('date') == '':
+            data = data.copy()
+            data['date'] = None
+        return super().to_internal_value(data)
+
+
+class RangeReportSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError('end must not be before start.')
+        if (attrs['end'] - attrs['start']).days >= ReportService.MAX_RANGE_DAYS:
+            raise serializers.ValidationError(f'Range is limited to {ReportService.MAX_RANGE_DAYS} days.')
+        return attrs
 
 
-class InsightSerializer(serializers.ModelSerializer):
+class InsightSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Insight
         fields = [
@@ -0,0 +1,149 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from api.serializers import ContextSwitchSerializer, DevSessionSerializer, ResourceLinkSerializer, TaskSerializer
+from core.models import ContextSwitch, DevSession, ResourceLink, Task, Tombstone
+
+DELETED = 'deleted'
+
+
+def sync_settings() -> dict:
+    config = getattr(settings, 'SYNC', {})
+    return {
+        'PAGE_SIZE': config.get('PAGE_SIZE', 500),
+        'MAX_PAGE_SIZE': config.get('MAX_PAGE_SIZE', 1000),
+        'SETTLE_SECONDS': config.get('SETTLE_SECONDS', 2),
+        'TOMBSTONE_DAYS': config.get('TOMBSTONE_DAYS', 30),
+    }
+
+
+class SyncTokenExpired(Exception):
+    """The token predates the oldest kept tombstone; the client must sync from scratch."""
+
+
+@dataclass(frozen=True)
+class SyncStream:
+    queryset: Callable
+    serializer_class: type[serializers.Serializer]
+
+
+STREAMS = {
+    Tombstone.KIND_TASK: SyncStream(lambda user: Task.objects.all(), TaskSerializer),
+    Tombstone.KIND_SESSION: SyncStream(lambda user: DevSession.objects.filter(user=user), DevSessionSerializer),
+    Tombstone.KIND_CONTEXT_SWITCH: SyncStream(
+        lambda user: ContextSwitch.objects.filter(dev_session__user=user), ContextSwitchSerializer,
+    ),
+    Tombstone.KIND_RESOURCE: SyncStream(
+        lambda user: ResourceLink.objects.filter(dev_session__user=user), ResourceLinkSerializer,
+    ),
+}
+
+
+def encode_token(cursors: dict[str, tuple[datetime, int]]) -> str:
+    raw = json.dumps({name: [at.isoformat(), pk] for name, (at, pk) in cursors.items()}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_token(token: str) -> dict[str, tuple[datetime, int]]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        cursors = {name: (parse_datetime(at), int(pk)) for name, (at, pk) in raw.items()}
+    except (binascii.Error, ValueError, TypeError, AttributeError):
+        raise serializers.ValidationError({'since': ['Invalid sync token.']})
+    malformed = any(at is None or at.tzinfo is None for at, _ in cursors.values())
+    if malformed or DELETED not in cursors or set(cursors) - {*STREAMS, DELETED}:
+        raise serializers.ValidationError({'since': ['Invalid sync token.']})
+    return cursors
+
+
+class SyncService:
+    """
+    Changes since a sync token, for offline-first clients.
+
+    Each stream (one per model, plus tombstones for deletes) is read in
+    ``(updated_at, id)`` order from its own keyset cursor, and the token
+    carries every cursor. A page fills up from the streams in a fixed
+    order; a stream that is drained moves its cursor to the horizon, so a
+    caught-up client's token stays small and current.
+
+    The horizon trails the clock by ``SETTLE_SECONDS``: a row stamped just
+    before the horizon by a transaction that has not committed yet would
+    otherwise be passed by the cursor and never sent.
+    """
+
+    @staticmethod
+    def after(cursor: Optional[tuple[datetime, int]]) -> Q:
+        if cursor is None:
+            return Q()
+        at, pk = cursor
+        return Q(updated_at__gt=at) | Q(updated_at=at, id__gt=pk)
+
+    @staticmethod
+    def changes(user, since: Optional[str] = None, limit: Optional[int] = None, now=None) -> dict:
+        config = sync_settings()
+        now = now or timezone.now()
+        horizon = now - timedelta(seconds=config['SETTLE_SECONDS'])
+        limit = min(limit or config['PAGE_SIZE'], config['MAX_PAGE_SIZE'])
+        if since:
+            cursors = decode_token(since)
+            if cursors[DELETED][0] < now - timedelta(days=config['TOMBSTONE_DAYS']):
+                raise SyncTokenExpired()
+        else:
+            # A full sync only reads rows that still exist, so earlier deletes do not concern it.
+            cursors = {DELETED: (horizon, 0)}
+
+        sources = [
+            (name, stream.queryset(user), stream.serializer_class) for name, stream in STREAMS.items()
+        ] + [(DELETED, Tombstone.objects.filter(Q(user=user) | Q(user__isnull=True)), None)]
+
+        changes = {name: [] for name in STREAMS}
+        deleted = {name: [] for name in STREAMS}
+        has_more = False
+        budget = limit
+        for name, queryset, serializer_class in sources:
+            if budget == 0:
+                has_more = True
+                break
+            rows = list(
+                queryset
+                .filter(SyncService.after(cursors.get(name)), updated_at__lt=horizon)
+                .order_by('updated_at', 'id')[:budget + 1]
+            )
+            if len(rows) > budget:
+                has_more = True
+                rows = rows[:budget]
+                cursors[name] = (rows[-1].updated_at, rows[-1].pk)
+            else:
+                cursors[name] = (horizon, 0)
+            budget -= len(rows)
+
+            if serializer_class is None:
+                for tombstone in rows:
+                    deleted[tombstone.kind].append(tombstone.object_id)
+            else:
+                changes[name] = serializer_class(rows, many=True).data
+
+        return {
+            'changes': changes,
+            'deleted': deleted,
+            'next': encode_token(cursors),
+            'has_more': has_more,
+        }
+
+    @staticmethod
+    def purge_tombstones(now=None) -> int:
+        """Delete tombstones older than ``SYNC['TOMBSTONE_DAYS']``; tokens that old get ``410``."""
+        now = now or timezone.now()
+        cutoff = now - timedelta(days=sync_settings()['TOMBSTONE_DAYS'])
+        deleted, _ = Tombstone.objects.filter(updated_at__lt=cutoff).delete()
+        return deleted
@@ -8,7 +8,11 @@ from api.views import (
     ResourceLinkViewSet,
     GeneratedReportViewSet,
     DailyReportView,
+    WeeklyReportView,
+    RangeReportView,
     AsyncDailyReportView, TeamViewSet, ReportRequestViewSet, InsightViewSet, EventStreamView,
+    CacheStatsView, IntegrationStatsView, GitHubImportView, ReportQueueStatsView, ContextSwitchAnalyticsView,
+    SyncView, MetricsView,
 )
 
 router = DefaultRouter()
@@ -22,8 +26,18 @@ router.register(r'report-requests', ReportRequestViewSet, basename='report-reque
 router.register(r'insights', InsightViewSet, basename='insight')
 
 urlpatterns = [
-    re_path(r"^ ", include(router.urls)),
     re_path(r"^reports/daily/?$", DailyReportView.as_view(), name="daily-report"),
+    re_path(r"^reports/weekly/?$", WeeklyReportView.as_view(), name="weekly-report"),
+    re_path(r"^reports/range/?$", RangeReportView.as_view(), name="range-report"),
     re_path(r"^reports/daily-async/?$", AsyncDailyReportView.as_view(), name="daily-report-async"),
+    re_path(r"^analytics/context-switches/?$", ContextSwitchAnalyticsView.as_view(), name="context-switch-analytics"),
+    re_path(r"^sync/?$", SyncView.as_view(), name="sync"),
+    re_path(r"^tasks/import_github/?$", GitHubImportView.as_view(), name="task-import-github"),
     re_path(r"^events/stream/?$", EventStreamView.as_view(), name='event-stream'),
+    re_path(r"^internal/cache-stats/?$", CacheStatsView.as_view(), name='cache-stats'),
+    re_path(r"^internal/integrations/?$", IntegrationStatsView.as_view(), name='integration-stats'),
+    re_path(r"^internal/report-queue/?$", ReportQueueStatsView.as_view(), name='report-queue-stats'),
+    re_path(r"^internal/metrics/?$", MetricsView.as_view(), name='metrics'),
+    # Last, so the router's reports/{pk}/ route does not shadow the report views above.
+    re_path(r"^", include(router.urls)),
 ]
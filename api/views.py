@@ -1,21 +1,38 @@
-from datetime import date
-from django.db import models
+import asyncio
+import inspect
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
 from django.http import StreamingHttpResponse, HttpResponse
 from django.views import View
 import httpx
 from asgiref.sync import sync_to_async
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.bulk import DevSessionBulkUpsert, ResourceLinkBulkUpsert, TaskBulkUpsert
 from api.models import ReportRequest
-from core.helper import csv_response
+from api.pagination import KeysetCursorPagination, queryset_ordering
+from api.report_queue import ReportRequestQueue
+from api.sync import SyncService, SyncTokenExpired
+from api.renderers import CSVRenderer, NDJSONRenderer, PrometheusRenderer
+from core.analytics import ContextSwitchAnalytics
+from core.events import stream_events
+from core.helper import TeamPermissionService, is_truthy, stream_csv_response, stream_ndjson_response, EXPORT_CHUNK_SIZE
+from core.http import IntegrationError, get_integration, integration_stats
+from core.metrics import get_metrics_registry, metrics_settings
 from core.integrations import GitHubImporter, GitHubIntegrationError
 from core.models import Task, DevSession, SessionTask, ContextSwitch, ResourceLink, GeneratedReport, Team, \
     TeamMembership, Insight
-from core.services import SessionService, ReportService
+from core.search import search_queryset
+from core.services import SessionService, ReportService, ActiveSessionService, TeamStatsService
 from api.serializers import (
     TaskSerializer,
     DevSessionSerializer,
@@ -23,23 +40,124 @@ from api.serializers import (
     CreateDevSessionSerializer,
     SessionTaskSerializer,
     ContextSwitchSerializer,
+    ContextSwitchBulkSerializer,
     ResourceLinkSerializer,
-    GeneratedReportSerializer, TeamSerializer, TeamMembershipSerializer, ReportRequestSerializer, InsightSerializer,
+    GeneratedReportSerializer, RangeReportSerializer, ReportDaySerializer, requested_fields, TeamSerializer, TeamMembershipSerializer, ReportRequestSerializer, InsightSerializer,
 )
-from core.tasks import process_report_request
+from core.tasks import process_report_request, import_github_issues
+
+
+EXPORT_RENDERERS = [CSVRenderer, NDJSONRenderer, JSONRenderer, BrowsableAPIRenderer]
 
 
 class IsOwner(permissions.BasePermission):
+    """
+    The object, or its session, belongs to the requesting user.
+
+    Compares ids so ``user`` is never loaded. Views over session children
+    select ``dev_session`` in their query plan.
+    """
+
     def has_object_permission(self, request, view, obj):
-        user = getattr(obj, 'user', None) or getattr(getattr(obj, 'dev_session', None), 'user', None)
-        if user is None:
-            return False
-        return user == request.user
+        if hasattr(obj, 'user_id'):
+            owner_id = obj.user_id
+        else:
+            session = getattr(obj, 'dev_session', None)
+            owner_id = session.user_id if session is not None else None
+        return owner_id is not None and owner_id == request.user.id
+
+
+class SparseFieldsetViewMixin:
+    """
+    Narrows list queries to the columns asked for with ``?fields=``.
+
+    The serializer drops the unrequested fields; this defers the matching
+    columns so they are not read from the database either.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        wanted = requested_fields(self.request)
+        if self.action != 'list' or not wanted:
+            return queryset
+
+        concrete = {
+            f.name for f in queryset.model._meta.concrete_fields
+        }
+        columns = (wanted & concrete) | {'id'}
+        ordering = queryset_ordering(queryset, KeysetCursorPagination.default_ordering).lstrip('-')
+        if ordering in concrete:
+            columns.add(ordering)
+        return queryset.only(*columns)
+
+
+DETAIL_ACTIONS = ('retrieve', 'update', 'partial_update', 'destroy')
+
+
+class QueryPlanMixin:
+    """
+    Per-action ``select_related`` and ``prefetch_related``.
+
+    ``query_plans`` maps an action name to ``{'select_related': [...],
+    'prefetch_related': [...]}``, applied to the queryset that list and
+    ``get_object`` read, so each action loads what its serializer and
+    permissions touch in a fixed number of queries.
+    """
+    query_plans: dict[str, dict] = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        plan = self.query_plans.get(self.action, {})
+        if plan.get('select_related'):
+            queryset = queryset.select_related(*plan['select_related'])
+        if plan.get('prefetch_related'):
+            queryset = queryset.prefetch_related(*plan['prefetch_related'])
+        return queryset
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines.
+
+    DRF's dispatch is synchronous. This one runs authentication, permission
+    and throttle checks in a worker thread, because they may touch the
+    session store, and then awaits the handler on the event loop. Under
+    ASGI the request holds no thread while the handler waits on I/O.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
 
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
 
-class TaskViewSet(viewsets.ModelViewSet):
+
+def latency_budget() -> float:
+    return getattr(settings, 'ASYNC_OFFLOAD', {}).get('LATENCY_BUDGET', 2.0)
+
+
+class TaskViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
 
     def get_queryset(self):
         qs = Task.objects.all().order_by('-created_at')
@@ -53,7 +171,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         if priority:
             qs = qs.filter(priority=priority)
         if search:
-            qs = qs.filter(title__icontains=search)
+            qs = search_queryset(qs, search)
 
         ordering = self.request.query_params.get('ordering')
         allowed = {'created_at', 'updated_at', 'priority', 'title'}
@@ -64,44 +182,36 @@ class TaskViewSet(viewsets.ModelViewSet):
 
         return qs
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=EXPORT_RENDERERS)
     def export(self, request):
         fmt = request.query_params.get('format', 'csv').lower()
         qs = self.get_queryset()
-        serializer = self.get_serializer(qs, many=True)
 
         if fmt == 'json':
-            return Response(serializer.data)
+            return Response(self.get_serializer(qs, many=True).data)
 
         fieldnames = ['id', 'title', 'type', 'priority', 'external_id', 'created_at', 'updated_at']
-        return csv_response('tasks.csv', fieldnames, serializer.data)
+        rows = qs.values_list(*fieldnames).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        if fmt == 'ndjson':
+            return stream_ndjson_response('tasks.ndjson', fieldnames, rows)
+        return stream_csv_response('tasks.csv', fieldnames, rows)
 
     @action(detail=False, methods=['post'])
-    async def import_github(self, request):
-        owner = request.data.get('owner')
-        repo = request.data.get('repo')
-        team_id = request.data.get('team_id')
-
-        if not owner or not repo:
-            return Response({"detail": "owner and repo are required"}, status=status.HTTP_400_BAD_REQUEST)
-
-        team = None
-        if team_id:
-            try:
-                team = Team.objects.get(pk=team_id)
-            except Team.DoesNotExist:
-                return Response({"detail": "team not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        try:
-            tasks = await GitHubImporter.import_issues_for_repo(owner, repo, team=team)
-        except GitHubIntegrationError as e:
-            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        return Response(TaskSerializer(tasks, many=True).data, status=status.HTTP_201_CREATED)
+    def bulk(self, request):
+        data, code = TaskBulkUpsert(request).run(request.data)
+        return Response(data, status=code)
 
 
-class DevSessionViewSet(viewsets.ModelViewSet):
+class DevSessionViewSet(QueryPlanMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    pagination_class = KeysetCursorPagination
+    query_plans = {
+        'retrieve': {
+            'prefetch_related': [
+                Prefetch('session_tasks', queryset=SessionTask.objects.select_related('task').order_by('pk')),
+            ],
+        },
+    }
 
     def get_queryset(self):
         qs = DevSession.objects.filter(user=self.request.user)
@@ -121,7 +231,7 @@ class DevSessionViewSet(viewsets.ModelViewSet):
             qs = qs.filter(created_at__date__lte=date_to)
 
         if title_search:
-            qs = qs.filter(title__icontains=title_search)
+            qs = search_queryset(qs, title_search)
 
         ordering = self.request.query_params.get('ordering')
         allowed = {
@@ -136,7 +246,7 @@ class DevSessionViewSet(viewsets.ModelViewSet):
             field = ordering.lstrip('-')
             if field in allowed:
                 qs = qs.order_by(ordering)
-        else:
+        elif not qs.query.order_by:
             qs = qs.order_by('-created_at')
 
         return qs
@@ -177,14 +287,13 @@ class DevSessionViewSet(viewsets.ModelViewSet):
 
         return Response(SessionTaskSerializer(st).data, status=status.HTTP_201_CREATED)
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=EXPORT_RENDERERS)
     def export(self, request):
         fmt = request.query_params.get('format', 'csv').lower()
         qs = self.get_queryset()
-        serializer = DevSessionSerializer(qs, many=True)
 
         if fmt == 'json':
-            return Response(serializer.data)
+            return Response(DevSessionSerializer(qs, many=True).data)
 
         fieldnames = [
             'id', 'title', 'status',
@@ -192,72 +301,243 @@ class DevSessionViewSet(viewsets.ModelViewSet):
             'switch_count', 'total_focus_minutes',
             'created_at', 'updated_at',
         ]
-        return csv_response('sessions.csv', fieldnames, serializer.data)
+        rows = qs.values_list(*fieldnames).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        if fmt == 'ndjson':
+            return stream_ndjson_response('sessions.ndjson', fieldnames, rows)
+        return stream_csv_response('sessions.csv', fieldnames, rows)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        data, code = DevSessionBulkUpsert(request).run(request.data)
+        return Response(data, status=code)
 
 
-class ContextSwitchViewSet(viewsets.ModelViewSet):
+class ContextSwitchViewSet(QueryPlanMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     serializer_class = ContextSwitchSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    pagination_class = KeysetCursorPagination
+    query_plans = dict.fromkeys(DETAIL_ACTIONS, {'select_related': ['dev_session']})
 
     def get_queryset(self):
-        return ContextSwitch.objects.filter(dev_session__user=self.request.user).order_by('-happened_at')
+        return ContextSwitch.objects.filter(user=self.request.user).order_by('-happened_at')
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        data = request.data if isinstance(request.data, dict) else {'switches': request.data}
+        serializer = ContextSwitchBulkSerializer(data=data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        switches = serializer.save()
+        return Response(ContextSwitchSerializer(switches, many=True).data, status=status.HTTP_201_CREATED)
 
 
-class ResourceLinkViewSet(viewsets.ModelViewSet):
+class ResourceLinkViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = ResourceLinkSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    query_plans = dict.fromkeys(DETAIL_ACTIONS, {'select_related': ['dev_session']})
 
     def get_queryset(self):
         return ResourceLink.objects.filter(
             dev_session__user=self.request.user
         ).order_by('-created_at')
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        data, code = ResourceLinkBulkUpsert(request).run(request.data)
+        return Response(data, status=code)
+
 
-class GeneratedReportViewSet(viewsets.ReadOnlyModelViewSet):
+class GeneratedReportViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = GeneratedReportSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
 
     def get_queryset(self):
         return GeneratedReport.objects.filter(user=self.request.user).order_by('-created_at')
 
 
+def report_day(request) -> date:
+    """The validated ``date`` of a report request body, defaulting to today."""
+    serializer = ReportDaySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data.get('date') or timezone.now().date()
+
+
 class DailyReportView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        day_str = request.data.get('date')
-        if day_str:
-            day = date.fromisoformat(day_str)
-        else:
-            day = timezone.now().date()
+        day = report_day(request)
+        report, created = ReportService.get_or_generate_daily_report(
+            request.user, day=day, force=is_truthy(request.query_params.get('force')),
+        )
+        return Response(
+            GeneratedReportSerializer(report).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class RangeReportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = RangeReportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = ReportService.generate_range_report(
+            request.user,
+            serializer.validated_data['start'],
+            serializer.validated_data['end'],
+        )
+        return Response(GeneratedReportSerializer(report).data, status=status.HTTP_201_CREATED)
+
+
+def date_range_params(request, default_days: int) -> tuple[date, date]:
+    """Validated ``?start=&end=`` days, defaulting to the ``default_days`` ending today."""
+    end = request.query_params.get('end') or timezone.localdate().isoformat()
+    start = request.query_params.get('start')
+    if not start:
+        try:
+            start = (date.fromisoformat(end) - timedelta(days=default_days - 1)).isoformat()
+        except ValueError:
+            start = end
+    serializer = RangeReportSerializer(data={'start': start, 'end': end})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data['start'], serializer.validated_data['end']
+
+
+class ContextSwitchAnalyticsView(APIView):
+    """
+    Per-task dwell time, switch reasons and an hour-of-day heatmap for
+    ``?start=&end=`` (inclusive days, default the last 30).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    DEFAULT_DAYS = 30
+
+    def get(self, request):
+        start, end = date_range_params(request, self.DEFAULT_DAYS)
+        return Response(ContextSwitchAnalytics.for_user(request.user, start, end))
 
-        report = ReportService.generate_daily_report(request.user, day=day)
+
+class SyncView(APIView):
+    """
+    Everything created, updated or deleted since ``?since=<token>``, at most
+    ``?limit=`` rows per page. Follow ``next`` while ``has_more`` is true;
+    without ``since`` the first page of a full sync is returned.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        limit = request.query_params.get('limit')
+        if limit is not None and (not limit.isdigit() or int(limit) < 1):
+            return Response({'limit': ['Must be a positive integer.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            data = SyncService.changes(
+                request.user, since=request.query_params.get('since'), limit=int(limit) if limit else None,
+            )
+        except SyncTokenExpired:
+            return Response(
+                {'detail': 'Sync token has expired; start a full sync without since.'}, status=status.HTTP_410_GONE,
+            )
+        return Response(data)
+
+
+class WeeklyReportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        day = report_day(request)
+        report = ReportService.generate_weekly_report(request.user, day=day)
         return Response(GeneratedReportSerializer(report).data, status=status.HTTP_201_CREATED)
 
 
-class AsyncDailyReportView(APIView):
+class AsyncDailyReportView(AsyncAPIView):
+    """
+    Daily report plus external enrichment, fetched concurrently.
 
+    If the report is not ready within the latency budget, the response is
+    202 with a queued ReportRequest. The generation already started still
+    finishes; whichever of it and the Celery job stores the fingerprint
+    first wins, and the other returns that report.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     async def post(self, request):
-        payload = {
-            "user_id": request.user.id,
-            "now": timezone.now().isoformat(),
-        }
+        user = request.user
+        day = timezone.now().date()
+        budget = latency_budget()
 
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        generate = asyncio.ensure_future(sync_to_async(ReportService.get_or_generate_daily_report)(
+            user, day=day, force=is_truthy(request.query_params.get('force')),
+        ))
+        external = asyncio.ensure_future(fetch_external_enrichment(user, timeout=budget))
+
+        try:
             try:
-                resp = await client.post("https://httpbin.org/post", json=payload)
-                external_data = resp.json()
-            except Exception:
-                external_data = {"error": "external service unavailable"}
+                report, created = await asyncio.wait_for(asyncio.shield(generate), timeout=budget)
+            except asyncio.TimeoutError:
+                req, created = await sync_to_async(ReportRequestQueue.submit)(user, ReportRequest.TYPE_DAILY, day)
+                if created:
+                    await sync_to_async(process_report_request.delay)(req.id)
+                return Response(ReportRequestSerializer(req).data, status=status.HTTP_202_ACCEPTED)
+
+            data = GeneratedReportSerializer(report).data
+            data["external"] = await external
+            return Response(data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        finally:
+            # No-op once it finished; otherwise the enrichment call must not outlive the request.
+            external.cancel()
+
+
+EXTERNAL_ENRICHMENT_URL = "https://httpbin.org/post"
+
+
+async def fetch_external_enrichment(user, timeout: float) -> dict:
+    payload = {
+        "user_id": user.id,
+        "now": timezone.now().isoformat(),
+    }
+    try:
+        resp = await get_integration('enrichment').post(EXTERNAL_ENRICHMENT_URL, json=payload, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+    except (IntegrationError, httpx.HTTPError, ValueError):
+        return {"error": "external service unavailable"}
+
+
+class GitHubImportView(AsyncAPIView):
+    """
+    Imports a repo's issues inline when that fits the latency budget.
+
+    Otherwise the inline import is cancelled and handed to Celery, and the
+    response is 202. Pages are upserted, so a page saved before the
+    cancellation is simply written again by the job.
+    """
+    permission_classes = [permissions.IsAuthenticated]
 
-        report = await sync_to_async(ReportService.generate_daily_report)(request.user)
+    async def post(self, request):
+        owner = request.data.get('owner')
+        repo = request.data.get('repo')
+        team_id = request.data.get('team_id')
 
-        data = GeneratedReportSerializer(report).data
-        data["external"] = external_data
+        if not owner or not repo:
+            return Response({"detail": "owner and repo are required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        team = None
+        if team_id:
+            try:
+                team = await Team.objects.aget(pk=team_id)
+            except (Team.DoesNotExist, ValueError):
+                return Response({"detail": "team not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        job = asyncio.ensure_future(GitHubImporter.import_issues_for_repo(owner, repo, team=team))
+        try:
+            tasks = await asyncio.wait_for(job, timeout=latency_budget())
+        except asyncio.TimeoutError:
+            result = await sync_to_async(import_github_issues.delay)(owner, repo, team.pk if team else None)
+            return Response({"status": "queued", "task_id": result.id}, status=status.HTTP_202_ACCEPTED)
+        except GitHubIntegrationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(data, status=status.HTTP_201_CREATED)
+        return Response(TaskSerializer(tasks, many=True).data, status=status.HTTP_201_CREATED)
 
 
 class TeamViewSet(viewsets.ModelViewSet):
@@ -265,10 +545,7 @@ class TeamViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Team.objects.filter(
-            models.Q(owner=self.request.user) |
-            models.Q(members=self.request.user)
-        ).distinct()
+        return TeamPermissionService.filter_queryset(self.request.user, Team.objects.order_by('pk'), team_field='pk')
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
@@ -279,6 +556,15 @@ class TeamViewSet(viewsets.ModelViewSet):
         memberships = TeamMembership.objects.filter(team=team).select_related('user')
         return Response(TeamMembershipSerializer(memberships, many=True).data)
 
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Per-member and total sessions, focus minutes and switches for ``?start=&end=`` (default 7 days)."""
+        team = self.get_object()
+        if not TeamPermissionService.user_in_team(request.user, team):
+            raise PermissionDenied()
+        start, end = date_range_params(request, default_days=7)
+        return Response(TeamStatsService.stats(team, start, end))
+
 
 class ReportRequestViewSet(viewsets.ModelViewSet):
     serializer_class = ReportRequestSerializer
@@ -287,36 +573,96 @@ class ReportRequestViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return ReportRequest.objects.filter(user=self.request.user).order_by('-created_at')
 
-    def perform_create(self, serializer):
-        req = serializer.save(user=self.request.user)
-        process_report_request.delay(req.id)
+    def create(self, request, *args, **kwargs):
+        """An identical pending or running request is returned (200) instead of queueing another."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        req, created = ReportRequestQueue.submit(request.user, **serializer.validated_data)
+        if created:
+            process_report_request.delay(req.id)
+        return Response(
+            self.get_serializer(req).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
 
 
-class InsightViewSet(viewsets.ReadOnlyModelViewSet):
+class InsightViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = InsightSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
 
     def get_queryset(self):
         return Insight.objects.filter(user=self.request.user).order_by('-created_at')
 
 
 class EventStreamView(View):
-
-    def get(self, request):
-        user = request.user
+    """
+    Server-Sent Events stream of the user's reports, insights, context
+    switches and report request status changes.
+
+    The view is async: under ASGI each open stream is a coroutine parked on
+    its queue rather than a worker thread. Clients resume with the standard
+    ``Last-Event-ID`` header (or ``?last_event_id=``). Under WSGI the
+    endless stream would be buffered to completion and hold the worker
+    forever, so it answers 501 instead.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse('The event stream needs an ASGI server.', status=501, content_type='text/plain')
+        user = await request.auser()
         if not user.is_authenticated:
             return HttpResponse(status=401)
 
-        def event_stream():
-            reports = GeneratedReport.objects.filter(user=user).order_by('-created_at')[:5]
-            insights = Insight.objects.filter(user=user).order_by('-created_at')[:5]
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        response = StreamingHttpResponse(
+            stream_events(user.pk, last_event_id),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
-            yield 'event: reports\n'
-            yield f'data: {GeneratedReportSerializer(reports, many=True).data}\n\n'
 
-            yield 'event: insights\n'
-            yield f'data: {InsightSerializer(insights, many=True).data}\n\n'
+class CacheStatsView(APIView):
+    """Hit/miss counters of this worker's in-process caches, for tuning sizes and TTLs."""
+    permission_classes = [permissions.IsAdminUser]
 
-        response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
-        response['Cache-Control'] = 'no-cache'
-        return response
+    def get(self, request):
+        cache = ActiveSessionService.cache()
+        return Response({
+            'dev_sessions': {**cache.stats.as_dict(), 'size': len(cache), 'max_size': cache.max_size, 'ttl': cache.ttl},
+        })
+
+
+class ReportQueueStatsView(APIView):
+    """Report requests per state, queue depth and the age of the oldest pending request."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(ReportRequestQueue.stats())
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """``Authorization: Bearer <METRICS['TOKEN']>``, for scrapers that cannot log in."""
+
+    def has_permission(self, request, view):
+        token = metrics_settings()['TOKEN']
+        return bool(token) and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+class MetricsView(APIView):
+    """Per-route request counts and latency, query and size quantiles of this process, for Prometheus."""
+    permission_classes = [HasMetricsToken | permissions.IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request):
+        return Response(get_metrics_registry().prometheus())
+
+
+class IntegrationStatsView(APIView):
+    """Per-upstream request, failure and retry counters, latency percentiles and circuit state."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(integration_stats())
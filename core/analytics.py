@@ -0,0 +1,138 @@
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import Count, DateTimeField, F, FloatField, Func, IntegerField, Value, Window
+from django.db.models.functions import Cast, Coalesce, Greatest, Lag
+from django.utils import timezone
+
+from core.models import ContextSwitch, Task
+from core.services import day_bounds
+
+# Heatmap rows are grouped in UTC buckets this wide, then placed in local
+# time. 15 minutes divides every real UTC offset, so no bucket straddles a
+# local hour.
+HEATMAP_BUCKET_SECONDS = 900
+
+
+class EpochSeconds(Func):
+    """
+    Seconds since the Unix epoch, computed by the database itself.
+
+    Django's datetime subtraction and ``Extract*`` go through Python
+    functions on SQLite, called once per row. This stays in native SQL on
+    every backend.
+    """
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            # julianday() is a float day count; round off its sub-millisecond noise.
+            template='ROUND((julianday(%(expressions)s) - 2440587.5) * 86400.0, 3)',
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)', **extra_context)
+
+
+class ContextSwitchAnalytics:
+    """
+    Where a user's time went between context switches.
+
+    Each switch closes a segment spent on its ``from_task``. The segment
+    starts at the previous switch of the same session, or at the session
+    start for the first one, clipped to the start of the range. The time
+    after a session's last switch has no closing switch and is not counted.
+    All grouping happens in the database; only grouped rows reach Python.
+    """
+
+    @staticmethod
+    def switches(user, start, end):
+        return (
+            ContextSwitch.objects
+            .filter(dev_session__user=user, happened_at__gte=start, happened_at__lt=end)
+            .order_by()
+        )
+
+    @staticmethod
+    def segments(user, start, end):
+        """One row per switch in ``[start, end)``: ``from_task_id``, ``reason`` and ``dwell`` in seconds."""
+        previous = Window(Lag('happened_at'), partition_by=F('dev_session_id'), order_by=F('happened_at').asc())
+        segment_start = Coalesce(
+            previous,
+            Greatest(F('dev_session__started_at'), Value(start, output_field=DateTimeField())),
+        )
+        return (
+            ContextSwitchAnalytics.switches(user, start, end)
+            .annotate(dwell=EpochSeconds('happened_at') - EpochSeconds(segment_start))
+            .values('from_task_id', 'reason', 'dwell')
+        )
+
+    @staticmethod
+    def grouped_segments(user, start, end) -> list[tuple]:
+        """
+        ``(from_task_id, reason, switches, dwell_seconds)`` rows.
+
+        An aggregate cannot wrap a window function, so the windowed
+        queryset becomes a derived table that the outer query groups.
+        """
+        segments = ContextSwitchAnalytics.segments(user, start, end)
+        sql, params = segments.query.sql_with_params()
+        with connections[segments.db].cursor() as cursor:
+            cursor.execute(
+                'SELECT seg.from_task_id, seg.reason, COUNT(*), SUM(seg.dwell) '
+                f'FROM ({sql}) seg GROUP BY seg.from_task_id, seg.reason',
+                params,
+            )
+            return [(task_id, reason, count, float(dwell or 0)) for task_id, reason, count, dwell in cursor.fetchall()]
+
+    @staticmethod
+    def heatmap(user, start, end) -> list[list[int]]:
+        """Switch counts as 7 rows (Monday first) of 24 hours, in the current time zone."""
+        bucket = Cast(EpochSeconds('happened_at') / Value(HEATMAP_BUCKET_SECONDS), IntegerField())
+        rows = (
+            ContextSwitchAnalytics.switches(user, start, end)
+            .annotate(bucket=bucket)
+            .values('bucket')
+            .annotate(count=Count('id'))
+            .values_list('bucket', 'count')
+        )
+        tz = timezone.get_current_timezone()
+        grid = [[0] * 24 for _ in range(7)]
+        for bucket_index, count in rows:
+            local = datetime.fromtimestamp(bucket_index * HEATMAP_BUCKET_SECONDS, tz)
+            grid[local.weekday()][local.hour] += count
+        return grid
+
+    @staticmethod
+    def for_user(user, start_day, end_day) -> dict:
+        start, _ = day_bounds(start_day)
+        _, end = day_bounds(end_day)
+
+        tasks: dict = {}
+        reasons = {value: {'reason': value, 'switches': 0, 'dwell_seconds': 0.0}
+                   for value, _ in ContextSwitch.REASON_CHOICES}
+        for task_id, reason, count, dwell in ContextSwitchAnalytics.grouped_segments(user, start, end):
+            task = tasks.setdefault(task_id, {'task': task_id, 'title': None, 'switches': 0, 'dwell_seconds': 0.0})
+            bucket = reasons.setdefault(reason, {'reason': reason, 'switches': 0, 'dwell_seconds': 0.0})
+            for entry in (task, bucket):
+                entry['switches'] += count
+                entry['dwell_seconds'] += dwell
+
+        titles = dict(Task.objects.filter(pk__in=[pk for pk in tasks if pk is not None]).values_list('id', 'title'))
+        for task in tasks.values():
+            task['title'] = titles.get(task['task'])
+        for entry in [*tasks.values(), *reasons.values()]:
+            entry['avg_dwell_seconds'] = round(entry['dwell_seconds'] / entry['switches'], 1) if entry['switches'] else None
+            entry['dwell_seconds'] = round(entry['dwell_seconds'], 1)
+
+        return {
+            'start': start_day,
+            'end': end_day,
+            'total_switches': sum(r['switches'] for r in reasons.values()),
+            'tasks': sorted(tasks.values(), key=lambda t: (-t['dwell_seconds'], t['task'] or 0)),
+            'reasons': list(reasons.values()),
+            'heatmap': ContextSwitchAnalytics.heatmap(user, start, end),
+        }
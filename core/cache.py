@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Hashable
+
+from django.core.cache import cache as shared_cache
+
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        lookups = self.hits + self.misses
+        data['hit_ratio'] = round(self.hits / lookups, 4) if lookups else 0.0
+        return data
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries also expire after ``ttl`` seconds.
+
+    It is per process, so ``delete`` only invalidates the local copy;
+    other workers see a change once their entry expires. Keep ``ttl``
+    short for data that other processes write.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max(int(max_size), 1)
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self.clock():
+                    self._data.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                del self._data[key]
+                self.stats.expirations += 1
+            self.stats.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def version_tokens(keys: list[str]) -> list[int]:
+    """
+    Current version tokens for ``keys`` in the shared cache, creating missing ones.
+
+    Keys built from these tokens are invalidated by ``bump_version`` rather than
+    deleted. Tokens are timestamps rather than counters, so a token that gets
+    evicted and recreated never matches an older entry.
+    """
+    found = shared_cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        shared_cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump_version(key: str) -> None:
+    shared_cache.set(key, time.time_ns(), None)
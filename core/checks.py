@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_team_permission_cache(app_configs, **kwargs):
+    """A shared role map in a per-process cache would outlive revocations made elsewhere."""
+    if not getattr(settings, 'TEAM_PERMISSION_CACHE', {}).get('SHARED', False):
+        return []
+    if not isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return []
+    return [Error(
+        "TEAM_PERMISSION_CACHE['SHARED'] needs a default cache shared by every process.",
+        hint='Point CACHES at Redis or Memcached, or set SHARED to False.',
+        id='core.E001',
+    )]
@@ -0,0 +1,240 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+EVENT_REPORT_CREATED = 'report.created'
+EVENT_INSIGHT_CREATED = 'insight.created'
+EVENT_CONTEXT_SWITCH = 'context_switch'
+EVENT_REPORT_REQUEST_STATUS = 'report_request.status'
+# Sent instead of a replay when the client's Last-Event-ID is no longer buffered.
+EVENT_RESYNC = 'resync'
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    seq: int
+    user_id: int
+    type: str
+    data: dict
+
+    def as_sse(self) -> str:
+        payload = json.dumps(self.data, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return f'id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n'
+
+
+class Subscription:
+    """A single stream's inbox; ``closed`` is set when it fell too far behind."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def deliver(self, event: Event) -> None:
+        # Runs on the subscriber's event loop.
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: end the stream and let the client resume
+            # from its Last-Event-ID through the replay buffer.
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class EventBroker:
+    """
+    Per-user pub/sub for the SSE stream.
+
+    ``publish`` may be called from any thread. ``subscribe`` is an async
+    context manager that yields a ``Subscription`` plus the buffered events
+    after ``last_event_id``, or ``None`` when they can no longer be
+    replayed and the client should resync.
+    """
+
+    def publish(self, user_id: int, type: str, data: dict) -> Event:
+        raise NotImplementedError
+
+    def subscribe(self, user_id: int, last_event_id: Optional[str] = None):
+        raise NotImplementedError
+
+
+class InProcessBroker(EventBroker):
+    """
+    Broker that only reaches streams served by the same process.
+
+    Event ids are ``<boot>-<seq>`` so a Last-Event-ID issued before a restart
+    is recognised and answered with a resync instead of a silent gap. Each
+    user keeps the last ``replay_size`` events for resuming, and only the
+    ``replay_users`` users who most recently got an event keep a buffer.
+    """
+
+    def __init__(self, replay_size: int = 500, queue_size: int = 100, replay_users: int = 10000):
+        self.replay_size = replay_size
+        self.queue_size = queue_size
+        self.replay_users = max(int(replay_users), 1)
+        self.boot = str(int(time.time() * 1000))
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        # Least recently published-to user first.
+        self._replay: OrderedDict[int, deque[Event]] = OrderedDict()
+        self._evicted: dict[int, int] = {}
+        # Newest event seq in any dropped buffer. Ids at or after it may be
+        # resumed; anything older may have lost events and must resync.
+        self._dropped_seq = 0
+        self._subscribers: dict[int, set[Subscription]] = {}
+
+    def publish(self, user_id, type, data):
+        with self._lock:
+            seq = next(self._seq)
+            event = Event(id=f'{self.boot}-{seq}', seq=seq, user_id=user_id, type=type, data=data)
+            buffered = self._replay.get(user_id)
+            if buffered is None:
+                buffered = self._replay[user_id] = deque(maxlen=self.replay_size)
+                if self._dropped_seq:
+                    # This user's earlier buffer may have been dropped.
+                    self._evicted[user_id] = self._dropped_seq
+                while len(self._replay) > self.replay_users:
+                    self._drop_oldest_buffer()
+            else:
+                self._replay.move_to_end(user_id)
+            if len(buffered) == self.replay_size:
+                self._evicted[user_id] = buffered[0].seq
+            buffered.append(event)
+            subscribers = list(self._subscribers.get(user_id, ()))
+
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The stream's loop is already closed; unsubscribe will clean up.
+                pass
+        return event
+
+    def replay_after(self, user_id: int, last_event_id: Optional[str]) -> Optional[list[Event]]:
+        if not last_event_id:
+            return []
+
+        boot, _, seq = last_event_id.partition('-')
+        if boot != self.boot or not seq.isdigit():
+            return None
+
+        seq = int(seq)
+        with self._lock:
+            buffered = self._replay.get(user_id)
+            if buffered is None:
+                return None if self._dropped_seq > seq else []
+            if self._evicted.get(user_id, 0) > seq:
+                return None
+            return [event for event in buffered if event.seq > seq]
+
+    def _drop_oldest_buffer(self) -> None:
+        user_id, buffered = self._replay.popitem(last=False)
+        self._evicted.pop(user_id, None)
+        if buffered:
+            self._dropped_seq = max(self._dropped_seq, buffered[-1].seq)
+
+    def subscribe(self, user_id, last_event_id=None):
+        return _Subscribe(self, user_id, last_event_id)
+
+    def _add(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.setdefault(subscription.user_id, set()).add(subscription)
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+class _Subscribe:
+    def __init__(self, broker: InProcessBroker, user_id: int, last_event_id: Optional[str]):
+        self.broker = broker
+        self.subscription = Subscription(user_id, asyncio.get_running_loop(), broker.queue_size)
+        self.last_event_id = last_event_id
+
+    async def __aenter__(self):
+        # Register before reading the replay buffer so nothing published in
+        # between is lost; the stream skips queued events it already replayed.
+        self.broker._add(self.subscription)
+        return self.subscription, self.broker.replay_after(self.subscription.user_id, self.last_event_id)
+
+    async def __aexit__(self, *exc):
+        self.broker._remove(self.subscription)
+
+
+async def stream_events(user_id: int, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+    config = getattr(settings, 'EVENT_STREAM', {})
+    heartbeat = config.get('HEARTBEAT_INTERVAL', 15)
+
+    async with get_event_broker().subscribe(user_id, last_event_id) as (subscription, replay):
+        yield f'retry: {config.get("RETRY_MS", 3000)}\n\n'
+
+        last_seq = 0
+        if replay is None:
+            yield f'event: {EVENT_RESYNC}\ndata: {{}}\n\n'
+        else:
+            for event in replay:
+                last_seq = event.seq
+                yield event.as_sse()
+
+        while not subscription.closed:
+            try:
+                event = await subscription.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+            if event is None:
+                break
+            if event.seq > last_seq:
+                last_seq = event.seq
+                yield event.as_sse()
+
+
+def publish_event(user_id: int, type: str, data: dict) -> None:
+    """Publish once the surrounding transaction commits, so listeners never see rolled-back rows."""
+    transaction.on_commit(lambda: get_event_broker().publish(user_id, type, data))
+
+
+_broker: Optional[EventBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker() -> EventBroker:
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, 'EVENT_STREAM', {})
+                broker_cls = import_string(config.get('BROKER', 'core.events.InProcessBroker'))
+                _broker = broker_cls(
+                    replay_size=config.get('REPLAY_SIZE', 500),
+                    queue_size=config.get('QUEUE_SIZE', 100),
+                    replay_users=config.get('REPLAY_USERS', 10000),
+                )
+    return _broker
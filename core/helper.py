@@ -1,24 +1,172 @@
-from django.http import HttpResponse
+from datetime import date, datetime
+from typing import Iterable, Optional, Sequence
 import csv
+import json
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Value
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+
+from core.cache import bump_version, version_tokens
 from core.models import TeamMembership, Team
 
+EXPORT_CHUNK_SIZE = 2000
+
+_datetime_field = serializers.DateTimeField()
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _export_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return _datetime_field.to_representation(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _chunked(lines: Iterable[str], size: int = 500) -> Iterable[str]:
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
 
-def csv_response(filename: str, fieldnames, rows):
-    response = HttpResponse(content_type='text/csv; charset=utf-8')
+def stream_csv_response(filename: str, fieldnames: Sequence[str], rows: Iterable[Sequence]) -> StreamingHttpResponse:
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(fieldnames)
+        for row in rows:
+            yield writer.writerow([_export_value(value) for value in row])
+
+    response = StreamingHttpResponse(_chunked(lines()), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_ndjson_response(filename: str, fieldnames: Sequence[str], rows: Iterable[Sequence]) -> StreamingHttpResponse:
+    def lines():
+        for row in rows:
+            record = {field: value for field, value in zip(fieldnames, row)}
+            yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+    response = StreamingHttpResponse(_chunked(lines()), content_type='application/x-ndjson')
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    writer = csv.writer(response)
-    writer.writerow(fieldnames)
-    for row in rows:
-        writer.writerow([row.get(field, '') for field in fieldnames])
     return response
 
 
+def is_truthy(value) -> bool:
+    return str(value).strip().lower() in {'1', 'true', 'yes', 'on'}
+
+
 class TeamPermissionService:
+    """
+    Team access checks answered from one lookup of the user's teams and roles.
+
+    The ``{team_id: role}`` map is loaded once per user object, so once per
+    request, the way Django's ModelBackend caches permissions. Owners get
+    ``ROLE_OWNER`` whether or not they have a membership row. With
+    ``TEAM_PERMISSION_CACHE['SHARED']`` the map is also kept in the default
+    cache under a per-user version token that membership and ownership
+    changes bump; that cache must be shared by every process (see
+    ``core.checks``), or the others keep a revoked role until TIMEOUT.
+    """
+    ROLE_ORDER = [
+        TeamMembership.ROLE_VIEWER,
+        TeamMembership.ROLE_MEMBER,
+        TeamMembership.ROLE_ADMIN,
+        TeamMembership.ROLE_OWNER,
+    ]
+    CACHE_ATTR = '_team_roles_cache'
+    KEY_PREFIX = 'team-roles'
+
+    @staticmethod
+    def roles(user) -> dict[int, str]:
+        if user is None or not user.is_authenticated:
+            return {}
+        roles = getattr(user, TeamPermissionService.CACHE_ATTR, None)
+        if roles is None:
+            config = getattr(settings, 'TEAM_PERMISSION_CACHE', {})
+            if config.get('SHARED', False):
+                version, = version_tokens([TeamPermissionService._version_key(user.pk)])
+                key = f'{TeamPermissionService.KEY_PREFIX}:{user.pk}:{version}'
+                roles = cache.get(key)
+                if roles is None:
+                    roles = TeamPermissionService._load(user.pk)
+                    cache.set(key, roles, config.get('TIMEOUT', 300))
+            else:
+                roles = TeamPermissionService._load(user.pk)
+            setattr(user, TeamPermissionService.CACHE_ATTR, roles)
+        return roles
+
+    @staticmethod
+    def _load(user_id: int) -> dict[int, str]:
+        rows = (
+            TeamMembership.objects.filter(user_id=user_id).values_list('team_id', 'role')
+            .union(Team.objects.filter(owner_id=user_id).values_list('id', Value(TeamMembership.ROLE_OWNER)), all=True)
+        )
+        roles: dict[int, str] = {}
+        for team_id, role in rows:
+            if roles.get(team_id) != TeamMembership.ROLE_OWNER:
+                roles[team_id] = role
+        return roles
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return f'{TeamPermissionService.KEY_PREFIX}:user:{user_id}'
+
+    @staticmethod
+    def invalidate(user_id: int) -> None:
+        bump_version(TeamPermissionService._version_key(user_id))
+
+    @staticmethod
+    def allowed_roles(min_role: Optional[str]) -> set[str]:
+        if min_role is None:
+            return set(TeamPermissionService.ROLE_ORDER)
+        return set(TeamPermissionService.ROLE_ORDER[TeamPermissionService.ROLE_ORDER.index(min_role):])
+
+    @staticmethod
+    def team_ids(user, min_role: Optional[str] = None) -> set[int]:
+        """Teams where the user has ``min_role`` or higher (any role by default)."""
+        allowed = TeamPermissionService.allowed_roles(min_role)
+        return {team_id for team_id, role in TeamPermissionService.roles(user).items() if role in allowed}
+
+    @staticmethod
+    def role_in_team(user, team) -> Optional[str]:
+        if team is None:
+            return None
+        team_id = team if isinstance(team, int) else team.pk
+        return TeamPermissionService.roles(user).get(team_id)
+
+    @staticmethod
+    def has_role(user, team, min_role: Optional[str] = None) -> bool:
+        role = TeamPermissionService.role_in_team(user, team)
+        return role is not None and role in TeamPermissionService.allowed_roles(min_role)
+
     @staticmethod
     def user_in_team(user, team: Team) -> bool:
         if team is None:
             return False
         if team.owner_id == user.id:
             return True
-        return TeamMembership.objects.filter(team=team, user=user).exists()
+        return TeamPermissionService.has_role(user, team)
+
+    @staticmethod
+    def filter_queryset(user, queryset, team_field: str = 'team', min_role: Optional[str] = None):
+        """Restrict ``queryset`` to rows whose ``team_field`` is one of the user's allowed teams."""
+        return queryset.filter(**{f'{team_field}__in': TeamPermissionService.team_ids(user, min_role)})
@@ -0,0 +1,284 @@
+import asyncio
+import importlib.util
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Callable, Optional
+
+import httpx
+from django.conf import settings
+
+# HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``).
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+class IntegrationError(Exception):
+    pass
+
+
+class CircuitOpenError(IntegrationError):
+    pass
+
+
+def build_async_client(**overrides) -> httpx.AsyncClient:
+    config = getattr(settings, 'OUTBOUND_HTTP', {})
+    options = dict(
+        timeout=httpx.Timeout(config.get('TIMEOUT', 10.0), connect=config.get('CONNECT_TIMEOUT', 3.0)),
+        limits=httpx.Limits(
+            max_connections=config.get('MAX_CONNECTIONS', 100),
+            max_keepalive_connections=config.get('MAX_KEEPALIVE_CONNECTIONS', 20),
+            keepalive_expiry=config.get('KEEPALIVE_EXPIRY', 30.0),
+        ),
+        http2=config.get('HTTP2', True) and HTTP2_AVAILABLE,
+    )
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+def get_async_client(loop: Optional[asyncio.AbstractEventLoop] = None) -> httpx.AsyncClient:
+    """
+    The worker's pooled ``AsyncClient`` for outbound calls.
+
+    httpx connections belong to the event loop that opened them, so there is
+    one client per loop. Under ASGI that is one per worker process. Callers
+    must not close it. Code on a short-lived loop, such as ``async_to_sync``
+    in a Celery task, should pass its own ``build_async_client()`` instead,
+    or each call leaves an open client behind.
+    """
+    loop = loop or asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        with _clients_lock:
+            client = _clients.get(loop)
+            if client is None or client.is_closed:
+                client = build_async_client()
+                _clients[loop] = client
+    return client
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``recovery_timeout`` seconds. After that it lets one probe call
+    through (half-open): success closes it and failure opens it again. A
+    probe that ends without either, such as a cancelled one, calls
+    ``release`` so the next caller can probe.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def release(self) -> None:
+        """Free the probe slot without a verdict on the upstream."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._probing = False
+
+
+class UpstreamMetrics:
+    """Per-upstream counters plus a window of recent latencies for percentiles."""
+
+    def __init__(self, window: int = 1000):
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.latencies_ms: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, latency_ms: float, failed: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.failures += int(failed)
+            self.latencies_ms.append(latency_ms)
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.latencies_ms)
+            data = {
+                'requests': self.requests,
+                'failures': self.failures,
+                'retries': self.retries,
+                'short_circuited': self.short_circuited,
+            }
+        for name, q in (('p50_ms', 0.5), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+            data[name] = round(latencies[min(int(q * len(latencies)), len(latencies) - 1)], 2) if latencies else None
+        return data
+
+
+class IntegrationClient:
+    """
+    Outbound calls to one upstream: pooled connections, retries and a circuit breaker.
+
+    Idempotent requests are retried on connection errors and on
+    ``retry_statuses``, with full-jitter exponential backoff (a
+    ``Retry-After`` header is honoured). Any request is retried on a connect
+    error, since the request was never sent. Transport errors and 5xx count
+    as failures for the breaker. While the breaker is open, calls raise
+    ``CircuitOpenError`` without touching the network.
+    """
+
+    def __init__(self, name: str, retries: int = 2, backoff: float = 0.2, max_backoff: float = 5.0,
+                 retry_statuses=(502, 503, 504), breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[UpstreamMetrics] = None, client: Optional[httpx.AsyncClient] = None):
+        self.name = name
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(retry_statuses)
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or UpstreamMetrics()
+        self.client = client
+
+    def with_client(self, client: httpx.AsyncClient) -> 'IntegrationClient':
+        """Same upstream, breaker and metrics, over a caller-supplied client."""
+        return IntegrationClient(
+            self.name, self.retries, self.backoff, self.max_backoff, self.retry_statuses,
+            breaker=self.breaker, metrics=self.metrics, client=client,
+        )
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        client = self.client or get_async_client()
+
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                self.metrics.incr('short_circuited')
+                raise CircuitOpenError(f'{self.name} is unavailable (circuit open)')
+
+            last_attempt = attempt == self.retries
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, url, **kwargs)
+            except httpx.TransportError as exc:
+                self._observe(start, failed=True)
+                if last_attempt or not (idempotent or isinstance(exc, httpx.ConnectError)):
+                    raise IntegrationError(f'{self.name} request failed: {exc!r}') from exc
+                await self._sleep(attempt)
+                continue
+            except BaseException:
+                # Cancelled (e.g. by a timeout) or broken outside the transport.
+                self.breaker.release()
+                raise
+
+            failed = resp.status_code >= 500
+            self._observe(start, failed=failed)
+            if resp.status_code in self.retry_statuses and idempotent and not last_attempt:
+                await self._sleep(attempt, resp.headers.get('Retry-After'))
+                continue
+            return resp
+
+    def _observe(self, start: float, failed: bool) -> None:
+        self.metrics.observe((time.perf_counter() - start) * 1000.0, failed)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    async def _sleep(self, attempt: int, retry_after: Optional[str] = None) -> None:
+        self.metrics.incr('retries')
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = min(max(float(retry_after), delay), self.max_backoff)
+            except ValueError:
+                pass
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_integrations: dict[str, IntegrationClient] = {}
+_integrations_lock = threading.Lock()
+
+
+def get_integration(name: str) -> IntegrationClient:
+    """Process-wide client for ``name``, configured from ``settings.INTEGRATIONS``."""
+    integration = _integrations.get(name)
+    if integration is None:
+        with _integrations_lock:
+            integration = _integrations.get(name)
+            if integration is None:
+                config = getattr(settings, 'INTEGRATIONS', {}).get(name, {})
+                integration = IntegrationClient(
+                    name,
+                    retries=config.get('RETRIES', 2),
+                    backoff=config.get('BACKOFF', 0.2),
+                    max_backoff=config.get('MAX_BACKOFF', 5.0),
+                    breaker=CircuitBreaker(
+                        failure_threshold=config.get('FAILURE_THRESHOLD', 5),
+                        recovery_timeout=config.get('RECOVERY_TIMEOUT', 30.0),
+                    ),
+                )
+                _integrations[name] = integration
+    return integration
+
+
+def integration_stats() -> dict:
+    with _integrations_lock:
+        integrations = list(_integrations.values())
+    return {
+        integration.name: {**integration.metrics.as_dict(), 'circuit': integration.breaker.state}
+        for integration in integrations
+    }
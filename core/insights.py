@@ -0,0 +1,151 @@
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from core.events import publish_event, EVENT_INSIGHT_CREATED
+from core.models import GeneratedReport, Insight
+
+
+@dataclass(frozen=True)
+class ReportFeatures:
+    """The numbers rules look at, extracted once per report."""
+    report_id: int
+    user_id: int
+    report_type: str
+    session_count: int
+    switch_count: int
+    focus_minutes: int
+    switches_by_reason: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_report(cls, report: GeneratedReport) -> 'ReportFeatures':
+        payload = report.payload or {}
+        sessions = payload.get('sessions', [])
+        totals = payload.get('totals')
+        if totals is not None:
+            session_count = totals.get('session_count', len(sessions))
+            switch_count = totals.get('switch_count', 0)
+            focus_minutes = totals.get('focus_minutes', 0)
+            switches_by_reason = totals.get('switches_by_reason', {})
+        else:
+            session_count = len(sessions)
+            switch_count = sum(s.get('switch_count', 0) for s in sessions)
+            focus_minutes = sum(s.get('total_focus_minutes', 0) for s in sessions)
+            switches_by_reason = {}
+
+        return cls(
+            report_id=report.pk,
+            user_id=report.user_id,
+            report_type=report.type,
+            session_count=session_count,
+            switch_count=switch_count,
+            focus_minutes=focus_minutes,
+            switches_by_reason=switches_by_reason,
+        )
+
+
+class InsightRule:
+    """
+    One insight. Subclasses set ``code``, ``level`` and ``message``, and
+    ``evaluate`` returns the insight's ``meta`` when the rule fires or
+    ``None`` when it does not.
+    """
+    code: str = ''
+    level: str = Insight.LEVEL_INFO
+    message: str = ''
+    report_types: Optional[set[str]] = None
+
+    def applies_to(self, features: ReportFeatures) -> bool:
+        return self.report_types is None or features.report_type in self.report_types
+
+    def evaluate(self, features: ReportFeatures) -> Optional[dict]:
+        raise NotImplementedError
+
+
+_registry: list[type[InsightRule]] = []
+
+
+def register_rule(rule_cls: type[InsightRule]) -> type[InsightRule]:
+    _registry.append(rule_cls)
+    return rule_cls
+
+
+def registered_rules() -> list[InsightRule]:
+    return [rule_cls() for rule_cls in _registry]
+
+
+@register_rule
+class HighContextSwitchingRule(InsightRule):
+    code = 'HIGH_CONTEXT_SWITCHING'
+    level = Insight.LEVEL_WARN
+    message = 'High context switching detected; consider reducing parallel tasks.'
+    threshold = 10
+
+    def evaluate(self, features):
+        if features.switch_count > self.threshold:
+            return {'total_switches': features.switch_count}
+        return None
+
+
+@register_rule
+class LowFocusTimeRule(InsightRule):
+    code = 'LOW_FOCUS_TIME'
+    level = Insight.LEVEL_INFO
+    message = 'Low focused coding time today; maybe schedule a longer deep-work block.'
+    report_types = {GeneratedReport.TYPE_DAILY}
+    threshold = 60
+
+    def evaluate(self, features):
+        if features.focus_minutes < self.threshold:
+            return {'total_focus_minutes': features.focus_minutes}
+        return None
+
+
+class InsightEngine:
+    """
+    Runs every rule over a batch of reports and writes all hits with one
+    ``bulk_create`` per ``batch_size`` insights.
+    """
+
+    def __init__(self, rules: Optional[list[InsightRule]] = None, batch_size: int = 1000):
+        self.rules = rules if rules is not None else registered_rules()
+        self.batch_size = batch_size
+
+    def evaluate(self, features: Iterable[ReportFeatures]) -> list[Insight]:
+        insights: list[Insight] = []
+        for f in features:
+            for rule in self.rules:
+                if not rule.applies_to(f):
+                    continue
+                meta = rule.evaluate(f)
+                if meta is not None:
+                    insights.append(Insight(
+                        user_id=f.user_id,
+                        report_id=f.report_id,
+                        code=rule.code,
+                        level=rule.level,
+                        message=rule.message,
+                        meta=meta,
+                    ))
+        return insights
+
+    def generate(self, reports: Iterable[GeneratedReport]) -> list[Insight]:
+        insights = self.evaluate(ReportFeatures.from_report(report) for report in reports)
+        if not insights:
+            return []
+
+        created = Insight.objects.bulk_create(insights, batch_size=self.batch_size)
+        # bulk_create skips post_save, so publish here what the signal would have.
+        for insight in created:
+            publish_insight_created(insight)
+        return created
+
+
+def publish_insight_created(insight: Insight) -> None:
+    publish_event(insight.user_id, EVENT_INSIGHT_CREATED, {
+        'id': insight.id,
+        'code': insight.code,
+        'level': insight.level,
+        'message': insight.message,
+        'report': insight.report_id,
+        'dev_session': insight.dev_session_id,
+    })
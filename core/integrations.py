@@ -1,8 +1,12 @@
-from typing import Iterable
+import asyncio
+import time
+from typing import Iterable, Optional
 
 import httpx
 from django.conf import settings
+from django.core.cache import cache
 
+from .http import IntegrationClient, IntegrationError, get_integration
 from .models import Task, Team
 
 
@@ -10,42 +14,199 @@ class GitHubIntegrationError(Exception):
     pass
 
 
+class GitHubRateLimitError(GitHubIntegrationError):
+    pass
+
+
+class _IssueImport:
+    """
+    One import run: fetches every issue page for a repo and upserts it.
+
+    Pages 2..N are discovered from the first page's ``Link: rel="last"``
+    header and fetched concurrently (at most ``concurrency`` in flight);
+    without a ``last`` link the ``next`` links are followed one by one.
+    Each page is sent with the ETag remembered from the previous run, and
+    a 304 reuses the ids recorded for that page instead of rewriting rows.
+    """
+
+    def __init__(self, client: IntegrationClient, headers: dict, team: Optional[Team], concurrency: int):
+        self.client = client
+        self.headers = headers
+        self.team = team
+        self.semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self.rate_limit_reset: Optional[float] = None
+
+    async def run(self, url: str) -> list[Task]:
+        first, links = await self.import_page(url)
+        pages = [first]
+
+        last_url = links.get('last')
+        if last_url:
+            last_page = min(_page_number(last_url), GitHubImporter.MAX_PAGES)
+            results = await asyncio.gather(*(
+                self.import_page(_with_page(last_url, number))
+                for number in range(2, last_page + 1)
+            ))
+            pages += [tasks for tasks, _ in results]
+        else:
+            next_url = links.get('next')
+            while next_url and len(pages) < GitHubImporter.MAX_PAGES:
+                tasks, links = await self.import_page(next_url)
+                pages.append(tasks)
+                next_url = links.get('next')
+
+        return [task for page in pages for task in page]
+
+    async def import_page(self, url: str):
+        cache_key = f'github:issues:{url}'
+        cached = await cache.aget(cache_key)
+        headers = dict(self.headers)
+        if cached:
+            headers['If-None-Match'] = cached['etag']
+
+        resp = await self.fetch(url, headers)
+
+        if resp.status_code == 304 and cached:
+            return await _tasks_for(cached['ids']), cached['links']
+
+        if resp.status_code != 200:
+            raise GitHubIntegrationError(f'GitHub API error: {resp.status_code} {resp.text}')
+
+        ids = await self.upsert([issue for issue in resp.json() if 'pull_request' not in issue])
+        links = {rel: link['url'] for rel, link in resp.links.items() if rel in ('next', 'last')}
+        etag = resp.headers.get('ETag')
+        if etag:
+            await cache.aset(
+                cache_key,
+                {'etag': etag, 'ids': ids, 'links': links},
+                GitHubImporter.ETAG_CACHE_TIMEOUT,
+            )
+        return await _tasks_for(ids), links
+
+    async def fetch(self, url: str, headers: dict) -> httpx.Response:
+        for _ in range(GitHubImporter.RATE_LIMIT_RETRIES + 1):
+            await self.wait_for_rate_limit()
+            async with self.semaphore:
+                try:
+                    resp = await self.client.get(url, headers=headers)
+                except IntegrationError as exc:
+                    raise GitHubIntegrationError(str(exc)) from exc
+
+            delay = _rate_limit_delay(resp)
+            if delay is None:
+                if resp.headers.get('X-RateLimit-Remaining') == '0':
+                    self.rate_limit_reset = float(resp.headers.get('X-RateLimit-Reset', 0))
+                return resp
+            self.rate_limit_reset = time.time() + delay
+
+        raise GitHubRateLimitError('GitHub rate limit exceeded')
+
+    async def wait_for_rate_limit(self):
+        if self.rate_limit_reset is None:
+            return
+        delay = self.rate_limit_reset - time.time()
+        if delay > GitHubImporter.MAX_RATE_LIMIT_WAIT:
+            raise GitHubRateLimitError(f'GitHub rate limit exceeded, resets in {int(delay)}s')
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.rate_limit_reset = None
+
+    async def upsert(self, issues: list[dict]) -> list[str]:
+        if not issues:
+            return []
+
+        update_fields = ['title', 'description', 'external_url', 'updated_at']
+        if self.team is not None:
+            update_fields.append('team')
+
+        await Task.objects.abulk_create(
+            [
+                Task(
+                    external_id=str(issue['id']),
+                    external_source=Task.SOURCE_GITHUB,
+                    title=issue['title'][:255],
+                    description=issue.get('body') or '',
+                    external_url=issue.get('html_url'),
+                    team=self.team,
+                )
+                for issue in issues
+            ],
+            update_conflicts=True,
+            unique_fields=['external_source', 'external_id'],
+            update_fields=update_fields,
+        )
+        return [str(issue['id']) for issue in issues]
+
+
+def _rate_limit_delay(resp: httpx.Response) -> Optional[float]:
+    """Seconds to wait before retrying a rate-limited response, or None if it was not limited."""
+    if resp.status_code not in (403, 429):
+        return None
+
+    retry_after = resp.headers.get('Retry-After')
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            return None
+
+    if resp.headers.get('X-RateLimit-Remaining') == '0':
+        reset = float(resp.headers.get('X-RateLimit-Reset', 0))
+        return max(reset - time.time(), 0.0)
+    return None
+
+
+def _page_number(url: str) -> int:
+    try:
+        return int(httpx.URL(url).params.get('page', 1))
+    except ValueError:
+        return 1
+
+
+def _with_page(url: str, number: int) -> str:
+    return str(httpx.URL(url).copy_set_param('page', number))
+
+
+async def _tasks_for(external_ids: list[str]) -> list[Task]:
+    if not external_ids:
+        return []
+    by_id = {
+        task.external_id: task
+        async for task in Task.objects.filter(external_source=Task.SOURCE_GITHUB, external_id__in=external_ids)
+    }
+    return [by_id[external_id] for external_id in external_ids if external_id in by_id]
+
+
 class GitHubImporter:
+    API_URL = 'https://api.github.com'
+    PER_PAGE = 100
+    MAX_PAGES = 100
+    CONCURRENCY = 4
+    RATE_LIMIT_RETRIES = 2
+    MAX_RATE_LIMIT_WAIT = 60
+    ETAG_CACHE_TIMEOUT = 60 * 60 * 24
 
     @staticmethod
-    async def import_issues_for_repo(owner: str, repo: str, team: Team=None) -> Iterable[Task]:
+    async def import_issues_for_repo(
+        owner: str,
+        repo: str,
+        team: Team = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> Iterable[Task]:
         token = getattr(settings, 'GITHUB_TOKEN', None)
         if not token:
             raise GitHubIntegrationError('GITHUB_TOKEN is not configured')
 
-        url = f'https://api.github.com/repos/{owner}/{repo}/issues'
+        url = str(httpx.URL(
+            f'{GitHubImporter.API_URL}/repos/{owner}/{repo}/issues',
+            params={'per_page': GitHubImporter.PER_PAGE, 'page': 1},
+        ))
         headers = {
             'Authorization': f'Bearer {token}',
             'Accept': 'application/vnd.github+json',
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, headers=headers)
-            if resp.status_code != 200:
-                raise GitHubIntegrationError(f'GitHub API error: {resp.status_code} {resp.text}')
-
-            data = resp.json()
-
-        tasks: list[Task] = []
-        for issue in data:
-            if 'pull_request' in issue:
-                continue
-
-            task, _ = Task.objects.get_or_create(
-                external_id=str(issue['id']),
-                external_source=Task.SOURCE_GITHUB,
-                defaults={
-                    'title': issue['title'][:255],
-                    'description': issue.get('body') or '',
-                    'external_url': issue.get('html_url'),
-                    'team': team,
-                },
-            )
-            tasks.append(task)
-
-        return tasks
+        integration = get_integration('github')
+        if client is not None:
+            integration = integration.with_client(client)
+        return await _IssueImport(integration, headers, team, GitHubImporter.CONCURRENCY).run(url)
@@ -0,0 +1,83 @@
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.insights import InsightEngine, ReportFeatures
+from core.models import GeneratedReport, Insight
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure insight rule throughput on synthetic daily reports. '
+        'Everything is written inside a transaction that is rolled back unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reports', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--compare', action='store_true',
+                            help='Also time the old one-INSERT-per-insight path.')
+        parser.add_argument('--keep', action='store_true', help='Commit the synthetic data.')
+
+    def handle(self, *args, **options):
+        if options['reports'] < 1 or options['users'] < 1:
+            raise CommandError('--reports and --users must be positive')
+
+        with transaction.atomic():
+            reports = self._fixtures(options['reports'], options['users'], random.Random(options['seed']))
+            engine = InsightEngine()
+
+            start = time.perf_counter()
+            evaluated = engine.evaluate(ReportFeatures.from_report(r) for r in reports)
+            eval_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            created = engine.generate(reports)
+            write_seconds = time.perf_counter() - start
+
+            self._report('rule evaluation', len(reports), 'reports', eval_seconds)
+            self._report('evaluate + bulk_create', len(created), 'insights', write_seconds)
+
+            if options['compare']:
+                start = time.perf_counter()
+                for insight in evaluated:
+                    Insight.objects.create(
+                        user_id=insight.user_id, report_id=insight.report_id, code=insight.code,
+                        level=insight.level, message=insight.message, meta=insight.meta,
+                    )
+                self._report('per-row create', len(evaluated), 'insights', time.perf_counter() - start)
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def _fixtures(self, report_count: int, user_count: int, rng: random.Random) -> list[GeneratedReport]:
+        User = get_user_model()
+        prefix = f'bench-{uuid.uuid4().hex[:8]}'
+        users = User.objects.bulk_create([User(username=f'{prefix}-{i}') for i in range(user_count)])
+        today = timezone.now().date()
+
+        reports = []
+        for i in range(report_count):
+            switch_count = rng.randint(0, 25)
+            reports.append(GeneratedReport(
+                user=users[i % user_count],
+                type=GeneratedReport.TYPE_DAILY,
+                day=today,
+                payload={'totals': {
+                    'session_count': rng.randint(0, 6),
+                    'switch_count': switch_count,
+                    'focus_minutes': rng.randint(0, 480),
+                    'switches_by_reason': {'INTERRUPT': switch_count},
+                }},
+            ))
+        return GeneratedReport.objects.bulk_create(reports, batch_size=1000)
+
+    def _report(self, label: str, count: int, unit: str, seconds: float) -> None:
+        rate = count / seconds if seconds else float('inf')
+        self.stdout.write(f'{label:<24} {count:>7} {unit} in {seconds:.3f}s ({rate:,.0f} {unit}/s)')
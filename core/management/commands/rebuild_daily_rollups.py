@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.services import DailyRollupService
+
+
+class Command(BaseCommand):
+    help = 'Recompute DailyRollup rows from sessions and context switches for a date range.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD). Defaults to --end.')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild rollups for this user id (repeatable).')
+
+    def handle(self, *args, **options):
+        try:
+            end = date.fromisoformat(options['end']) if options['end'] else timezone.now().date()
+            start = date.fromisoformat(options['start']) if options['start'] else end
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        count = DailyRollupService.rebuild(start, end, user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} daily rollups for {start} .. {end}'))
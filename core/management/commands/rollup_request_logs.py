@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.log_retention import ApiRequestLogRetention
+
+
+class Command(BaseCommand):
+    help = 'Roll old ApiRequestLog rows into hourly aggregates and delete them in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help="Keep raw rows this many days. Defaults to API_REQUEST_LOG_RETENTION['RAW_DAYS'].")
+        parser.add_argument('--batch-size', type=int,
+                            help="Rows deleted per statement. Defaults to API_REQUEST_LOG_RETENTION['DELETE_BATCH_SIZE'].")
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        result = ApiRequestLogRetention.run(raw_days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled {result['rolled_up']} requests into {result['hours']} hours, "
+            f"deleted {result['deleted']} raw rows and {result['expired_hourly']} expired hourly rows"
+        ))
@@ -0,0 +1,224 @@
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current: contextvars.ContextVar[Optional['RequestMetrics']] = contextvars.ContextVar('request_metrics', default=None)
+
+
+def metrics_settings() -> dict:
+    config = getattr(settings, 'METRICS', {})
+    return {
+        'ENABLED': config.get('ENABLED', True),
+        'SAMPLE_RATE': config.get('SAMPLE_RATE', 1.0),
+        'WINDOW': config.get('WINDOW', 1024),
+        'TOKEN': config.get('TOKEN'),
+    }
+
+
+def should_sample() -> bool:
+    config = metrics_settings()
+    return config['ENABLED'] and (config['SAMPLE_RATE'] >= 1 or random.random() < config['SAMPLE_RATE'])
+
+
+class RequestMetrics:
+    """
+    Database and serializer cost of one request.
+
+    ``capture`` makes the instance current for the request's context; every
+    connection's execute wrapper (``install_query_counter``) hands queries
+    to it, so counting a query is two ``perf_counter`` calls. The context
+    follows ``sync_to_async``, so queries an ASGI request runs in a worker
+    thread, on that thread's connection, are counted too. Serializer time
+    counts only the outermost ``to_representation``, so nested serializers
+    are not added twice.
+    """
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self._depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_seconds += time.perf_counter() - start
+
+    def time_serializer(self, func, *args):
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.serializer_seconds += time.perf_counter() - start
+
+    @contextmanager
+    def capture(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def _count_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_counter(connection) -> None:
+    """Report ``connection``'s queries to the current RequestMetrics, if any."""
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+class Summary:
+    """Count and sum of every observation plus a window of recent ones for quantiles."""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def quantiles(self) -> dict[float, Optional[float]]:
+        ordered = sorted(self.samples)
+        return {
+            q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else None
+            for q in QUANTILES
+        }
+
+
+# Summary name: HELP text. The db_* and serializer_* ones only see sampled requests.
+SUMMARIES = {
+    'request_duration_seconds': 'Wall-clock time of the request.',
+    'response_size_bytes': 'Size of the response body; streaming responses are not counted.',
+    'db_queries': 'Database queries per sampled request.',
+    'db_duration_seconds': 'Time spent in database queries per sampled request.',
+    'serializer_duration_seconds': 'Time spent in serializers per sampled request.',
+}
+
+
+class RouteStats:
+    def __init__(self, window: int):
+        self.statuses: dict[str, int] = {}
+        self.summaries = {name: Summary(window) for name in SUMMARIES}
+
+
+class MetricsRegistry:
+    """
+    Per-route request metrics of this process, keyed by URL name and method.
+
+    Routes are URL names rather than paths, so the label set stays bounded.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._routes: dict[tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, method: str, status_code: int, duration_seconds: float,
+                response_bytes: Optional[int] = None, request_metrics: Optional[RequestMetrics] = None) -> None:
+        values = {'request_duration_seconds': duration_seconds, 'response_size_bytes': response_bytes}
+        if request_metrics is not None:
+            values.update(
+                db_queries=request_metrics.db_queries,
+                db_duration_seconds=request_metrics.db_seconds,
+                serializer_duration_seconds=request_metrics.serializer_seconds,
+            )
+        status_class = f'{status_code // 100}xx'
+        with self._lock:
+            stats = self._routes.get((route, method))
+            if stats is None:
+                stats = self._routes[(route, method)] = RouteStats(self.window)
+            stats.statuses[status_class] = stats.statuses.get(status_class, 0) + 1
+            for name, value in values.items():
+                if value is not None:
+                    stats.summaries[name].observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                key: {
+                    'statuses': dict(stats.statuses),
+                    'summaries': {
+                        name: (summary.count, summary.total, summary.quantiles())
+                        for name, summary in stats.summaries.items()
+                    },
+                }
+                for key, stats in self._routes.items()
+            }
+
+    def prometheus(self, prefix: str = 'devfocus_http_') -> str:
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            f'# HELP {prefix}requests_total API requests by route, method and status class.',
+            f'# TYPE {prefix}requests_total counter',
+        ]
+        for (route, method), stats in snapshot:
+            for status_class, count in sorted(stats['statuses'].items()):
+                lines.append(f'{prefix}requests_total{_labels(route=route, method=method, status=status_class)} {count}')
+
+        for name, help_text in SUMMARIES.items():
+            metric = prefix + name
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} summary']
+            for (route, method), stats in snapshot:
+                count, total, quantiles = stats['summaries'][name]
+                if not count:
+                    continue
+                for q, value in quantiles.items():
+                    lines.append(f'{metric}{_labels(route=route, method=method, quantile=q)} {_number(value)}')
+                lines.append(f'{metric}_sum{_labels(route=route, method=method)} {_number(total)}')
+                lines.append(f'{metric}_count{_labels(route=route, method=method)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry(window=metrics_settings()['WINDOW'])
+    return _registry
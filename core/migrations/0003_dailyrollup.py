@@ -0,0 +1,84 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+REASON_FIELDS = {
+    'INTERRUPT': 'interrupt_switches',
+    'QUICK_FIX': 'quick_fix_switches',
+    'MEETING': 'meeting_switches',
+    'OTHER': 'other_switches',
+}
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    """Roll up the sessions and switches recorded before the table existed, as DailyRollupService.rebuild does."""
+    DevSession = apps.get_model('core', 'DevSession')
+    ContextSwitch = apps.get_model('core', 'ContextSwitch')
+    DailyRollup = apps.get_model('core', 'DailyRollup')
+
+    rows = {}
+    session_rows = (
+        DevSession.objects
+        .annotate(day=TruncDate('started_at'))
+        .values('user_id', 'day')
+        .annotate(session_count=Count('id'), focus_minutes=Sum('total_focus_minutes'))
+        .order_by()
+    )
+    for row in session_rows:
+        rows[(row['user_id'], row['day'])] = DailyRollup(
+            user_id=row['user_id'],
+            day=row['day'],
+            session_count=row['session_count'],
+            focus_minutes=row['focus_minutes'] or 0,
+        )
+
+    switch_rows = (
+        ContextSwitch.objects
+        .annotate(day=TruncDate('dev_session__started_at'))
+        .values('dev_session__user_id', 'day', 'reason')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in switch_rows:
+        rollup = rows[(row['dev_session__user_id'], row['day'])]
+        field = REASON_FIELDS.get(row['reason'], 'other_switches')
+        setattr(rollup, field, getattr(rollup, field) + row['total'])
+        rollup.switch_count += row['total']
+
+    DailyRollup.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_task_external_source_task_external_url_insight_team_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('switch_count', models.PositiveIntegerField(default=0)),
+                ('focus_minutes', models.PositiveIntegerField(default=0)),
+                ('interrupt_switches', models.PositiveIntegerField(default=0)),
+                ('quick_fix_switches', models.PositiveIntegerField(default=0)),
+                ('meeting_switches', models.PositiveIntegerField(default=0)),
+                ('other_switches', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
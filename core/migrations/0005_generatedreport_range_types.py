@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_generatedreport_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='generatedreport',
+            name='type',
+            field=models.CharField(choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('RANGE', 'Date range'), ('SESSION', 'Session')], max_length=16),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize_external_refs(apps, schema_editor):
+    """Blank ids become NULL and duplicate references keep only the oldest task."""
+    Task = apps.get_model('core', 'Task')
+    Task.objects.filter(external_id='').update(external_id=None)
+
+    seen = set()
+    duplicates = []
+    rows = (
+        Task.objects
+        .exclude(external_id__isnull=True)
+        .order_by('external_source', 'external_id', 'id')
+        .values_list('id', 'external_source', 'external_id')
+    )
+    for pk, source, external_id in rows.iterator():
+        key = (source, external_id)
+        if key in seen:
+            duplicates.append(pk)
+        else:
+            seen.add(key)
+    if duplicates:
+        Task.objects.filter(pk__in=duplicates).update(external_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_generatedreport_range_types'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contextswitch',
+            index=models.Index(fields=['dev_session', 'happened_at'], name='switch_session_happened_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contextswitch',
+            index=models.Index(fields=['-happened_at'], name='switch_happened_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devsession',
+            index=models.Index(fields=['user', 'started_at'], name='session_user_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devsession',
+            index=models.Index(fields=['user', '-created_at'], name='session_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['user', 'type', 'day'], name='report_user_type_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['user', '-created_at'], name='report_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='insight',
+            index=models.Index(fields=['user', '-created_at'], name='insight_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+        ),
+        migrations.RunPython(normalize_external_refs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('external_source', 'external_id'), name='unique_task_external_ref'),
+        ),
+    ]
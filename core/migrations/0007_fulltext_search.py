@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:46
+
+from django.db import migrations
+
+# source table -> FTS5 external-content table over (title, description).
+FTS_TABLES = {
+    'core_task': 'core_task_fts',
+    'core_devsession': 'core_devsession_fts',
+}
+
+
+def create_fts_sql(source, fts):
+    columns = 'title, description'
+    new_values = 'new.id, new.title, new.description'
+    old_values = "'delete', old.id, old.title, old.description"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{columns}, content='{source}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES ({new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ({old_values}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF title, description ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ({old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES ({new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for source, fts in FTS_TABLES.items():
+        for statement in create_fts_sql(source, fts):
+            schema_editor.execute(statement)
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts in FTS_TABLES.values():
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 04:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_fulltext_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('tasks', 'Task'), ('sessions', 'Dev session'), ('context_switches', 'Context switch'), ('resources', 'Resource link')], max_length=32)),
+                ('object_id', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='contextswitch',
+            index=models.Index(fields=['updated_at', 'id'], name='switch_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devsession',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='session_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resourcelink',
+            index=models.Index(fields=['updated_at', 'id'], name='resource_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['updated_at', 'id'], name='task_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['updated_at', 'id'], name='tombstone_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_session_users(apps, schema_editor):
+    ContextSwitch = apps.get_model('core', 'ContextSwitch')
+    DevSession = apps.get_model('core', 'DevSession')
+    ContextSwitch.objects.update(
+        user_id=Subquery(DevSession.objects.filter(pk=OuterRef('dev_session_id')).values('user_id')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_sync_tombstones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contextswitch',
+            name='switch_happened_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='devsession',
+            name='session_user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='generatedreport',
+            name='report_user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='insight',
+            name='insight_user_created_idx',
+        ),
+        migrations.AddField(
+            model_name='contextswitch',
+            name='user',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(copy_session_users, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='contextswitch',
+            name='user',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='contextswitch',
+            index=models.Index(fields=['user', '-happened_at', '-id'], name='switch_user_happened_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contextswitch',
+            index=models.Index(fields=['-happened_at', '-id'], name='switch_happened_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='devsession',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='session_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='report_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='insight',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='insight_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def uncache_duplicate_reports(apps, schema_editor):
+    """Keep the newest report per fingerprint cached; older copies stay as unfingerprinted history."""
+    GeneratedReport = apps.get_model('core', 'GeneratedReport')
+    duplicates = (
+        GeneratedReport.objects.exclude(fingerprint='')
+        .values('user_id', 'type', 'day', 'fingerprint')
+        .annotate(copies=Count('id'), newest=Max('id'))
+        .filter(copies__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        (
+            GeneratedReport.objects
+            .filter(user_id=row['user_id'], type=row['type'], day=row['day'], fingerprint=row['fingerprint'])
+            .exclude(pk=row['newest'])
+            .update(fingerprint='')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_switch_user_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(uncache_duplicate_reports, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='generatedreport',
+            constraint=models.UniqueConstraint(condition=models.Q(('fingerprint', ''), _negated=True), fields=('user', 'type', 'day', 'fingerprint'), name='report_fingerprint_uniq'),
+        ),
+    ]
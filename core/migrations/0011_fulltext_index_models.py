@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:43
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_generatedreport_fingerprint_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DevSessionSearchIndex',
+            fields=[
+                ('rank', models.FloatField()),
+                ('dev_session', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='core.devsession')),
+                ('document', core.models.FullTextField(db_column='core_devsession_fts')),
+            ],
+            options={
+                'db_table': 'core_devsession_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskSearchIndex',
+            fields=[
+                ('rank', models.FloatField()),
+                ('task', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='core.task')),
+                ('document', core.models.FullTextField(db_column='core_task_fts')),
+            ],
+            options={
+                'db_table': 'core_task_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
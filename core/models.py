@@ -96,6 +96,15 @@ class Task(TimeStampedModel):
     type = models.CharField(max_length=16, choices=TYPE_CHOICES, default=TYPE_FEATURE)
     priority = models.CharField(max_length=8, choices=PRIORITY_CHOICES, default=PRIORITY_MEDIUM)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            models.Index(fields=['updated_at', 'id'], name='task_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['external_source', 'external_id'], name='unique_task_external_ref'),
+        ]
+
     def __str__(self) -> str:
         return self.title
 
@@ -126,6 +135,13 @@ class DevSession(TimeStampedModel):
     last_switch_at = models.DateTimeField(blank=True, null=True)
     total_focus_minutes = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'started_at'], name='session_user_started_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='session_user_created_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='session_user_updated_idx'),
+        ]
+
     def __str__(self) -> str:
         return f"{self.title} ({self.get_status_display()})"
 
@@ -168,15 +184,57 @@ class ContextSwitch(TimeStampedModel):
     ]
 
     dev_session = models.ForeignKey(DevSession, on_delete=models.CASCADE, related_name='context_switches')
+    # dev_session.user, copied by a pre_save signal (and by bulk writers) so a
+    # user's switch list is a single range of switch_user_happened_idx.
+    user = models.ForeignKey(AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+', editable=False)
     from_task = models.ForeignKey(Task, null=True, blank=True, on_delete=models.SET_NULL, related_name='switches_from')
     to_task = models.ForeignKey(Task, null=True, blank=True, on_delete=models.SET_NULL, related_name='switches_to')
     reason = models.CharField(max_length=16, choices=REASON_CHOICES, default=REASON_OTHER)
     happened_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['dev_session', 'happened_at'], name='switch_session_happened_idx'),
+            models.Index(fields=['user', '-happened_at', '-id'], name='switch_user_happened_idx'),
+            models.Index(fields=['-happened_at', '-id'], name='switch_happened_idx'),
+            models.Index(fields=['updated_at', 'id'], name='switch_updated_idx'),
+        ]
+
     def __str__(self):
         return f"ContextSwitch #{self.pk} in {self.dev_session_id}"
 
 
+class DailyRollup(TimeStampedModel):
+    REASON_FIELDS = {
+        ContextSwitch.REASON_INTERRUPT: 'interrupt_switches',
+        ContextSwitch.REASON_QUICK_FIX: 'quick_fix_switches',
+        ContextSwitch.REASON_MEETING: 'meeting_switches',
+        ContextSwitch.REASON_OTHER: 'other_switches',
+    }
+
+    user = models.ForeignKey(AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_rollups')
+    day = models.DateField()
+
+    session_count = models.PositiveIntegerField(default=0)
+    switch_count = models.PositiveIntegerField(default=0)
+    focus_minutes = models.PositiveIntegerField(default=0)
+
+    interrupt_switches = models.PositiveIntegerField(default=0)
+    quick_fix_switches = models.PositiveIntegerField(default=0)
+    meeting_switches = models.PositiveIntegerField(default=0)
+    other_switches = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'day')
+
+    def __str__(self):
+        return f"Rollup {self.day} for {self.user_id}"
+
+    @property
+    def switches_by_reason(self) -> dict[str, int]:
+        return {reason: getattr(self, field) for reason, field in self.REASON_FIELDS.items()}
+
+
 class ResourceLink(TimeStampedModel):
     TYPE_PR = 'PR'
     TYPE_ISSUE = 'ISSUE'
@@ -203,16 +261,25 @@ class ResourceLink(TimeStampedModel):
     title = models.CharField(max_length=255)
     url = models.URLField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='resource_updated_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
 
 class GeneratedReport(TimeStampedModel):
     TYPE_DAILY = 'DAILY'
+    TYPE_WEEKLY = 'WEEKLY'
+    TYPE_RANGE = 'RANGE'
     TYPE_SESSION = 'SESSION'
 
     TYPE_CHOICES = [
         (TYPE_DAILY, 'Daily'),
+        (TYPE_WEEKLY, 'Weekly'),
+        (TYPE_RANGE, 'Date range'),
         (TYPE_SESSION, 'Session'),
     ]
 
@@ -220,8 +287,25 @@ class GeneratedReport(TimeStampedModel):
     dev_session = models.ForeignKey(DevSession, null=True, blank=True,
                                     on_delete=models.CASCADE, related_name='generated_reports')
     type = models.CharField(max_length=16, choices=TYPE_CHOICES)
+    day = models.DateField(blank=True, null=True)
+    fingerprint = models.CharField(max_length=64, blank=True, db_index=True)
     payload = models.JSONField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'type', 'day'], name='report_user_type_day_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='report_user_created_idx'),
+        ]
+        # One cached report per fingerprint, so concurrent generations of the
+        # same inputs (an inline request and its Celery job) store it once.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'type', 'day', 'fingerprint'],
+                condition=~models.Q(fingerprint=''),
+                name='report_fingerprint_uniq',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.type} report #{self.pk} for {self.user}"
 
@@ -244,6 +328,86 @@ class Insight(TimeStampedModel):
     message = models.TextField()
     meta = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='insight_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.code} ({self.level})"
 
+
+
+class Tombstone(TimeStampedModel):
+    """A deleted row, kept so that ``/sync/`` clients learn about the delete."""
+    KIND_TASK = 'tasks'
+    KIND_SESSION = 'sessions'
+    KIND_CONTEXT_SWITCH = 'context_switches'
+    KIND_RESOURCE = 'resources'
+
+    KIND_CHOICES = [
+        (KIND_TASK, 'Task'),
+        (KIND_SESSION, 'Dev session'),
+        (KIND_CONTEXT_SWITCH, 'Context switch'),
+        (KIND_RESOURCE, 'Resource link'),
+    ]
+
+    # Null for rows every user can see, such as tasks.
+    user = models.ForeignKey(AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='tombstone_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.kind} #{self.object_id}"
+
+
+class FullTextField(models.TextField):
+    """FTS5's hidden column named after its table, the left side of MATCH."""
+
+
+@FullTextField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class FullTextIndex(models.Model):
+    """
+    Read-only view of an FTS5 table from core.0007_fulltext_search, keyed by
+    the source row's id (the FTS rowid). Searching joins it as
+    ``search_index`` so the MATCH runs once, against the index.
+    """
+    rank = models.FloatField()
+
+    class Meta:
+        abstract = True
+        managed = False
+
+
+class TaskSearchIndex(FullTextIndex):
+    task = models.OneToOneField(
+        Task, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='search_index',
+    )
+    document = FullTextField(db_column='core_task_fts')
+
+    class Meta(FullTextIndex.Meta):
+        db_table = 'core_task_fts'
+
+
+class DevSessionSearchIndex(FullTextIndex):
+    dev_session = models.OneToOneField(
+        DevSession, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='search_index',
+    )
+    document = FullTextField(db_column='core_devsession_fts')
+
+    class Meta(FullTextIndex.Meta):
+        db_table = 'core_devsession_fts'
@@ -0,0 +1,96 @@
+import re
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.utils.module_loading import import_string
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 8
+
+# model label -> (FTS table, indexed columns). The tables and the triggers
+# that keep them in sync are created by core.0007_fulltext_search; the
+# unmanaged core.models.FullTextIndex models expose them as ``search_index``.
+SEARCH_INDEXES = {
+    'core.task': ('core_task_fts', ('title', 'description')),
+    'core.devsession': ('core_devsession_fts', ('title', 'description')),
+}
+
+
+def search_terms(query: str) -> list[str]:
+    return TOKEN_RE.findall(query or '')[:MAX_TERMS]
+
+
+class SearchBackend:
+    """
+    Filters a queryset down to the rows matching a free-text query.
+
+    Ranked backends annotate ``search_rank`` (lower is better) and order
+    by it; callers that pass an explicit ordering afterwards replace it.
+    """
+
+    ranked = False
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        raise NotImplementedError
+
+
+class ContainsSearchBackend(SearchBackend):
+    """Portable fallback: every term must appear in the title or description."""
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        _, columns = SEARCH_INDEXES[queryset.model._meta.label_lower]
+        for term in terms:
+            condition = Q()
+            for column in columns:
+                condition |= Q(**{f'{column}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    FTS5 search over the external-content tables in ``SEARCH_INDEXES``.
+
+    Every term is prefix-matched and all of them must match; results are
+    ordered by bm25. The MATCH runs against the FTS index, so the cost
+    follows the number of hits rather than the size of the table.
+    """
+
+    ranked = True
+
+    @staticmethod
+    def match_expression(terms: list[str]) -> str:
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+
+        # Filtering through the one-to-one index row makes it an inner join
+        # driven by the MATCH, and its rank is read from the same row.
+        return (
+            queryset
+            .filter(search_index__document__match=self.match_expression(terms))
+            .annotate(search_rank=F('search_index__rank'))
+            .order_by('search_rank', 'pk')
+        )
+
+
+def get_search_backend(using: str = 'default') -> SearchBackend:
+    path: Optional[str] = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connections[using].vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    return ContainsSearchBackend()
+
+
+def search_queryset(queryset: QuerySet, query: str) -> QuerySet:
+    return get_search_backend(queryset.db).search(queryset, query)
@@ -1,45 +1,51 @@
+import copy
+import hashlib
+import threading
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
 
-from django.db.models import Count
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F, Q, Case, When, Value, DateTimeField, Sum, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
 
-from core.models import DevSession, GeneratedReport, Insight
+from core.cache import TTLCache, bump_version, version_tokens
+from core.events import publish_event, EVENT_CONTEXT_SWITCH, EVENT_REPORT_CREATED
+from core.insights import InsightEngine
+from core.models import DevSession, GeneratedReport, Insight, ContextSwitch, DailyRollup, Team, TeamMembership
+
+
+def day_bounds(day) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time()))
+    return start, start + timedelta(days=1)
 
 
 class InsightService:
+    REPORT_CHUNK_SIZE = 2000
+
     @staticmethod
     def generate_for_report(report: GeneratedReport) -> list[Insight]:
-        user = report.user
-        payload = report.payload
-        sessions = payload.get('sessions', [])
-
-        insights: list[Insight] = []
-
-        total_switches = sum(s.get('switch_count', 0) for s in sessions)
-        total_focus = sum(s.get('total_focus_minutes', 0) for s in sessions)
-
-        if total_switches > 10:
-            insights.append(Insight.objects.create(
-                user=user,
-                report=report,
-                code='HIGH_CONTEXT_SWITCHING',
-                level=Insight.LEVEL_WARN,
-                message='High context switching detected; consider reducing parallel tasks.',
-                meta={'total_switches': total_switches},
-            ))
-
-        if total_focus < 60:
-            insights.append(Insight.objects.create(
-                user=user,
-                report=report,
-                code='LOW_FOCUS_TIME',
-                level=Insight.LEVEL_INFO,
-                message='Low focused coding time today; maybe schedule a longer deep-work block.',
-                meta={'total_focus_minutes': total_focus},
-            ))
-
-        return insights
+        return InsightEngine().generate([report])
+
+    @staticmethod
+    def generate_for_reports(reports, chunk_size: int = REPORT_CHUNK_SIZE) -> int:
+        """Evaluate the rules for a whole queryset of reports, one bulk insert per chunk."""
+        engine = InsightEngine()
+        reports = reports.only('id', 'user_id', 'type', 'payload').order_by('pk')
+        created = 0
+        chunk: list[GeneratedReport] = []
+        for report in reports.iterator(chunk_size=chunk_size):
+            chunk.append(report)
+            if len(chunk) >= chunk_size:
+                created += len(engine.generate(chunk))
+                chunk = []
+        if chunk:
+            created += len(engine.generate(chunk))
+        return created
 
 
 @dataclass
@@ -49,18 +55,178 @@ class SessionSummary:
     switch_count: int
 
 
+class DailyRollupService:
+    @staticmethod
+    def day_for(session: DevSession):
+        return timezone.localtime(session.started_at).date()
+
+    @staticmethod
+    def increment(user_id: int, day, **deltas: int) -> None:
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+
+        changes = {field: F(field) + value for field, value in deltas.items()}
+        rollups = DailyRollup.objects.filter(user_id=user_id, day=day)
+        if rollups.update(**changes, updated_at=timezone.now()):
+            return
+
+        try:
+            with transaction.atomic():
+                DailyRollup.objects.create(user_id=user_id, day=day, **deltas)
+        except IntegrityError:
+            # Another writer created the row first; apply our deltas on top.
+            rollups.update(**changes, updated_at=timezone.now())
+
+    @staticmethod
+    def record_session_started(session: DevSession) -> None:
+        DailyRollupService.increment(session.user_id, DailyRollupService.day_for(session), session_count=1)
+
+    @staticmethod
+    def record_focus(session: DevSession, minutes: int) -> None:
+        DailyRollupService.increment(session.user_id, DailyRollupService.day_for(session), focus_minutes=minutes)
+
+    @staticmethod
+    def decrement(user_id: int, day, **deltas: int) -> None:
+        """Take ``deltas`` back off an existing rollup; a missing row stays missing."""
+        changes = {field: F(field) - value for field, value in deltas.items() if value}
+        if changes:
+            DailyRollup.objects.filter(user_id=user_id, day=day).update(**changes, updated_at=timezone.now())
+
+    @staticmethod
+    def switch_deltas(reasons: dict[str, int]) -> dict[str, int]:
+        deltas = {'switch_count': sum(reasons.values())}
+        for reason, count in reasons.items():
+            field = DailyRollup.REASON_FIELDS.get(reason, 'other_switches')
+            deltas[field] = deltas.get(field, 0) + count
+        return deltas
+
+    @staticmethod
+    def record_switches(user_id: int, day, reasons: dict[str, int]) -> None:
+        DailyRollupService.increment(user_id, day, **DailyRollupService.switch_deltas(reasons))
+
+    @staticmethod
+    def record_switches_deleted(user_id: int, day, reasons: dict[str, int]) -> None:
+        DailyRollupService.decrement(user_id, day, **DailyRollupService.switch_deltas(reasons))
+
+    @staticmethod
+    def record_session_deleted(session: DevSession, switch_reasons: dict[str, int]) -> None:
+        """Remove a deleted session, its focus time and its switches from its day."""
+        DailyRollupService.decrement(
+            session.user_id,
+            DailyRollupService.day_for(session),
+            session_count=1,
+            focus_minutes=session.total_focus_minutes,
+            **DailyRollupService.switch_deltas(switch_reasons),
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(start_day, end_day, user_ids=None) -> int:
+        start, _ = day_bounds(start_day)
+        _, end = day_bounds(end_day)
+
+        sessions = DevSession.objects.filter(started_at__gte=start, started_at__lt=end)
+        switches = ContextSwitch.objects.filter(
+            dev_session__started_at__gte=start,
+            dev_session__started_at__lt=end,
+        )
+        rollups = DailyRollup.objects.filter(day__gte=start_day, day__lte=end_day)
+        if user_ids is not None:
+            sessions = sessions.filter(user_id__in=user_ids)
+            switches = switches.filter(dev_session__user_id__in=user_ids)
+            rollups = rollups.filter(user_id__in=user_ids)
+
+        rows: dict[tuple, DailyRollup] = {}
+
+        session_rows = (
+            sessions
+            .annotate(day=TruncDate('started_at'))
+            .values('user_id', 'day')
+            .annotate(session_count=Count('id'), focus_minutes=Sum('total_focus_minutes'))
+        )
+        for row in session_rows:
+            rows[(row['user_id'], row['day'])] = DailyRollup(
+                user_id=row['user_id'],
+                day=row['day'],
+                session_count=row['session_count'],
+                focus_minutes=row['focus_minutes'] or 0,
+            )
+
+        switch_rows = (
+            switches
+            .annotate(day=TruncDate('dev_session__started_at'))
+            .values('dev_session__user_id', 'day', 'reason')
+            .annotate(total=Count('id'))
+        )
+        for row in switch_rows:
+            rollup = rows[(row['dev_session__user_id'], row['day'])]
+            field = DailyRollup.REASON_FIELDS.get(row['reason'], 'other_switches')
+            setattr(rollup, field, getattr(rollup, field) + row['total'])
+            rollup.switch_count += row['total']
+
+        rollups.delete()
+        DailyRollup.objects.bulk_create(rows.values())
+        return len(rows)
+
+
 class SessionService:
     @staticmethod
-    def close_session(session: DevSession) -> DevSession:
+    def finish(session: DevSession) -> int:
+        """Mark the session done and compute its focus time in memory; returns the change in minutes."""
         if session.ended_at is None:
             session.ended_at = timezone.now()
 
+        previous_minutes = session.total_focus_minutes
         duration = session.ended_at - session.started_at
         session.total_focus_minutes = max(int(duration.total_seconds() // 60), 0)
         session.status = DevSession.STATUS_DONE
+        return session.total_focus_minutes - previous_minutes
+
+    @staticmethod
+    def close_session(session: DevSession) -> DevSession:
+        delta = SessionService.finish(session)
         session.save(update_fields=['ended_at', 'total_focus_minutes', 'status', 'updated_at'])
+
+        DailyRollupService.record_focus(session, delta)
         return session
 
+    @staticmethod
+    def bulk_save(created: list[DevSession], updated: list[DevSession], fields: list[str]) -> None:
+        """
+        Write many sessions with one ``bulk_create`` and one ``bulk_update``.
+
+        Bulk writes skip the DevSession signals. This does their work in
+        batches: it closes sessions saved as done, applies rollup deltas per
+        (user, day), and invalidates the session and team stats caches.
+        """
+        now = timezone.now()
+        deltas: dict[tuple, dict[str, int]] = {}
+        for session in created + updated:
+            focus = 0
+            if session.status == DevSession.STATUS_DONE and (session.ended_at or session.pk is None):
+                focus = SessionService.finish(session)
+            day = deltas.setdefault((session.user_id, DailyRollupService.day_for(session)), {})
+            day['focus_minutes'] = day.get('focus_minutes', 0) + focus
+            if session.pk is None:
+                day['session_count'] = day.get('session_count', 0) + 1
+            session.updated_at = now
+
+        with transaction.atomic():
+            if created:
+                DevSession.objects.bulk_create(created)
+            if updated:
+                DevSession.objects.bulk_update(
+                    updated, sorted({*fields, 'status', 'ended_at', 'total_focus_minutes', 'updated_at'}),
+                )
+            for (user_id, day), values in deltas.items():
+                DailyRollupService.increment(user_id, day, **values)
+
+        for session in updated:
+            ActiveSessionService.invalidate(session.pk)
+        for user_id in {user_id for user_id, _ in deltas}:
+            TeamStatsService.invalidate_user(user_id)
+
     @staticmethod
     def compute_summary(session: DevSession) -> SessionSummary:
         duration = (session.ended_at or timezone.now()) - session.started_at
@@ -72,23 +238,288 @@ class SessionService:
         )
 
 
-class ReportService:
+class ActiveSessionService:
+    """
+    Resolves the open or paused session named by the ``X-Dev-Session-Id`` header.
+
+    Lookups, including misses, go through a small TTL+LRU cache that is
+    invalidated when a session is saved or deleted. Counter updates done with
+    ``QuerySet.update`` skip those signals, so cached counters may lag by up
+    to the TTL. Callers get a copy and can modify it safely.
+    """
+    ACTIVE_STATUSES = (DevSession.STATUS_OPEN, DevSession.STATUS_PAUSED)
+
+    _cache: Optional[TTLCache] = None
+    _cache_lock = threading.Lock()
+
     @staticmethod
-    def generate_daily_report(user, day=None) -> GeneratedReport:
-        if day is None:
-            day = timezone.now().date()
+    def cache() -> TTLCache:
+        if ActiveSessionService._cache is None:
+            with ActiveSessionService._cache_lock:
+                if ActiveSessionService._cache is None:
+                    config = getattr(settings, 'DEV_SESSION_CACHE', {})
+                    ActiveSessionService._cache = TTLCache(
+                        max_size=config.get('MAX_SIZE', 1024),
+                        ttl=config.get('TTL', 30),
+                    )
+        return ActiveSessionService._cache
 
-        start = timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time()))
-        end = start + timedelta(days=1)
+    @staticmethod
+    def get(session_id) -> Optional[DevSession]:
+        try:
+            pk = int(session_id)
+        except (TypeError, ValueError):
+            return None
 
-        sessions = (
+        session = ActiveSessionService.cache().get_or_load(pk, lambda: ActiveSessionService._load(pk))
+        return copy.deepcopy(session) if session is not None else None
+
+    @staticmethod
+    def invalidate(session_id: int) -> None:
+        ActiveSessionService.cache().delete(session_id)
+
+    @staticmethod
+    def _load(pk: int) -> Optional[DevSession]:
+        return (
             DevSession.objects
-            .filter(user=user, created_at__gte=start, created_at__lt=end)
-            .annotate(switch_count=Count('context_switches'))
+            .select_related('user')
+            .filter(pk=pk, status__in=ActiveSessionService.ACTIVE_STATUSES)
+            .first()
         )
 
-        payload = {
+
+class ContextSwitchService:
+    @staticmethod
+    def increment_session_counters(session_id: int, count: int, latest_at: datetime) -> int:
+        latest = Value(latest_at, output_field=DateTimeField())
+        return DevSession.objects.filter(pk=session_id).update(
+            switch_count=F('switch_count') + count,
+            last_switch_at=Case(
+                When(Q(last_switch_at__isnull=True) | Q(last_switch_at__lt=latest_at), then=latest),
+                default=F('last_switch_at'),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    @staticmethod
+    def register_switch(switch: ContextSwitch) -> None:
+        ContextSwitchService.increment_session_counters(
+            switch.dev_session_id,
+            count=1,
+            latest_at=switch.happened_at or timezone.now(),
+        )
+        session = switch.dev_session
+        TeamStatsService.invalidate_user(session.user_id)
+        DailyRollupService.record_switches(
+            session.user_id,
+            DailyRollupService.day_for(session),
+            {switch.reason: 1},
+        )
+        publish_event(session.user_id, EVENT_CONTEXT_SWITCH, {
+            'dev_session': session.id,
+            'count': 1,
+            'latest_at': switch.happened_at,
+            'ids': [switch.id],
+        })
+
+    @staticmethod
+    def unregister_switch(switch: ContextSwitch) -> None:
+        """Undo ``register_switch`` for a deleted switch; ``last_switch_at`` is left as it was."""
+        DevSession.objects.filter(pk=switch.dev_session_id, switch_count__gt=0).update(
+            switch_count=F('switch_count') - 1,
+            updated_at=timezone.now(),
+        )
+        session = switch.dev_session
+        TeamStatsService.invalidate_user(session.user_id)
+        DailyRollupService.record_switches_deleted(
+            session.user_id,
+            DailyRollupService.day_for(session),
+            {switch.reason: 1},
+        )
+
+    @staticmethod
+    def record_bulk(switches: list[ContextSwitch]) -> list[ContextSwitch]:
+        per_session: dict[int, tuple[int, datetime]] = {}
+        for switch in switches:
+            count, latest = per_session.get(switch.dev_session_id, (0, switch.happened_at))
+            per_session[switch.dev_session_id] = (count + 1, max(latest, switch.happened_at))
+
+        sessions = {
+            s.id: s for s in DevSession.objects.filter(pk__in=per_session).only('id', 'user_id', 'started_at')
+        }
+        per_day: dict[tuple, dict[str, int]] = {}
+        for switch in switches:
+            session = sessions[switch.dev_session_id]
+            switch.user_id = session.user_id
+            reasons = per_day.setdefault((session.user_id, DailyRollupService.day_for(session)), {})
+            reasons[switch.reason] = reasons.get(switch.reason, 0) + 1
+
+        with transaction.atomic():
+            created = ContextSwitch.objects.bulk_create(switches)
+            for session_id, (count, latest) in per_session.items():
+                ContextSwitchService.increment_session_counters(session_id, count, latest)
+            for (user_id, day), reasons in per_day.items():
+                DailyRollupService.record_switches(user_id, day, reasons)
+            for user_id in {session.user_id for session in sessions.values()}:
+                TeamStatsService.invalidate_user(user_id)
+
+            ids: dict[int, list[int]] = {}
+            for switch in created:
+                ids.setdefault(switch.dev_session_id, []).append(switch.id)
+            for session_id, (count, latest) in per_session.items():
+                publish_event(sessions[session_id].user_id, EVENT_CONTEXT_SWITCH, {
+                    'dev_session': session_id,
+                    'count': count,
+                    'latest_at': latest,
+                    'ids': ids[session_id],
+                })
+
+        return created
+
+
+class TeamStatsService:
+    """
+    Per-member and team-total session, focus and switch numbers for a date
+    range, cached per (team, range).
+
+    Cache keys embed version tokens instead of being deleted on writes: one
+    per team, bumped when the roster or owner changes, and one per user,
+    bumped when that user's sessions or switch counters change. A write is a
+    single cache set and needs no lookup of the teams the user belongs to.
+    Stale entries simply stop being read and expire. The tokens are only as
+    shared as the default cache; with a per-process one, other processes see
+    a change after ``TEAM_STATS_CACHE['TIMEOUT']``.
+    """
+    KEY_PREFIX = 'team-stats'
+
+    @staticmethod
+    def _version_key(kind: str, pk: int) -> str:
+        return f'{TeamStatsService.KEY_PREFIX}:{kind}:{pk}'
+
+    @staticmethod
+    def invalidate_team(team_id: int) -> None:
+        bump_version(TeamStatsService._version_key('team', team_id))
+
+    @staticmethod
+    def invalidate_user(user_id: int) -> None:
+        bump_version(TeamStatsService._version_key('user', user_id))
+
+    @staticmethod
+    def member_ids(team: Team, team_version: int) -> list[int]:
+        key = f'{TeamStatsService.KEY_PREFIX}:roster:{team.pk}:{team_version}'
+        ids = cache.get(key)
+        if ids is None:
+            ids = sorted({team.owner_id, *TeamMembership.objects.filter(team=team).values_list('user_id', flat=True)})
+            cache.set(key, ids, TeamStatsService.timeout())
+        return ids
+
+    @staticmethod
+    def timeout() -> int:
+        return getattr(settings, 'TEAM_STATS_CACHE', {}).get('TIMEOUT', 300)
+
+    @staticmethod
+    def stats(team: Team, start_day, end_day) -> dict:
+        team_version, = version_tokens([TeamStatsService._version_key('team', team.pk)])
+        member_ids = TeamStatsService.member_ids(team, team_version)
+        user_versions = version_tokens(
+            [TeamStatsService._version_key('user', pk) for pk in member_ids]
+        )
+        digest = hashlib.sha1(
+            '|'.join(str(v) for v in (team_version, *member_ids, *user_versions)).encode()
+        ).hexdigest()
+        key = f'{TeamStatsService.KEY_PREFIX}:{team.pk}:{start_day}:{end_day}:{digest}'
+
+        result = cache.get(key)
+        if result is None:
+            result = TeamStatsService.compute(team, member_ids, start_day, end_day)
+            cache.set(key, result, TeamStatsService.timeout())
+        return result
+
+    @staticmethod
+    def compute(team: Team, member_ids: list[int], start_day, end_day) -> dict:
+        """One grouped query: members LEFT JOIN their sessions in range, so idle members report zeros."""
+        start, _ = day_bounds(start_day)
+        _, end = day_bounds(end_day)
+        in_range = Q(dev_sessions__started_at__gte=start, dev_sessions__started_at__lt=end)
+        role = TeamMembership.objects.filter(team=team, user=OuterRef('pk')).values('role')[:1]
+        rows = (
+            get_user_model().objects
+            .filter(pk__in=member_ids)
+            .annotate(
+                role=Subquery(role),
+                sessions=Count('dev_sessions', filter=in_range),
+                focus_minutes=Coalesce(Sum('dev_sessions__total_focus_minutes', filter=in_range), 0),
+                switches=Coalesce(Sum('dev_sessions__switch_count', filter=in_range), 0),
+            )
+            .order_by('pk')
+            .values('pk', 'username', 'role', 'sessions', 'focus_minutes', 'switches')
+        )
+
+        members = []
+        for row in rows:
+            members.append({
+                'user': row['pk'],
+                'username': row['username'],
+                'role': row['role'] or (TeamMembership.ROLE_OWNER if row['pk'] == team.owner_id else None),
+                'sessions': row['sessions'],
+                'focus_minutes': row['focus_minutes'],
+                'switches': row['switches'],
+            })
+        totals = {
+            field: sum(m[field] for m in members) for field in ('sessions', 'focus_minutes', 'switches')
+        }
+        return {
+            'team': team.pk,
+            'start': start_day,
+            'end': end_day,
+            'members': members,
+            'totals': {**totals, 'members': len(members)},
+        }
+
+
+def publish_report_created(report: GeneratedReport) -> None:
+    publish_event(report.user_id, EVENT_REPORT_CREATED, {
+        'id': report.id,
+        'type': report.type,
+        'day': report.day,
+        'created_at': report.created_at,
+    })
+
+
+class ReportService:
+    # Bump when the payload layout changes so cached reports are regenerated.
+    PAYLOAD_VERSION = 1
+
+    @staticmethod
+    def daily_fingerprint(user, day) -> str:
+        start, end = day_bounds(day)
+        sessions = DevSession.objects.filter(user=user, started_at__gte=start, started_at__lt=end)
+        session_stats = sessions.aggregate(count=Count('id'), last=Max('updated_at'))
+        switch_stats = ContextSwitch.objects.filter(dev_session__in=sessions).aggregate(
+            count=Count('id'), last=Max('updated_at'),
+        )
+
+        return ReportService._fingerprint(user.pk, day, session_stats, switch_stats)
+
+    @staticmethod
+    def _fingerprint(user_id: int, day, session_stats: dict, switch_stats: dict) -> str:
+        parts = [
+            ReportService.PAYLOAD_VERSION, user_id, day,
+            session_stats['count'], session_stats['last'],
+            switch_stats['count'], switch_stats['last'],
+        ]
+        return hashlib.sha256('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+    @staticmethod
+    def _daily_payload(day, rollup: DailyRollup, sessions) -> dict:
+        return {
             "date": str(day),
+            "totals": {
+                "session_count": rollup.session_count,
+                "switch_count": rollup.switch_count,
+                "focus_minutes": rollup.focus_minutes,
+                "switches_by_reason": rollup.switches_by_reason,
+            },
             "sessions": [
                 {
                     "id": s.id,
@@ -101,10 +532,245 @@ class ReportService:
             ],
         }
 
-        report = GeneratedReport.objects.create(
+    @staticmethod
+    def get_or_generate_daily_report(user, day=None, force: bool = False) -> tuple[GeneratedReport, bool]:
+        if day is None:
+            day = timezone.now().date()
+
+        fingerprint = ReportService.daily_fingerprint(user, day)
+        cached = GeneratedReport.objects.filter(
+            user=user, type=GeneratedReport.TYPE_DAILY, day=day, fingerprint=fingerprint,
+        )
+        if not force:
+            existing = cached.first()
+            if existing is not None:
+                return existing, False
+
+        start, end = day_bounds(day)
+        rollup = DailyRollup.objects.filter(user=user, day=day).first() or DailyRollup(user=user, day=day)
+        sessions = (
+            DevSession.objects
+            .filter(user=user, started_at__gte=start, started_at__lt=end)
+            .only('id', 'title', 'status', 'switch_count', 'total_focus_minutes')
+        )
+
+        try:
+            with transaction.atomic():
+                if force:
+                    # Earlier reports stay as history but are no longer served from the cache.
+                    cached.update(fingerprint='')
+                report = GeneratedReport.objects.create(
+                    user=user,
+                    type=GeneratedReport.TYPE_DAILY,
+                    day=day,
+                    fingerprint=fingerprint,
+                    payload=ReportService._daily_payload(day, rollup, sessions),
+                )
+                InsightService.generate_for_report(report)
+        except IntegrityError:
+            # A concurrent call, e.g. the Celery job racing an inline
+            # generation, stored this fingerprint first.
+            return cached.get(), False
+        return report, True
+
+    @staticmethod
+    def generate_daily_report(user, day=None, force: bool = False) -> GeneratedReport:
+        report, _ = ReportService.get_or_generate_daily_report(user, day=day, force=force)
+        return report
+
+    @staticmethod
+    def active_user_ids(day):
+        """Users with a session that started on ``day``, read from the (user, day) rollups."""
+        return (
+            DailyRollup.objects
+            .filter(day=day, session_count__gt=0, user__is_active=True)
+            .order_by('user_id')
+            .values_list('user_id', flat=True)
+        )
+
+    @staticmethod
+    def generate_daily_reports(user_ids: list[int], day) -> dict:
+        """
+        Daily reports for many users at once, with the same caching as
+        ``get_or_generate_daily_report``.
+
+        The cost is a fixed number of grouped queries per call, whatever
+        the number of users: session and switch fingerprints, cached
+        reports, rollups, sessions, then one report insert and one insight
+        insert in a single transaction.
+        """
+        start, end = day_bounds(day)
+        session_stats = {
+            row['user_id']: row for row in
+            DevSession.objects
+            .filter(user_id__in=user_ids, started_at__gte=start, started_at__lt=end)
+            .values('user_id')
+            .annotate(count=Count('id'), last=Max('updated_at'))
+        }
+        switch_stats = {
+            row['dev_session__user_id']: row for row in
+            ContextSwitch.objects
+            .filter(dev_session__user_id__in=user_ids, dev_session__started_at__gte=start,
+                    dev_session__started_at__lt=end)
+            .values('dev_session__user_id')
+            .annotate(count=Count('id'), last=Max('updated_at'))
+        }
+        empty = {'count': 0, 'last': None}
+        fingerprints = {
+            user_id: ReportService._fingerprint(
+                user_id, day, session_stats.get(user_id, empty), switch_stats.get(user_id, empty),
+            )
+            for user_id in user_ids
+        }
+
+        cached = set(
+            GeneratedReport.objects
+            .filter(user_id__in=user_ids, type=GeneratedReport.TYPE_DAILY, day=day,
+                    fingerprint__in=fingerprints.values())
+            .values_list('user_id', 'fingerprint')
+        )
+        pending = [user_id for user_id in user_ids if (user_id, fingerprints[user_id]) not in cached]
+
+        reports: list[GeneratedReport] = []
+        if pending:
+            rollups = {r.user_id: r for r in DailyRollup.objects.filter(user_id__in=pending, day=day)}
+            sessions: dict[int, list[DevSession]] = {}
+            for session in (
+                DevSession.objects
+                .filter(user_id__in=pending, started_at__gte=start, started_at__lt=end)
+                .only('id', 'user_id', 'title', 'status', 'switch_count', 'total_focus_minutes')
+                .order_by('user_id', 'started_at')
+            ):
+                sessions.setdefault(session.user_id, []).append(session)
+
+            # Reports and their insights commit together (events go out on
+            # commit), so a failed insight pass leaves no report behind for
+            # the per-user fallback to reuse without insights.
+            with transaction.atomic():
+                reports = GeneratedReport.objects.bulk_create([
+                    GeneratedReport(
+                        user_id=user_id,
+                        type=GeneratedReport.TYPE_DAILY,
+                        day=day,
+                        fingerprint=fingerprints[user_id],
+                        payload=ReportService._daily_payload(
+                            day, rollups.get(user_id) or DailyRollup(user_id=user_id, day=day), sessions.get(user_id, []),
+                        ),
+                    )
+                    for user_id in pending
+                ])
+                for report in reports:
+                    publish_report_created(report)
+                InsightEngine().generate(reports)
+
+        return {'users': len(user_ids), 'created': len(reports), 'reused': len(user_ids) - len(pending)}
+
+    MAX_RANGE_DAYS = 366
+
+    @staticmethod
+    def collect_daily_series(user, start_day, end_day) -> list[dict]:
+        """
+        Per-day totals for ``start_day .. end_day`` (inclusive).
+
+        Days that already have a DailyRollup are read from it; the remaining
+        days are filled from one query grouped by TruncDate('started_at')
+        plus one grouped query for their switch reasons.
+        """
+        days = [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+        rollups = {
+            r.day: r for r in DailyRollup.objects.filter(user=user, day__gte=start_day, day__lte=end_day)
+        }
+
+        computed: dict = {}
+        missing = [d for d in days if d not in rollups]
+        if missing:
+            start, _ = day_bounds(missing[0])
+            _, end = day_bounds(missing[-1])
+            session_rows = (
+                DevSession.objects
+                .filter(user=user, started_at__gte=start, started_at__lt=end)
+                .annotate(day=TruncDate('started_at'))
+                .values('day')
+                .annotate(
+                    session_count=Count('id'),
+                    switch_count=Sum('switch_count'),
+                    focus_minutes=Sum('total_focus_minutes'),
+                )
+            )
+            for row in session_rows:
+                computed[row['day']] = DailyRollup(
+                    user=user,
+                    day=row['day'],
+                    session_count=row['session_count'],
+                    switch_count=row['switch_count'] or 0,
+                    focus_minutes=row['focus_minutes'] or 0,
+                )
+
+            if computed:
+                reason_rows = (
+                    ContextSwitch.objects
+                    .filter(dev_session__user=user, dev_session__started_at__gte=start,
+                            dev_session__started_at__lt=end)
+                    .annotate(day=TruncDate('dev_session__started_at'))
+                    .values('day', 'reason')
+                    .annotate(total=Count('id'))
+                )
+                for row in reason_rows:
+                    rollup = computed.get(row['day'])
+                    if rollup is not None:
+                        field = DailyRollup.REASON_FIELDS.get(row['reason'], 'other_switches')
+                        setattr(rollup, field, getattr(rollup, field) + row['total'])
+
+        series = []
+        for day in days:
+            rollup = rollups.get(day) or computed.get(day) or DailyRollup(user=user, day=day)
+            series.append({
+                "date": str(day),
+                "session_count": rollup.session_count,
+                "switch_count": rollup.switch_count,
+                "focus_minutes": rollup.focus_minutes,
+                "switches_by_reason": rollup.switches_by_reason,
+            })
+        return series
+
+    @staticmethod
+    def generate_range_report(user, start_day, end_day, report_type=GeneratedReport.TYPE_RANGE) -> GeneratedReport:
+        if end_day < start_day:
+            raise ValueError('end day must not be before start day')
+        if (end_day - start_day).days >= ReportService.MAX_RANGE_DAYS:
+            raise ValueError(f'date range is limited to {ReportService.MAX_RANGE_DAYS} days')
+
+        series = ReportService.collect_daily_series(user, start_day, end_day)
+
+        switches_by_reason = {reason: 0 for reason in DailyRollup.REASON_FIELDS}
+        for entry in series:
+            for reason, count in entry['switches_by_reason'].items():
+                switches_by_reason[reason] += count
+
+        payload = {
+            "start": str(start_day),
+            "end": str(end_day),
+            "totals": {
+                "session_count": sum(e['session_count'] for e in series),
+                "switch_count": sum(e['switch_count'] for e in series),
+                "focus_minutes": sum(e['focus_minutes'] for e in series),
+                "switches_by_reason": switches_by_reason,
+            },
+            "days": series,
+        }
+
+        return GeneratedReport.objects.create(
             user=user,
-            type=GeneratedReport.TYPE_DAILY,
+            type=report_type,
+            day=start_day,
             payload=payload,
         )
-        InsightService.generate_for_report(report)
-        return report
+
+    @staticmethod
+    def generate_weekly_report(user, day=None) -> GeneratedReport:
+        if day is None:
+            day = timezone.now().date()
+        monday = day - timedelta(days=day.weekday())
+        return ReportService.generate_range_report(
+            user, monday, monday + timedelta(days=6), report_type=GeneratedReport.TYPE_WEEKLY,
+        )
@@ -1,24 +1,179 @@
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models import Count, Q, QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from core.models import ContextSwitch, DevSession
-from core.services import SessionService
+from api.report_queue import publish_report_request_status
+from core.helper import TeamPermissionService
+from core.insights import publish_insight_created
+from core.metrics import install_query_counter
+from core.models import (
+    ContextSwitch, DevSession, GeneratedReport, Insight, ResourceLink, Task, Team, TeamMembership, Tombstone,
+)
+from core.services import (
+    SessionService,
+    ContextSwitchService,
+    DailyRollupService,
+    ActiveSessionService,
+    TeamStatsService,
+    publish_report_created,
+)
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    install_query_counter(connection)
+
+
+@receiver(pre_save, sender=ContextSwitch)
+def copy_session_user_to_switch(sender, instance: ContextSwitch, **kwargs):
+    instance.user_id = instance.dev_session.user_id
 
 
 @receiver(post_save, sender=ContextSwitch)
 def update_session_on_context_switch(sender, instance: ContextSwitch, created, **kwargs):
     if not created:
         return
-    session = instance.dev_session
-    session.switch_count = session.context_switches.count()
-    session.last_switch_at = instance.happened_at or timezone.now()
-    session.save(update_fields=['switch_count', 'last_switch_at', 'updated_at'])
+    ContextSwitchService.register_switch(instance)
+
+
+@receiver(post_save, sender=DevSession)
+def update_rollup_on_session_created(sender, instance: DevSession, created, **kwargs):
+    if created:
+        DailyRollupService.record_session_started(instance)
+
+
+@receiver(post_save, sender=DevSession)
+@receiver(post_delete, sender=DevSession)
+def invalidate_active_session_cache(sender, instance: DevSession, **kwargs):
+    ActiveSessionService.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=DevSession)
+@receiver(post_delete, sender=DevSession)
+def invalidate_team_stats_for_session(sender, instance: DevSession, **kwargs):
+    TeamStatsService.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=TeamMembership)
+@receiver(post_delete, sender=TeamMembership)
+def invalidate_caches_for_membership(sender, instance: TeamMembership, **kwargs):
+    TeamStatsService.invalidate_team(instance.team_id)
+    TeamPermissionService.invalidate(instance.user_id)
+
+
+@receiver(pre_save, sender=Team)
+def remember_previous_owner(sender, instance: Team, **kwargs):
+    instance._previous_owner_id = (
+        Team.objects.filter(pk=instance.pk).values_list('owner_id', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Team)
+def invalidate_caches_for_team(sender, instance: Team, created, **kwargs):
+    if not created:
+        TeamStatsService.invalidate_team(instance.pk)
+    previous = getattr(instance, '_previous_owner_id', None)
+    for user_id in {instance.owner_id, previous} - {None}:
+        TeamPermissionService.invalidate(user_id)
+
+
+@receiver(post_delete, sender=Team)
+def invalidate_owner_roles(sender, instance: Team, **kwargs):
+    TeamPermissionService.invalidate(instance.owner_id)
 
 
 @receiver(post_save, sender=DevSession)
-def auto_compute_focus_on_done(sender, instance: DevSession, created, **kwargs):
+def auto_compute_focus_on_done(sender, instance: DevSession, created, update_fields=None, **kwargs):
     if created:
         return
+    if update_fields and 'total_focus_minutes' in update_fields:
+        # Saved by SessionService.close_session itself.
+        return
     if instance.status == DevSession.STATUS_DONE and instance.ended_at:
         SessionService.close_session(instance)
+
+
+@receiver(post_save, sender=GeneratedReport)
+def publish_report_on_create(sender, instance: GeneratedReport, created, **kwargs):
+    if created:
+        publish_report_created(instance)
+
+
+@receiver(post_save, sender=Insight)
+def publish_insight_on_create(sender, instance: Insight, created, **kwargs):
+    if created:
+        publish_insight_created(instance)
+
+
+@receiver(post_save, sender='api.ReportRequest')
+def publish_report_request_on_save(sender, instance, created, update_fields=None, **kwargs):
+    # Queue transitions use update() and publish themselves; this covers creates and plain saves.
+    if not created and update_fields is not None and 'status' not in update_fields:
+        return
+    publish_report_request_status(instance)
+
+
+def _deleted_directly(sender, origin) -> bool:
+    """
+    False for rows removed by a cascade from another model.
+
+    Sync clients drop a deleted session's switches and links, and a deleted
+    task's links, themselves; skipping them keeps a cascade free of
+    per-row queries.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is sender
+
+
+@receiver(pre_delete, sender=Task)
+def touch_switches_of_deleted_task(sender, instance: Task, **kwargs):
+    # The SET_NULL cascade is a bare UPDATE that leaves updated_at alone;
+    # touch the rows first so sync sends them again without the task.
+    ContextSwitch.objects.filter(Q(from_task=instance) | Q(to_task=instance)).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance: Task, origin=None, **kwargs):
+    if _deleted_directly(sender, origin):
+        Tombstone.objects.create(kind=Tombstone.KIND_TASK, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=DevSession)
+def record_session_tombstone(sender, instance: DevSession, origin=None, **kwargs):
+    if _deleted_directly(sender, origin):
+        Tombstone.objects.create(user_id=instance.user_id, kind=Tombstone.KIND_SESSION, object_id=instance.pk)
+
+
+@receiver(post_delete, sender=ContextSwitch)
+@receiver(post_delete, sender=ResourceLink)
+def record_session_child_tombstone(sender, instance, origin=None, **kwargs):
+    if not _deleted_directly(sender, origin) or instance.dev_session_id is None:
+        return
+    kind = Tombstone.KIND_CONTEXT_SWITCH if sender is ContextSwitch else Tombstone.KIND_RESOURCE
+    Tombstone.objects.create(user_id=instance.dev_session.user_id, kind=kind, object_id=instance.pk)
+
+
+@receiver(pre_delete, sender=DevSession)
+def remember_switch_reasons(sender, instance: DevSession, origin=None, **kwargs):
+    # Read before the cascade removes the switches. A session deleted along
+    # with its user takes the user's rollups with it, so it is skipped.
+    if _deleted_directly(sender, origin):
+        instance._switch_reasons = dict(
+            instance.context_switches.order_by().values_list('reason').annotate(count=Count('id'))
+        )
+
+
+@receiver(post_delete, sender=DevSession)
+def update_rollup_on_session_deleted(sender, instance: DevSession, **kwargs):
+    reasons = getattr(instance, '_switch_reasons', None)
+    if reasons is not None:
+        DailyRollupService.record_session_deleted(instance, reasons)
+
+
+@receiver(post_delete, sender=ContextSwitch)
+def update_counters_on_switch_deleted(sender, instance: ContextSwitch, origin=None, **kwargs):
+    # Switches removed with their session are covered by update_rollup_on_session_deleted.
+    if _deleted_directly(sender, origin):
+        ContextSwitchService.unregister_switch(instance)
@@ -1,34 +1,166 @@
-from celery import shared_task
+import logging
+import time
+from datetime import date, timedelta
+
+from asgiref.sync import async_to_sync
+from celery import chord, shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 
-from core.services import ReportService, InsightService
+from core.http import build_async_client
+from core.integrations import GitHubImporter
+from core.models import Team
+from core.services import ReportService
+
+logger = logging.getLogger(__name__)
+
+NIGHTLY_SUMMARY_CACHE_KEY = 'reports:nightly:last'
+
+
+async def _import_github_issues(owner: str, repo: str, team: Team = None):
+    # async_to_sync runs this on a fresh event loop per call, so the per-loop
+    # pooled client would never be reused and never closed; use a scoped one.
+    async with build_async_client() as client:
+        return await GitHubImporter.import_issues_for_repo(owner, repo, team=team, client=client)
 
 
 @shared_task
-def process_report_request(request_id: int):
-    from api.models import ReportRequest
+def import_github_issues(owner: str, repo: str, team_id: int = None) -> list[int]:
+    team = Team.objects.filter(pk=team_id).first() if team_id else None
+    tasks = async_to_sync(_import_github_issues)(owner, repo, team=team)
+    return [task.pk for task in tasks]
 
-    try:
-        req = ReportRequest.objects.select_related('user').get(pk=request_id)
-    except ReportRequest.DoesNotExist:
-        return
 
-    if req.status not in (ReportRequest.STATUS_PENDING, ReportRequest.STATUS_RUNNING):
-        return
+@shared_task(bind=True)
+def process_report_request(self, request_id: int):
+    """
+    Generate the report for one ReportRequest.
+
+    The request is claimed atomically, so a duplicate delivery is a no-op.
+    Transient database errors put the request back to pending and retry
+    with exponential backoff until ``REPORT_REQUESTS['MAX_ATTEMPTS']``;
+    other errors fail it.
+    """
+    from api.models import ReportRequest
+    from api.report_queue import ReportRequestQueue, TRANSIENT_ERRORS
 
-    req.status = ReportRequest.STATUS_RUNNING
-    req.save(update_fields=['status', 'updated_at'])
+    req = ReportRequestQueue.claim(request_id)
+    if req is None:
+        return
 
     try:
         day = req.day or timezone.now().date()
-        report = ReportService.generate_daily_report(req.user, day=day)
-        InsightService.generate_for_report(report)
-
-        req.result_report = report
-        req.status = ReportRequest.STATUS_DONE
-        req.save(update_fields=['result_report', 'status', 'updated_at'])
+        if req.type == ReportRequest.TYPE_WEEKLY:
+            report = ReportService.generate_weekly_report(req.user, day=day)
+        elif req.type == ReportRequest.TYPE_RANGE:
+            report = ReportService.generate_range_report(req.user, day, req.end_day or day)
+        else:
+            report = ReportService.generate_daily_report(req.user, day=day)
+    except TRANSIENT_ERRORS as exc:
+        if ReportRequestQueue.can_retry(req) and ReportRequestQueue.release(req, str(exc)):
+            raise self.retry(exc=exc, countdown=ReportRequestQueue.retry_delay(req.attempts), max_retries=None)
+        ReportRequestQueue.fail(req, str(exc))
+        raise
     except Exception as exc:
-        req.status = ReportRequest.STATUS_FAILED
-        req.error_message = str(exc)
-        req.save(update_fields=['status', 'error_message', 'updated_at'])
+        ReportRequestQueue.fail(req, str(exc))
         raise
+
+    ReportRequestQueue.complete(req, report)
+
+
+@shared_task
+def reap_report_requests() -> dict:
+    """Periodic: re-enqueue or fail report requests stuck past ``REPORT_REQUESTS['STUCK_AFTER']``."""
+    from api.report_queue import ReportRequestQueue
+
+    result = ReportRequestQueue.reap()
+    for request_id in result['requeue']:
+        process_report_request.delay(request_id)
+    if result['requeue'] or result['failed']:
+        logger.warning('Reaped report requests: %d re-queued, %d failed', len(result['requeue']), result['failed'])
+    return {'requeued': len(result['requeue']), 'failed': result['failed']}
+
+
+@shared_task
+def purge_sync_tombstones() -> int:
+    """Periodic: drop delete markers older than ``SYNC['TOMBSTONE_DAYS']``."""
+    from api.sync import SyncService
+
+    return SyncService.purge_tombstones()
+
+
+@shared_task
+def rollup_api_request_logs() -> dict:
+    """Periodic: roll request logs past ``API_REQUEST_LOG_RETENTION['RAW_DAYS']`` into hourly rows."""
+    from api.log_retention import ApiRequestLogRetention
+
+    return ApiRequestLogRetention.run()
+
+
+@shared_task
+def schedule_nightly_reports(day: str = None, chunk_size: int = None):
+    """
+    Fan the daily reports for ``day`` (default: yesterday) out over chunks
+    of active users, then summarize them in one chord callback.
+    """
+    day = date.fromisoformat(day) if day else timezone.localdate() - timedelta(days=1)
+    chunk_size = chunk_size or getattr(settings, 'NIGHTLY_REPORTS', {}).get('CHUNK_SIZE', 500)
+    user_ids = list(ReportService.active_user_ids(day))
+    header = [
+        generate_daily_reports_chunk.s(user_ids[i:i + chunk_size], day.isoformat())
+        for i in range(0, len(user_ids), chunk_size)
+    ]
+    callback = summarize_nightly_reports.s(day.isoformat(), time.time())
+    if header:
+        chord(header)(callback)
+    else:
+        callback.delay([])
+    return {'day': day.isoformat(), 'users': len(user_ids), 'chunks': len(header)}
+
+
+@shared_task
+def generate_daily_reports_chunk(user_ids: list[int], day: str) -> dict:
+    """
+    One chunk of the nightly run. Failures are counted instead of raised so a
+    bad chunk never stops the chord callback. If the grouped pass fails, the
+    chunk is retried user by user to isolate the users that cannot be built.
+    """
+    day = date.fromisoformat(day)
+    try:
+        return {**ReportService.generate_daily_reports(user_ids, day), 'failed': 0}
+    except Exception:
+        logger.exception('Nightly report chunk of %d users for %s failed; retrying per user', len(user_ids), day)
+
+    User = get_user_model()
+    result = {'users': len(user_ids), 'created': 0, 'reused': 0, 'failed': 0}
+    for user in User.objects.filter(pk__in=user_ids):
+        try:
+            _, created = ReportService.get_or_generate_daily_report(user, day=day)
+        except Exception:
+            logger.exception('Nightly report for user %s on %s failed', user.pk, day)
+            result['failed'] += 1
+        else:
+            result['created' if created else 'reused'] += 1
+    return result
+
+
+@shared_task
+def summarize_nightly_reports(results: list[dict], day: str, started_at: float) -> dict:
+    duration = max(time.time() - started_at, 0.0)
+    summary = {
+        'day': day,
+        'chunks': len(results),
+        'duration_seconds': round(duration, 3),
+    }
+    for key in ('users', 'created', 'reused', 'failed'):
+        summary[key] = sum(r.get(key, 0) for r in results)
+    summary['users_per_second'] = round(summary['users'] / duration, 1) if duration else None
+
+    cache.set(NIGHTLY_SUMMARY_CACHE_KEY, summary, timeout=None)
+    log = logger.warning if summary['failed'] else logger.info
+    log('Nightly reports for %s: %d users in %d chunks, %d created, %d reused, %d failed, %.3fs',
+        day, summary['users'], summary['chunks'], summary['created'], summary['reused'],
+        summary['failed'], duration)
+    return summary
@@ -0,0 +1,44 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class _AssertMaxQueriesContext(CaptureQueriesContext):
+    def __init__(self, test_case, maximum: int, connection):
+        self.test_case = test_case
+        self.maximum = maximum
+        super().__init__(connection)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        executed = len(self)
+        self.test_case.assertLessEqual(
+            executed, self.maximum,
+            '%d queries executed, at most %d expected\nCaptured queries were:\n%s' % (
+                executed, self.maximum,
+                '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(self.captured_queries, start=1)),
+            ),
+        )
+
+
+class QueryBudgetMixin:
+    """
+    Upper bounds on query counts, for ``TestCase`` subclasses.
+
+    ``assertNumQueries`` pins an exact count and breaks on harmless
+    changes; a budget only fails when an endpoint gets more expensive,
+    such as when a serializer starts walking a relation per row. Seed more
+    rows than the budget allows so an N+1 cannot hide under it.
+    """
+
+    def assertMaxQueries(self, maximum: int, using: str = DEFAULT_DB_ALIAS):
+        return _AssertMaxQueriesContext(self, maximum, connections[using])
+
+    def assertEndpointQueries(self, maximum: int, method: str, url: str, *args, expected_status=None, **kwargs):
+        """Call ``url`` with ``self.client`` within ``maximum`` queries and return the response."""
+        with self.assertMaxQueries(maximum):
+            response = getattr(self.client, method.lower())(url, *args, **kwargs)
+        if expected_status is not None:
+            self.assertEqual(response.status_code, expected_status, getattr(response, 'data', response))
+        return response
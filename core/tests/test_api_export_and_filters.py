@@ -35,31 +35,32 @@ class DevSessionApiFilterOrderingExportTests(APITestCase):
         )
 
     def test_filter_by_status(self):
-        url = reverse('session-list')
+        url = reverse('api-v1:session-list')
         resp = self.client.get(url, {'status': 'OPEN'})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
-        ids = [item['id'] for item in resp.data]
+        ids = [item['id'] for item in resp.data['results']]
         self.assertIn(self.s2.id, ids)
         self.assertNotIn(self.s1.id, ids)
 
     def test_ordering_by_switch_count_desc(self):
-        url = reverse('session-list')
+        url = reverse('api-v1:session-list')
         resp = self.client.get(url, {'ordering': '-switch_count'})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
-        ids = [item['id'] for item in resp.data]
+        ids = [item['id'] for item in resp.data['results']]
         self.assertEqual(ids[0], self.s2.id)
 
     def test_export_sessions_csv(self):
-        url = reverse('session-export')
+        url = reverse('api-v1:session-export')
         resp = self.client.get(url, {'format': 'csv'})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIn('text/csv', resp['Content-Type'])
-        self.assertIn('id,title,status', resp.content.decode('utf-8').splitlines()[0])
+        content = b''.join(resp.streaming_content).decode('utf-8')
+        self.assertIn('id,title,status', content.splitlines()[0])
 
     def test_export_sessions_json(self):
-        url = reverse('session-export')
+        url = reverse('api-v1:session-export')
         resp = self.client.get(url, {'format': 'json'})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIsInstance(resp.data, list)
@@ -85,33 +86,33 @@ class TaskApiFilterOrderingExportTests(APITestCase):
         )
 
     def test_filter_by_type_and_priority(self):
-        url = reverse('task-list')
+        url = reverse('api-v1:task-list')
         resp = self.client.get(url, {'type': Task.TYPE_BUG, 'priority': Task.PRIORITY_HIGH})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
-        ids = [item['id'] for item in resp.data]
+        ids = [item['id'] for item in resp.data['results']]
         self.assertIn(self.t1.id, ids)
         self.assertNotIn(self.t2.id, ids)
 
     def test_search_and_ordering(self):
-        url = reverse('task-list')
+        url = reverse('api-v1:task-list')
         resp = self.client.get(url, {'search': 'docs', 'ordering': 'title'})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
-        ids = [item['id'] for item in resp.data]
+        ids = [item['id'] for item in resp.data['results']]
         self.assertIn(self.t2.id, ids)
         self.assertNotIn(self.t1.id, ids)
 
     def test_export_tasks_csv(self):
-        url = reverse('task-export')
+        url = reverse('api-v1:task-export')
         resp = self.client.get(url, {'format': 'csv'})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIn('text/csv', resp['Content-Type'])
-        first_line = resp.content.decode('utf-8').splitlines()[0]
+        first_line = b''.join(resp.streaming_content).decode('utf-8').splitlines()[0]
         self.assertIn('id,title,type,priority', first_line)
 
     def test_export_tasks_json(self):
-        url = reverse('task-export')
+        url = reverse('api-v1:task-export')
         resp = self.client.get(url, {'format': 'json'})
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIsInstance(resp.data, list)
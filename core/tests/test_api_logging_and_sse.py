@@ -15,7 +15,7 @@ class ApiLoggingAndSseTests(APITestCase):
         self.client.force_login(self.user)
 
     def test_api_request_logging_middleware_creates_log(self):
-        url = reverse('task-list')
+        url = reverse('api-v1:task-list')
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
@@ -24,13 +24,13 @@ class ApiLoggingAndSseTests(APITestCase):
         self.assertTrue(log.path.startswith('/api/'))
         self.assertEqual(log.user, self.user)
 
-    def test_event_stream_requires_auth_and_returns_sse(self):
-        report = GeneratedReport.objects.create(
+    async def test_event_stream_requires_auth_and_returns_sse(self):
+        report = await GeneratedReport.objects.acreate(
             user=self.user,
             type='DAILY',
             payload={'sessions': []},
         )
-        Insight.objects.create(
+        await Insight.objects.acreate(
             user=self.user,
             report=report,
             code='DEMO',
@@ -38,12 +38,12 @@ class ApiLoggingAndSseTests(APITestCase):
             message='demo insight',
         )
 
-        self.client.logout()
-        url = reverse('event-stream')
-        resp = self.client.get(url)
+        # The stream is served only under ASGI, hence the async client.
+        url = reverse('api-v1:event-stream')
+        resp = await self.async_client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
 
-        self.client.force_login(self.user)
-        resp2 = self.client.get(url)
+        await self.async_client.aforce_login(self.user)
+        resp2 = await self.async_client.get(url)
         self.assertEqual(resp2.status_code, status.HTTP_200_OK)
         self.assertIn('text/event-stream', resp2['Content-Type'])
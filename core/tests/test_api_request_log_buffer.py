@@ -0,0 +1,135 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, SimpleTestCase
+
+from api.log_buffer import (
+    ApiRequestLogBuffer,
+    POLICY_DROP_NEWEST,
+    POLICY_DROP_OLDEST,
+    POLICY_BLOCK,
+)
+from api.models import ApiRequestLog
+
+User = get_user_model()
+
+
+def _record(path='/api/v1/tasks/', duration_ms=1.5, user_id=None):
+    return dict(
+        user_id=user_id,
+        path=path,
+        method='GET',
+        status_code=200,
+        duration_ms=duration_ms,
+        user_agent='test',
+        remote_addr='127.0.0.1',
+    )
+
+
+class ApiRequestLogBufferFlushTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buffer-user', password='pass')
+
+    def test_flush_writes_pending_records_with_bulk_create(self):
+        buffer = ApiRequestLogBuffer(batch_size=2, max_size=100)
+        buffer._ensure_thread = lambda: None  # only enqueue; flush explicitly below
+        for i in range(5):
+            buffer.add(_record(path=f'/api/v1/tasks/{i}/', duration_ms=float(i), user_id=self.user.pk))
+
+        self.assertEqual(ApiRequestLog.objects.count(), 0)
+
+        with self.assertNumQueries(3):
+            flushed = buffer.flush()
+
+        self.assertEqual(flushed, 5)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(ApiRequestLog.objects.count(), 5)
+        self.assertEqual(
+            sorted(ApiRequestLog.objects.values_list('duration_ms', flat=True)),
+            [0.0, 1.0, 2.0, 3.0, 4.0],
+        )
+        self.assertEqual(buffer.stats.flushed, 5)
+
+    def test_synchronous_mode_writes_on_add(self):
+        buffer = ApiRequestLogBuffer(background=False)
+        buffer.add(_record(user_id=self.user.pk))
+        self.assertEqual(ApiRequestLog.objects.filter(user=self.user).count(), 1)
+
+    def test_failed_flush_is_counted(self):
+        def broken_writer(records, batch_size):
+            raise RuntimeError('db down')
+
+        buffer = ApiRequestLogBuffer(background=False, writer=broken_writer)
+        with self.assertLogs('api.log_buffer', level='ERROR'):
+            buffer.add(_record())
+        self.assertEqual(buffer.stats.failed, 1)
+        self.assertEqual(buffer.stats.flushed, 0)
+
+
+class ApiRequestLogBufferPolicyTests(SimpleTestCase):
+    def _buffer(self, policy, **kwargs):
+        self.written = []
+        buffer = ApiRequestLogBuffer(
+            max_size=3,
+            batch_size=100,
+            overflow_policy=policy,
+            writer=lambda records, batch_size: self.written.extend(records),
+            **kwargs,
+        )
+        # Keep the records in memory without starting a flusher thread.
+        buffer._ensure_thread = lambda: None
+        return buffer
+
+    def test_drop_newest_rejects_when_full(self):
+        buffer = self._buffer(POLICY_DROP_NEWEST)
+        results = [buffer.add(_record(path=f'/api/{i}')) for i in range(5)]
+
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(buffer.stats.dropped, 2)
+        buffer.flush()
+        self.assertEqual([r['path'] for r in self.written], ['/api/0', '/api/1', '/api/2'])
+
+    def test_drop_oldest_keeps_latest_records(self):
+        buffer = self._buffer(POLICY_DROP_OLDEST)
+        for i in range(5):
+            self.assertTrue(buffer.add(_record(path=f'/api/{i}')))
+
+        self.assertEqual(buffer.stats.dropped, 2)
+        self.assertEqual(buffer.stats.enqueued, 5)
+        buffer.flush()
+        self.assertEqual([r['path'] for r in self.written], ['/api/2', '/api/3', '/api/4'])
+
+    def test_block_policy_gives_up_after_timeout(self):
+        buffer = self._buffer(POLICY_BLOCK, block_timeout=0.01)
+        for i in range(3):
+            buffer.add(_record())
+        self.assertFalse(buffer.add(_record()))
+        self.assertEqual(buffer.stats.dropped, 1)
+
+    def test_invalid_policy_raises(self):
+        with self.assertRaises(ValueError):
+            ApiRequestLogBuffer(overflow_policy='explode')
+
+
+class ApiRequestLogBufferBackgroundTests(SimpleTestCase):
+    def test_background_thread_flushes_on_batch_size_and_close(self):
+        written = []
+        flushed = threading.Event()
+
+        def writer(records, batch_size):
+            written.extend(records)
+            flushed.set()
+
+        buffer = ApiRequestLogBuffer(batch_size=2, flush_interval=60, writer=writer)
+        caller = threading.current_thread()
+        buffer.add(_record(path='/api/a'))
+        buffer.add(_record(path='/api/b'))
+
+        self.assertTrue(flushed.wait(5))
+        self.assertIsNot(buffer._thread, caller)
+        self.assertEqual([r['path'] for r in written], ['/api/a', '/api/b'])
+
+        buffer.add(_record(path='/api/c'))
+        buffer.close()
+        self.assertEqual([r['path'] for r in written], ['/api/a', '/api/b', '/api/c'])
+        self.assertFalse(buffer._thread.is_alive())
@@ -18,7 +18,7 @@ class TeamApiTests(APITestCase):
         self.client.force_login(self.owner)
 
     def test_create_team_and_list_members(self):
-        url = reverse('team-list')
+        url = reverse('api-v1:team-list')
         resp = self.client.post(url, {'name': 'Backend Team', 'slug': 'backend-team'})
         self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
 
@@ -26,11 +26,17 @@ class TeamApiTests(APITestCase):
         team = Team.objects.get(pk=team_id)
         TeamMembership.objects.create(team=team, user=self.member, role=TeamMembership.ROLE_MEMBER)
 
-        members_url = reverse('team-members', args=[team_id])
+        members_url = reverse('api-v1:team-members', args=[team_id])
         resp2 = self.client.get(members_url)
         self.assertEqual(resp2.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(resp2.data), 1)
 
+    def test_team_list_is_not_paginated(self):
+        Team.objects.create(name='Listed', slug='listed', owner=self.owner)
+        resp = self.client.get(reverse('api-v1:team-list'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([team['slug'] for team in resp.data], ['listed'])
+
 
 class ReportRequestApiTests(APITestCase):
     def setUp(self):
@@ -39,7 +45,7 @@ class ReportRequestApiTests(APITestCase):
 
     @mock.patch('core.tasks.process_report_request.delay')
     def test_create_report_request_triggers_task(self, mock_delay):
-        url = reverse('report-request-list')
+        url = reverse('api-v1:report-request-list')
         resp = self.client.post(url, {'type': 'DAILY'})
         self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
 
@@ -47,6 +53,9 @@ class ReportRequestApiTests(APITestCase):
         self.assertTrue(ReportRequest.objects.filter(pk=req_id).exists())
         mock_delay.assert_called_once_with(req_id)
 
+        listed = self.client.get(url)
+        self.assertEqual([item['id'] for item in listed.data], [req_id])
+
 
 class InsightApiTests(APITestCase):
     def setUp(self):
@@ -67,8 +76,8 @@ class InsightApiTests(APITestCase):
         )
 
     def test_list_insights(self):
-        url = reverse('insight-list')
+        url = reverse('api-v1:insight-list')
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(resp.data), 1)
-        self.assertEqual(resp.data[0]['code'], 'TEST_CODE')
+        self.assertGreaterEqual(len(resp.data['results']), 1)
+        self.assertEqual(resp.data['results'][0]['code'], 'TEST_CODE')
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import ReportRequest
+from core.http import get_async_client
+from core.integrations import GitHubIntegrationError
+from core.models import Task, Team
+from core.services import ReportService
+
+User = get_user_model()
+
+
+class GitHubImportViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='import-user', password='pass')
+        self.team = Team.objects.create(name='Imports', slug='imports', owner=self.user)
+        self.client.force_login(self.user)
+        self.url = reverse('api-v1:task-import-github')
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        resp = self.client.post(self.url, {'owner': 'o', 'repo': 'r'}, format='json')
+        self.assertIn(resp.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_validates_payload_and_team(self):
+        resp = self.client.post(self.url, {'owner': 'o'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        resp = self.client.post(self.url, {'owner': 'o', 'repo': 'r', 'team_id': 999}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_import_within_budget_returns_tasks(self):
+        async def fake_import(owner, repo, team=None):
+            return [await Task.objects.acreate(title=f'{owner}/{repo}', team=team)]
+
+        with mock.patch('api.views.GitHubImporter.import_issues_for_repo', side_effect=fake_import):
+            resp = self.client.post(self.url, {'owner': 'o', 'repo': 'r', 'team_id': self.team.id}, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data[0]['title'], 'o/r')
+
+    def test_integration_errors_are_reported(self):
+        async def failing_import(owner, repo, team=None):
+            raise GitHubIntegrationError('GITHUB_TOKEN is not configured')
+
+        with mock.patch('api.views.GitHubImporter.import_issues_for_repo', side_effect=failing_import):
+            resp = self.client.post(self.url, {'owner': 'o', 'repo': 'r'}, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('GITHUB_TOKEN', resp.data['detail'])
+
+    @override_settings(ASYNC_OFFLOAD={'LATENCY_BUDGET': 0.01})
+    def test_slow_import_is_offloaded_to_celery(self):
+        async def slow_import(owner, repo, team=None):
+            await asyncio.sleep(5)
+
+        with mock.patch('api.views.GitHubImporter.import_issues_for_repo', side_effect=slow_import), \
+                mock.patch('core.tasks.import_github_issues.delay') as delay:
+            delay.return_value.id = 'celery-id'
+            resp = self.client.post(self.url, {'owner': 'o', 'repo': 'r', 'team_id': self.team.id}, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(resp.data, {'status': 'queued', 'task_id': 'celery-id'})
+        delay.assert_called_once_with('o', 'r', self.team.id)
+
+
+@mock.patch('api.views.fetch_external_enrichment', new=mock.AsyncMock(return_value={'ok': True}))
+class AsyncDailyReportViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='async-report', password='pass')
+        self.client.force_login(self.user)
+        self.url = reverse('api-v1:daily-report-async')
+
+    def test_report_is_returned_with_external_data(self):
+        resp = self.client.post(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data['external'], {'ok': True})
+
+        resp = self.client.post(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    @override_settings(ASYNC_OFFLOAD={'LATENCY_BUDGET': 0.01})
+    def test_slow_generation_queues_report_request(self):
+        generate = ReportService.get_or_generate_daily_report
+
+        def slow_generate(*args, **kwargs):
+            time.sleep(0.2)
+            return generate(*args, **kwargs)
+
+        with mock.patch('api.views.ReportService.get_or_generate_daily_report', side_effect=slow_generate), \
+                mock.patch('core.tasks.process_report_request.delay') as delay:
+            resp = self.client.post(self.url)
+
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        req = ReportRequest.objects.get(pk=resp.data['id'])
+        self.assertEqual(req.type, ReportRequest.TYPE_DAILY)
+        delay.assert_called_once_with(req.id)
+
+    async def test_failed_generation_cancels_the_enrichment_call(self):
+        cancelled = asyncio.Event()
+
+        async def slow_enrichment(user, timeout):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        await self.async_client.aforce_login(self.user)
+        with mock.patch('api.views.fetch_external_enrichment', side_effect=slow_enrichment), \
+                mock.patch('api.views.ReportService.get_or_generate_daily_report', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                await self.async_client.post(self.url)
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+class SharedAsyncClientTests(SimpleTestCase):
+    def test_one_client_per_event_loop(self):
+        async def clients():
+            return get_async_client(), get_async_client()
+
+        first, again = asyncio.run(clients())
+        other, _ = asyncio.run(clients())
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, other)
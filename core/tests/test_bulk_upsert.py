@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import DailyRollup, DevSession, ResourceLink, Task, Team
+
+User = get_user_model()
+
+
+class TaskBulkUpsertTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulk-tasks')
+        self.client.force_login(self.user)
+        self.url = reverse('api-v1:task-bulk')
+        self.existing = Task.objects.create(
+            title='Old title', external_source=Task.SOURCE_JIRA, external_id='DEV-1',
+        )
+
+    def test_upserts_on_external_source_and_id_in_a_fixed_number_of_queries(self):
+        items = [
+            {'title': 'New title', 'external_source': 'JIRA', 'external_id': 'DEV-1'},
+            *({'title': f'Issue {n}', 'external_source': 'JIRA', 'external_id': f'DEV-{n}'} for n in range(2, 52)),
+            {'title': 'Manual task'},
+        ]
+        # Session, user, lookup, savepoint, insert, update, release and the request log.
+        with self.assertNumQueries(8):
+            resp = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual((resp.data['created'], resp.data['updated'], resp.data['error']), (51, 1, 0))
+        self.assertEqual(resp.data['results'][0], {'index': 0, 'status': 'updated', 'id': self.existing.pk})
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.title, 'New title')
+        self.assertEqual(Task.objects.filter(external_source='JIRA').count(), 51)
+        self.assertTrue(all(result['id'] for result in resp.data['results']))
+
+    def test_invalid_items_are_reported_and_the_rest_are_written(self):
+        foreign = Team.objects.create(name='Foreign', slug='foreign', owner=User.objects.create_user(username='x'))
+        items = {'items': [
+            {'title': 'Good', 'external_source': 'GITHUB', 'external_id': '7'},
+            {'external_id': 'no-title'},
+            {'title': 'Again', 'external_source': 'GITHUB', 'external_id': '7'},
+            {'title': 'Wrong team', 'team': foreign.pk},
+        ]}
+        resp = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in resp.data['results']], ['created', 'error', 'error', 'error'])
+        self.assertIn('title', resp.data['results'][1]['errors'])
+        self.assertIn('team', resp.data['results'][3]['errors'])
+        self.assertEqual(Task.objects.get(external_source='GITHUB', external_id='7').title, 'Good')
+
+    def test_all_invalid_or_oversized_payloads_are_rejected(self):
+        self.assertEqual(self.client.post(self.url, [{}], format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self.client.post(self.url, [{'title': 't'}] * 1001, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Task.objects.count(), 1)
+
+
+class DevSessionBulkUpsertTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulk-sessions')
+        self.client.force_login(self.user)
+        self.url = reverse('api-v1:session-bulk')
+        self.started = timezone.now() - timedelta(hours=2)
+        self.session = DevSession.objects.create(user=self.user, title='Open', started_at=self.started)
+
+    def test_creates_and_updates_keep_rollups_in_step(self):
+        items = [
+            {'title': 'Imported', 'started_at': (self.started + timedelta(minutes=5)).isoformat()},
+            {
+                'title': 'Finished', 'status': 'DONE',
+                'started_at': self.started.isoformat(),
+                'ended_at': (self.started + timedelta(minutes=45)).isoformat(),
+            },
+            {'id': self.session.pk, 'status': 'DONE', 'ended_at': (self.started + timedelta(minutes=90)).isoformat()},
+        ]
+        resp = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in resp.data['results']], ['created', 'created', 'updated'])
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.status, self.session.total_focus_minutes), ('DONE', 90))
+        self.assertEqual(DevSession.objects.get(title='Finished').total_focus_minutes, 45)
+
+        rollup = DailyRollup.objects.get(user=self.user, day=timezone.localtime(self.started).date())
+        self.assertEqual((rollup.session_count, rollup.focus_minutes), (3, 135))
+
+    def test_other_users_sessions_and_start_changes_are_item_errors(self):
+        other = DevSession.objects.create(user=User.objects.create_user(username='bulk-other'), title='Theirs')
+        second = DevSession.objects.create(user=self.user, title='Second')
+        items = [
+            {'id': other.pk, 'title': 'Mine now'},
+            {'id': second.pk, 'started_at': timezone.now().isoformat()},
+            {'id': self.session.pk, 'title': 'Renamed'},
+            {'id': self.session.pk, 'title': 'Renamed twice'},
+        ]
+        resp = self.client.post(self.url, items, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in resp.data['results']], ['error', 'error', 'updated', 'error'])
+        self.assertIn('id', resp.data['results'][0]['errors'])
+        self.assertIn('started_at', resp.data['results'][1]['errors'])
+        other.refresh_from_db()
+        self.session.refresh_from_db()
+        self.assertEqual((other.title, self.session.title), ('Theirs', 'Renamed'))
+
+
+class ResourceLinkBulkUpsertTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulk-links')
+        self.client.force_login(self.user)
+        self.session = DevSession.objects.create(user=self.user, title='Links')
+        self.task = Task.objects.create(title='Linked')
+
+    def test_links_are_created_only_on_the_users_sessions(self):
+        other = DevSession.objects.create(user=User.objects.create_user(username='bulk-links-other'), title='Other')
+        items = [
+            {'dev_session': self.session.pk, 'task': self.task.pk, 'title': 'PR', 'url': 'https://example.com/pr/1'},
+            {'dev_session': other.pk, 'title': 'Sneaky', 'url': 'https://example.com'},
+            {'dev_session': self.session.pk, 'task': 0, 'title': 'Bad task', 'url': 'https://example.com'},
+            {'dev_session': self.session.pk, 'title': 'Bad url', 'url': 'not a url'},
+        ]
+        resp = self.client.post(reverse('api-v1:resource-bulk'), items, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in resp.data['results']], ['created', 'error', 'error', 'error'])
+        self.assertEqual(list(ResourceLink.objects.values_list('title', flat=True)), ['PR'])
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import DevSession, ContextSwitch, Task
+
+User = get_user_model()
+
+
+class ContextSwitchCounterSignalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='counter-user', password='pass')
+        self.session = DevSession.objects.create(user=self.user, title='Counters')
+
+    def test_single_switch_increments_without_recounting(self):
+        with CaptureQueriesContext(connection) as ctx:
+            ContextSwitch.objects.create(dev_session=self.session)
+
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+        session_updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "core_devsession"')]
+        self.assertEqual(len(session_updates), 1)
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.switch_count, 1)
+
+    def test_last_switch_at_keeps_latest_timestamp(self):
+        now = timezone.now()
+        ContextSwitch.objects.create(dev_session=self.session, happened_at=now)
+        ContextSwitch.objects.create(dev_session=self.session, happened_at=now - timedelta(hours=1))
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.switch_count, 2)
+        self.assertEqual(self.session.last_switch_at, now)
+
+
+class ContextSwitchBulkApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulk-user', password='pass')
+        self.other = User.objects.create_user(username='bulk-other', password='pass')
+        self.client.force_login(self.user)
+
+        self.s1 = DevSession.objects.create(user=self.user, title='S1')
+        self.s2 = DevSession.objects.create(user=self.user, title='S2')
+        self.foreign = DevSession.objects.create(user=self.other, title='Foreign')
+        self.task = Task.objects.create(title='T')
+        self.url = reverse('api-v1:context-switch-bulk')
+
+    def test_bulk_ingest_updates_counters_once_per_session(self):
+        base = timezone.now() - timedelta(hours=2)
+        payload = [
+            {
+                'dev_session': self.s1.id if i % 2 else self.s2.id,
+                'to_task': self.task.id,
+                'reason': ContextSwitch.REASON_INTERRUPT,
+                'happened_at': (base + timedelta(seconds=i)).isoformat(),
+            }
+            for i in range(300)
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(self.url, payload, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED, resp.data)
+
+        session_updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "core_devsession"')]
+        self.assertEqual(len(session_updates), 2)
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(len(resp.data), 300)
+
+        self.s1.refresh_from_db()
+        self.s2.refresh_from_db()
+        self.assertEqual(self.s1.switch_count, 150)
+        self.assertEqual(self.s2.switch_count, 150)
+        self.assertEqual(self.s1.last_switch_at, base + timedelta(seconds=299))
+        self.assertEqual(ContextSwitch.objects.count(), 300)
+
+    def test_bulk_ingest_rejects_foreign_sessions_atomically(self):
+        payload = {'switches': [
+            {'dev_session': self.s1.id},
+            {'dev_session': self.foreign.id},
+        ]}
+        resp = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('dev_session', resp.data['switches'][1])
+        self.assertEqual(ContextSwitch.objects.count(), 0)
+        self.s1.refresh_from_db()
+        self.assertEqual(self.s1.switch_count, 0)
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import Task, DevSession
+
+User = get_user_model()
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='page-user', password='pass')
+        self.client.force_login(self.user)
+
+    def _walk(self, url, params):
+        ids, pages = [], 0
+        resp = self.client.get(url, params)
+        while True:
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in resp.data['results'])
+            pages += 1
+            if not resp.data['next']:
+                return ids, pages
+            resp = self.client.get(resp.data['next'])
+
+    def test_walks_all_tasks_with_created_at_ties(self):
+        Task.objects.bulk_create([Task(title=f'T{i}') for i in range(25)])
+        same_instant = timezone.now()
+        Task.objects.filter(pk__in=list(Task.objects.values_list('pk', flat=True)[:10])).update(
+            created_at=same_instant,
+        )
+
+        ids, pages = self._walk(reverse('api-v1:task-list'), {'page_size': 4})
+
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 7)
+
+    def test_custom_ordering_with_nullable_field(self):
+        now = timezone.now()
+        for i in range(9):
+            DevSession.objects.create(
+                user=self.user,
+                title=f'S{i}',
+                ended_at=None if i % 3 == 0 else now - timedelta(minutes=i % 2),
+            )
+
+        ids, _ = self._walk(reverse('api-v1:session-list'), {'ordering': '-ended_at', 'page_size': 2})
+
+        self.assertEqual(len(ids), 9)
+        self.assertEqual(len(set(ids)), 9)
+        ended = dict(DevSession.objects.values_list('id', 'ended_at'))
+        self.assertTrue(all(ended[i] is None for i in ids[-3:]))
+
+    def test_pages_use_keyset_filter_not_offset(self):
+        Task.objects.bulk_create([Task(title=f'T{i}') for i in range(6)])
+        first = self.client.get(reverse('api-v1:task-list'), {'page_size': 2})
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data['next'])
+
+        task_sql = [q['sql'] for q in ctx.captured_queries if 'FROM "core_task"' in q['sql']]
+        self.assertEqual(len(task_sql), 1)
+        self.assertNotIn('OFFSET', task_sql[0])
+
+    def test_invalid_cursor_returns_404(self):
+        resp = self.client.get(reverse('api-v1:task-list'), {'cursor': 'garbage'})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_from_other_ordering_is_rejected(self):
+        Task.objects.bulk_create([Task(title=f'T{i}') for i in range(3)])
+        first = self.client.get(reverse('api-v1:task-list'), {'page_size': 1})
+        cursor = first.data['next'].split('cursor=')[1]
+
+        resp = self.client.get(reverse('api-v1:task-list'), {'ordering': 'title', 'cursor': cursor})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='fields-user', password='pass')
+        self.client.force_login(self.user)
+        Task.objects.create(title='Sparse', description='x' * 1000)
+
+    def test_fields_param_limits_payload_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse('api-v1:task-list'), {'fields': 'id,title'})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(resp.data['results'][0]), {'id', 'title'})
+
+        task_sql = next(q['sql'] for q in ctx.captured_queries if 'FROM "core_task"' in q['sql'])
+        self.assertNotIn('"description"', task_sql)
+
+    def test_unknown_fields_are_ignored(self):
+        resp = self.client.get(reverse('api-v1:task-list'), {'fields': 'title,nope'})
+        self.assertEqual(set(resp.data['results'][0]), {'title'})
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import DevSession, ContextSwitch, DailyRollup
+from core.services import ContextSwitchService, SessionService, ReportService
+
+User = get_user_model()
+
+
+class DailyRollupMaintenanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='rollup-user', password='pass')
+        self.now = timezone.now()
+        self.today = timezone.localtime(self.now).date()
+        self.session = DevSession.objects.create(
+            user=self.user,
+            title='Deep work',
+            started_at=self.now - timedelta(minutes=45),
+        )
+
+    def _rollup(self, day=None):
+        return DailyRollup.objects.get(user=self.user, day=day or self.today)
+
+    def test_session_switches_and_close_update_rollup(self):
+        ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_MEETING)
+        ContextSwitchService.record_bulk([
+            ContextSwitch(dev_session=self.session, reason=ContextSwitch.REASON_INTERRUPT),
+            ContextSwitch(dev_session=self.session, reason=ContextSwitch.REASON_INTERRUPT),
+        ])
+        SessionService.close_session(self.session)
+
+        rollup = self._rollup()
+        self.assertEqual(rollup.session_count, 1)
+        self.assertEqual(rollup.switch_count, 3)
+        self.assertEqual(rollup.focus_minutes, 45)
+        self.assertEqual(rollup.switches_by_reason[ContextSwitch.REASON_INTERRUPT], 2)
+        self.assertEqual(rollup.switches_by_reason[ContextSwitch.REASON_MEETING], 1)
+
+    def test_closing_twice_does_not_double_count_focus(self):
+        SessionService.close_session(self.session)
+        SessionService.close_session(self.session)
+        self.assertEqual(self._rollup().focus_minutes, 45)
+
+    def test_deletes_take_switches_and_sessions_back_out(self):
+        switch = ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_MEETING)
+        ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_INTERRUPT)
+        ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_INTERRUPT)
+        SessionService.close_session(self.session)
+
+        switch.delete()
+        rollup = self._rollup()
+        self.assertEqual((rollup.switch_count, rollup.meeting_switches, rollup.interrupt_switches), (2, 0, 2))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.switch_count, 2)
+
+        self.session.delete()
+        rollup = self._rollup()
+        self.assertEqual(
+            (rollup.session_count, rollup.switch_count, rollup.interrupt_switches, rollup.focus_minutes), (0, 0, 0, 0),
+        )
+        report = ReportService.generate_daily_report(self.user, day=self.today)
+        self.assertEqual(report.payload['totals']['session_count'], 0)
+        self.assertEqual(report.payload['totals']['switch_count'], 0)
+        self.assertEqual(report.payload['sessions'], [])
+
+    def test_deleting_the_user_removes_its_rollups(self):
+        ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_MEETING)
+        self.user.delete()
+        self.assertFalse(DailyRollup.objects.exists())
+
+    def test_rebuild_command_matches_incremental_rollup(self):
+        ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_QUICK_FIX)
+        SessionService.close_session(self.session)
+        incremental = self._rollup()
+
+        DailyRollup.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_daily_rollups', start=str(self.today), end=str(self.today), stdout=out)
+
+        rebuilt = self._rollup()
+        self.assertIn('Rebuilt 1 daily rollups', out.getvalue())
+        for field in ('session_count', 'switch_count', 'focus_minutes', 'quick_fix_switches'):
+            self.assertEqual(getattr(rebuilt, field), getattr(incremental, field), field)
+
+    def test_migration_backfills_existing_history(self):
+        ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_INTERRUPT)
+        ContextSwitch.objects.create(dev_session=self.session, reason=ContextSwitch.REASON_MEETING)
+        SessionService.close_session(self.session)
+        incremental = self._rollup()
+
+        DailyRollup.objects.all().delete()
+        import_module('core.migrations.0003_dailyrollup').backfill_daily_rollups(apps, None)
+
+        backfilled = self._rollup()
+        for field in ('session_count', 'switch_count', 'focus_minutes', 'interrupt_switches', 'meeting_switches'):
+            self.assertEqual(getattr(backfilled, field), getattr(incremental, field), field)
+
+
+class DailyReportFromRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='rollup-report', password='pass')
+        self.today = timezone.localtime().date()
+        session = DevSession.objects.create(user=self.user, title='Today')
+        ContextSwitch.objects.create(dev_session=session, reason=ContextSwitch.REASON_INTERRUPT)
+
+    def test_report_reads_totals_from_rollup_without_join(self):
+        with self.assertNumQueries(9):
+            # two fingerprint aggregates, cache lookup, rollup, sessions, then
+            # report insert and one LOW_FOCUS_TIME insight inside a savepoint
+            report = ReportService.generate_daily_report(self.user, day=self.today)
+
+        totals = report.payload['totals']
+        self.assertEqual(totals['session_count'], 1)
+        self.assertEqual(totals['switch_count'], 1)
+        self.assertEqual(totals['switches_by_reason'][ContextSwitch.REASON_INTERRUPT], 1)
+        self.assertEqual(report.payload['sessions'][0]['switch_count'], 1)
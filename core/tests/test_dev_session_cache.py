@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import TestCase, SimpleTestCase, RequestFactory
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.cache import TTLCache, MISSING
+from core.models import DevSession
+from core.services import ActiveSessionService, SessionService
+from devfocus.middleware import DevSessionMiddleware, aget_dev_session, get_dev_session
+
+User = get_user_model()
+
+
+class TTLCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(max_size=2, ttl=10, clock=lambda: self.now)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        self.assertIs(self.cache.get('b'), MISSING)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.stats.evictions, 1)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set('a', None)
+        self.assertIsNone(self.cache.get('a'))
+
+        self.now = 10.5
+        self.assertIs(self.cache.get('a'), MISSING)
+        self.assertEqual(self.cache.stats.as_dict()['expirations'], 1)
+        self.assertEqual(self.cache.stats.as_dict()['hit_ratio'], 0.5)
+
+
+class DevSessionMiddlewareTests(TestCase):
+    def setUp(self):
+        ActiveSessionService.cache().clear()
+        self.user = User.objects.create_user(username='mw-user', password='pass')
+        self.session = DevSession.objects.create(user=self.user, title='IDE')
+        self.middleware = DevSessionMiddleware(lambda request: HttpResponse())
+        self.factory = RequestFactory()
+
+    def _request(self, session_id):
+        request = self.factory.get('/api/v1/tasks/', headers={'X-Dev-Session-Id': str(session_id)})
+        self.middleware.process_request(request)
+        return request
+
+    def test_lookup_is_lazy_and_cached(self):
+        stats = ActiveSessionService.cache().stats
+        hits, misses = stats.hits, stats.misses
+
+        with self.assertNumQueries(0):
+            request = self._request(self.session.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(request.dev_session.pk, self.session.pk)
+            self.assertEqual(request.dev_session.user.username, 'mw-user')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._request(self.session.pk).dev_session.title, 'IDE')
+
+        self.assertEqual((stats.hits - hits, stats.misses - misses), (1, 1))
+
+    def test_save_and_close_invalidate_cached_session(self):
+        self._request(self.session.pk).dev_session.pk
+
+        self.session.title = 'Renamed'
+        self.session.save()
+        self.assertEqual(self._request(self.session.pk).dev_session.title, 'Renamed')
+
+        SessionService.close_session(self.session)
+        self.assertIsNone(get_dev_session(self._request(self.session.pk)))
+
+    def test_cached_instances_are_not_shared_between_requests(self):
+        first = self._request(self.session.pk).dev_session
+        first.title = 'Mutated by a view'
+        self.assertEqual(self._request(self.session.pk).dev_session.title, 'IDE')
+
+    def test_invalid_or_missing_ids(self):
+        self.assertIsNone(get_dev_session(self._request('abc')))
+        self.assertIsNone(get_dev_session(self._request(999999)))
+
+        request = self.factory.get('/api/v1/tasks/')
+        self.middleware.process_request(request)
+        self.assertIsNone(request.dev_session)
+
+    def test_only_requests_through_the_middleware_get_the_attribute(self):
+        self.assertFalse(hasattr(self.factory.get('/api/v1/tasks/'), 'dev_session'))
+
+    async def test_async_views_resolve_the_session_off_the_event_loop(self):
+        session = await aget_dev_session(self._request(self.session.pk))
+        self.assertEqual(session.title, 'IDE')
+
+
+class CacheStatsViewTests(APITestCase):
+    def test_requires_admin(self):
+        url = reverse('api-v1:cache-stats')
+        user = User.objects.create_user(username='plain', password='pass')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_superuser(username='admin', password='pass')
+        self.client.force_login(admin)
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn('hits', resp.data['dev_sessions'])
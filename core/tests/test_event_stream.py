@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.events import (
+    InProcessBroker,
+    stream_events,
+    EVENT_CONTEXT_SWITCH,
+    EVENT_INSIGHT_CREATED,
+    EVENT_REPORT_CREATED,
+    EVENT_RESYNC,
+)
+from core.models import DevSession, ContextSwitch, GeneratedReport, Insight
+from core.services import ContextSwitchService
+
+User = get_user_model()
+
+
+def _parse(chunk):
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    fields = {}
+    for line in chunk.strip().splitlines():
+        key, _, value = line.partition(': ')
+        fields[key] = value
+    return fields
+
+
+class InProcessBrokerTests(SimpleTestCase):
+    async def test_publish_from_another_thread_reaches_subscriber(self):
+        broker = InProcessBroker()
+        async with broker.subscribe(1) as (subscription, replay):
+            self.assertEqual(replay, [])
+            thread = threading.Thread(target=broker.publish, args=(1, 'ping', {'n': 1}))
+            thread.start()
+            thread.join()
+            event = await subscription.get(timeout=1)
+
+        self.assertEqual(event.type, 'ping')
+        self.assertEqual(event.data, {'n': 1})
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_replay_after_last_event_id(self):
+        broker = InProcessBroker(replay_size=3)
+        first = broker.publish(1, 'a', {})
+        broker.publish(2, 'other-user', {})
+        second = broker.publish(1, 'b', {})
+
+        self.assertEqual(broker.replay_after(1, first.id), [second])
+        self.assertEqual(broker.replay_after(1, second.id), [])
+
+    def test_replay_gap_and_foreign_ids_request_resync(self):
+        broker = InProcessBroker(replay_size=2)
+        first = broker.publish(1, 'a', {})
+        for _ in range(3):
+            broker.publish(1, 'b', {})
+
+        self.assertIsNone(broker.replay_after(1, first.id))
+        self.assertIsNone(broker.replay_after(1, 'previous-boot-7'))
+
+    def test_only_recently_active_users_keep_a_replay_buffer(self):
+        broker = InProcessBroker(replay_users=2)
+        old = broker.publish(1, 'a', {})
+        broker.publish(1, 'unseen', {})
+        broker.publish(2, 'b', {})
+        third = broker.publish(3, 'c', {})
+        broker.publish(2, 'b', {})
+
+        self.assertEqual(list(broker._replay), [3, 2])
+        self.assertIsNone(broker.replay_after(1, old.id))
+        self.assertEqual(broker.replay_after(3, third.id), [])
+
+        again = broker.publish(1, 'a', {})
+        self.assertEqual(len(broker._replay), 2)
+        self.assertIsNone(broker.replay_after(1, old.id))
+        self.assertEqual(broker.replay_after(1, again.id), [])
+
+    async def test_slow_subscriber_is_closed_instead_of_buffering_forever(self):
+        broker = InProcessBroker(queue_size=2)
+        async with broker.subscribe(1) as (subscription, _):
+            for i in range(3):
+                broker.publish(1, 'tick', {'i': i})
+            await asyncio.sleep(0)
+            self.assertTrue(subscription.closed)
+            self.assertIsNone(await subscription.get(timeout=1))
+
+
+@override_settings(EVENT_STREAM={'HEARTBEAT_INTERVAL': 0.01})
+class StreamEventsTests(SimpleTestCase):
+    async def test_stream_replays_then_pushes_live_events_and_heartbeats(self):
+        broker = InProcessBroker()
+        seen = broker.publish(5, 'old', {})
+        missed = broker.publish(5, 'missed', {'x': 1})
+
+        with mock.patch('core.events._broker', broker):
+            stream = stream_events(5, last_event_id=seen.id)
+            self.assertTrue((await anext(stream)).startswith('retry:'))
+            self.assertEqual(_parse(await anext(stream))['id'], missed.id)
+
+            self.assertEqual(await anext(stream), ': heartbeat\n\n')
+            live = broker.publish(5, 'live', {'y': 2})
+            chunk = await anext(stream)
+            while chunk.startswith(':'):
+                chunk = await anext(stream)
+            await stream.aclose()
+
+        fields = _parse(chunk)
+        self.assertEqual(fields['id'], live.id)
+        self.assertEqual(json.loads(fields['data']), {'y': 2})
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_unknown_last_event_id_sends_resync(self):
+        with mock.patch('core.events._broker', InProcessBroker()):
+            stream = stream_events(5, last_event_id='123-4')
+            await anext(stream)
+            self.assertEqual(_parse(await anext(stream))['event'], EVENT_RESYNC)
+            await stream.aclose()
+
+
+class EventPublishingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='events-user', password='pass')
+        self.broker = InProcessBroker()
+        patcher = mock.patch('core.events._broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _events(self):
+        return [event.type for event in self.broker.replay_after(self.user.pk, f'{self.broker.boot}-0')]
+
+    def test_reports_and_insights_publish_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            report = GeneratedReport.objects.create(user=self.user, type=GeneratedReport.TYPE_DAILY, payload={})
+            Insight.objects.create(user=self.user, report=report, code='DEMO', message='demo')
+            self.assertEqual(self._events(), [])
+
+        self.assertEqual(self._events(), [EVENT_REPORT_CREATED, EVENT_INSIGHT_CREATED])
+
+    def test_bulk_switches_publish_one_event_per_session(self):
+        session = DevSession.objects.create(user=self.user, title='Focus')
+        with self.captureOnCommitCallbacks(execute=True):
+            ContextSwitchService.record_bulk([ContextSwitch(dev_session=session) for _ in range(4)])
+
+        events = self.broker.replay_after(self.user.pk, f'{self.broker.boot}-0')
+        self.assertEqual([e.type for e in events], [EVENT_CONTEXT_SWITCH])
+        self.assertEqual(events[0].data['count'], 4)
+        self.assertEqual(len(events[0].data['ids']), 4)
+
+
+class EventStreamViewTests(TestCase):
+    async def test_stream_resumes_from_last_event_id_header(self):
+        user = await User.objects.acreate_user(username='sse-user', password='pass')
+        broker = InProcessBroker()
+        seen = broker.publish(user.pk, 'old', {})
+        missed = broker.publish(user.pk, EVENT_REPORT_CREATED, {'id': 1})
+
+        await self.async_client.aforce_login(user)
+        with mock.patch('core.events._broker', broker):
+            resp = await self.async_client.get(
+                reverse('api-v1:event-stream'),
+                headers={'Last-Event-ID': seen.id},
+            )
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(resp.is_async)
+
+            chunks = aiter(resp.streaming_content)
+            self.assertTrue((await anext(chunks)).startswith(b'retry:'))
+            self.assertEqual(_parse(await anext(chunks))['id'], missed.id)
+            await chunks.aclose()
+
+    def test_wsgi_requests_are_refused_instead_of_buffered_forever(self):
+        self.client.force_login(User.objects.create_user(username='sse-wsgi'))
+        resp = self.client.get(reverse('api-v1:event-stream'))
+        self.assertEqual(resp.status_code, 501)
+        self.assertFalse(resp.streaming)
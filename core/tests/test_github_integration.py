@@ -1,54 +1,132 @@
-import asyncio
+import time
 from unittest import mock
 
-from django.conf import settings
-from django.test import TestCase
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-from core.integrations import GitHubImporter, GitHubIntegrationError
+from core.integrations import GitHubImporter, GitHubIntegrationError, GitHubRateLimitError
 from core.models import Task, Team
+from core.tasks import import_github_issues
 
+User = get_user_model()
 
+ISSUES_URL = 'https://api.github.com/repos/owner/repo/issues'
+
+
+def _issue(issue_id, title=None, **extra):
+    return {
+        'id': issue_id,
+        'title': title or f'Issue {issue_id}',
+        'body': f'Body {issue_id}',
+        'html_url': f'https://github.com/owner/repo/issues/{issue_id}',
+        **extra,
+    }
+
+
+def _link(last_page):
+    return f'<{ISSUES_URL}?per_page=100&page=2>; rel="next", <{ISSUES_URL}?per_page=100&page={last_page}>; rel="last"'
+
+
+@override_settings(GITHUB_TOKEN='dummy-token')
 class GitHubImporterTests(TestCase):
     def setUp(self):
-        settings.GITHUB_TOKEN = 'dummy-token'
-        self.team = Team.objects.create(name='GH Team', slug='gh-team', owner_id=None)
-
-    def _run_async(self, coro):
-        return asyncio.get_event_loop().run_until_complete(coro)
-
-    @mock.patch('core.integrations.httpx.AsyncClient')
-    def test_import_issues_creates_tasks(self, mock_client_cls):
-        mock_client = mock.MagicMock()
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
-
-        mock_client.get.return_value.status_code = 200
-        mock_client.get.return_value.json.return_value = [
-            {
-                'id': 123,
-                'title': 'Sample issue',
-                'body': 'Issue body',
-                'html_url': 'https://github.com/owner/repo/issues/1',
-            },
-            {
-                'id': 456,
-                'title': 'Another issue',
-                'body': '',
-                'html_url': 'https://github.com/owner/repo/issues/2',
-                'pull_request': {},
-            },
-        ]
+        cache.clear()
+        owner = User.objects.create_user(username='gh-owner', password='pass')
+        self.team = Team.objects.create(name='GH Team', slug='gh-team', owner=owner)
+        self.requests = []
 
-        tasks = self._run_async(
-            GitHubImporter.import_issues_for_repo('owner', 'repo', team=self.team)
-        )
+    def _client(self, handler):
+        def record(request):
+            self.requests.append(request)
+            return handler(request)
+        return httpx.AsyncClient(transport=httpx.MockTransport(record))
+
+    async def test_import_issues_creates_tasks(self):
+        def handler(request):
+            return httpx.Response(200, json=[
+                _issue(123, 'Sample issue'),
+                _issue(456, 'Another issue', pull_request={}),
+            ])
+
+        async with self._client(handler) as client:
+            tasks = await GitHubImporter.import_issues_for_repo('owner', 'repo', team=self.team, client=client)
 
         self.assertEqual(len(tasks), 1)
         t = tasks[0]
         self.assertEqual(t.external_id, '123')
         self.assertEqual(t.external_source, Task.SOURCE_GITHUB)
-        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(await Task.objects.acount(), 1)
+        self.assertEqual(self.requests[0].headers['Authorization'], 'Bearer dummy-token')
 
-    def test_import_issues_without_token_raises(self):
-        settings.GITHUB_TOKEN = ''
+    @override_settings(GITHUB_TOKEN='')
+    async def test_import_issues_without_token_raises(self):
         with self.assertRaises(GitHubIntegrationError):
-            self._run_async(GitHubImporter.import_issues_for_repo('o', 'r', team=None))
+            await GitHubImporter.import_issues_for_repo('o', 'r', team=None)
+
+    def test_celery_task_closes_its_client(self):
+        client = self._client(lambda request: httpx.Response(200, json=[_issue(7)]))
+
+        with mock.patch('core.tasks.build_async_client', return_value=client):
+            task_ids = import_github_issues('owner', 'repo', team_id=self.team.pk)
+
+        self.assertEqual(list(Task.objects.values_list('pk', flat=True)), task_ids)
+        self.assertTrue(client.is_closed)
+
+    async def test_follows_link_pagination_and_upserts_existing_rows(self):
+        existing = await Task.objects.acreate(
+            title='Old title', external_source=Task.SOURCE_GITHUB, external_id='1',
+        )
+
+        def handler(request):
+            page = int(request.url.params['page'])
+            headers = {'Link': _link(3)} if page == 1 else {}
+            return httpx.Response(200, json=[_issue(page * 10 + i) for i in range(2)] if page > 1
+                                  else [_issue(1, 'New title'), _issue(2)], headers=headers)
+
+        async with self._client(handler) as client:
+            tasks = await GitHubImporter.import_issues_for_repo('owner', 'repo', team=self.team, client=client)
+
+        self.assertEqual(sorted(int(r.url.params['page']) for r in self.requests), [1, 2, 3])
+        self.assertEqual([t.external_id for t in tasks], ['1', '2', '20', '21', '30', '31'])
+        self.assertEqual(await Task.objects.acount(), 6)
+
+        await existing.arefresh_from_db()
+        self.assertEqual(existing.title, 'New title')
+        self.assertEqual(existing.team_id, self.team.id)
+
+    async def test_unchanged_pages_are_served_from_etag(self):
+        def handler(request):
+            if request.headers.get('If-None-Match') == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=[_issue(7)], headers={'ETag': '"v1"'})
+
+        async with self._client(handler) as client:
+            await GitHubImporter.import_issues_for_repo('owner', 'repo', client=client)
+            await Task.objects.filter(external_id='7').aupdate(title='Edited locally')
+            tasks = await GitHubImporter.import_issues_for_repo('owner', 'repo', client=client)
+
+        self.assertEqual(self.requests[1].headers['If-None-Match'], '"v1"')
+        self.assertEqual([t.title for t in tasks], ['Edited locally'])
+
+    async def test_retries_after_rate_limit(self):
+        responses = [
+            httpx.Response(403, headers={'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()))}),
+            httpx.Response(200, json=[_issue(9)]),
+        ]
+
+        async with self._client(lambda request: responses.pop(0)) as client:
+            tasks = await GitHubImporter.import_issues_for_repo('owner', 'repo', client=client)
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual([t.external_id for t in tasks], ['9'])
+
+    async def test_long_rate_limit_wait_raises(self):
+        def handler(request):
+            return httpx.Response(429, headers={'Retry-After': '3600'})
+
+        async with self._client(handler) as client:
+            with self.assertRaises(GitHubRateLimitError):
+                await GitHubImporter.import_issues_for_repo('owner', 'repo', client=client)
+        self.assertEqual(len(self.requests), 1)
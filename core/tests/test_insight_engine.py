@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.insights import InsightEngine, InsightRule, ReportFeatures
+from core.models import GeneratedReport, Insight
+from core.services import InsightService
+
+User = get_user_model()
+
+
+def _report(user, switch_count=0, focus_minutes=120, type=GeneratedReport.TYPE_DAILY):
+    return GeneratedReport.objects.create(
+        user=user,
+        type=type,
+        payload={'totals': {'session_count': 1, 'switch_count': switch_count, 'focus_minutes': focus_minutes}},
+    )
+
+
+class InsightEngineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='engine-user', password='pass')
+
+    def test_all_hits_are_written_with_one_insert(self):
+        reports = [_report(self.user, switch_count=20, focus_minutes=10) for _ in range(5)]
+
+        with self.assertNumQueries(1):
+            created = InsightEngine().generate(reports)
+
+        self.assertEqual(len(created), 10)
+        self.assertTrue(all(insight.pk for insight in created))
+        self.assertEqual(Insight.objects.filter(report__in=reports).count(), 10)
+
+    def test_features_fall_back_to_session_list(self):
+        report = GeneratedReport.objects.create(user=self.user, type=GeneratedReport.TYPE_DAILY, payload={
+            'sessions': [{'switch_count': 4, 'total_focus_minutes': 30}, {'switch_count': 2, 'total_focus_minutes': 5}],
+        })
+        features = ReportFeatures.from_report(report)
+        self.assertEqual((features.session_count, features.switch_count, features.focus_minutes), (2, 6, 35))
+
+    def test_rules_are_pluggable_and_scoped_by_report_type(self):
+        class ManySessionsRule(InsightRule):
+            code = 'MANY_SESSIONS'
+            message = 'Lots of sessions.'
+
+            def evaluate(self, features):
+                return {'sessions': features.session_count} if features.session_count >= 1 else None
+
+        weekly = _report(self.user, focus_minutes=0, type=GeneratedReport.TYPE_WEEKLY)
+        created = InsightEngine(rules=[ManySessionsRule()]).generate([weekly])
+        self.assertEqual([i.code for i in created], ['MANY_SESSIONS'])
+
+        default_codes = {i.code for i in InsightEngine().generate([weekly])}
+        self.assertNotIn('LOW_FOCUS_TIME', default_codes)
+
+    def test_generate_for_reports_processes_queryset_in_chunks(self):
+        for _ in range(5):
+            _report(self.user, focus_minutes=10)
+        _report(self.user, focus_minutes=500)
+
+        with self.assertNumQueries(4):
+            # report select plus one insert per chunk of two
+            created = InsightService.generate_for_reports(GeneratedReport.objects.all(), chunk_size=2)
+
+        self.assertEqual(created, 5)
+
+
+class BenchmarkInsightsCommandTests(TestCase):
+    def test_benchmark_reports_rates_and_rolls_back(self):
+        out = StringIO()
+        call_command('benchmark_insights', reports=50, users=3, compare=True, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('insights/s', output)
+        self.assertIn('per-row create', output)
+        self.assertEqual(GeneratedReport.objects.count(), 0)
+        self.assertEqual(Insight.objects.count(), 0)
@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.http import (
+    CircuitBreaker,
+    CircuitOpenError,
+    IntegrationClient,
+    IntegrationError,
+    get_integration,
+)
+
+User = get_user_model()
+
+
+class IntegrationClientTests(SimpleTestCase):
+    def setUp(self):
+        self.calls = 0
+        self.now = 0.0
+
+    def _client(self, responses, **kwargs):
+        def handler(request):
+            self.calls += 1
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        breaker = CircuitBreaker(failure_threshold=kwargs.pop('threshold', 5), recovery_timeout=10,
+                                 clock=lambda: self.now)
+        return IntegrationClient(
+            'test', backoff=0, breaker=breaker,
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs,
+        )
+
+    async def test_idempotent_requests_are_retried(self):
+        client = self._client([
+            httpx.ConnectError('refused'),
+            httpx.Response(503),
+            httpx.Response(200, json={'ok': True}),
+        ])
+        resp = await client.get('https://upstream.test/x')
+
+        self.assertEqual(resp.json(), {'ok': True})
+        self.assertEqual(self.calls, 3)
+        stats = client.metrics.as_dict()
+        self.assertEqual((stats['requests'], stats['failures'], stats['retries']), (3, 2, 2))
+        self.assertIsNotNone(stats['p95_ms'])
+
+    async def test_post_is_not_retried_after_it_was_sent(self):
+        client = self._client([httpx.Response(503), httpx.Response(200)])
+        resp = await client.post('https://upstream.test/x', json={})
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(self.calls, 1)
+
+        client = self._client([httpx.ReadTimeout('slow'), httpx.Response(200)])
+        with self.assertRaises(IntegrationError):
+            await client.post('https://upstream.test/x', json={})
+
+    async def test_circuit_opens_then_probes_after_recovery_timeout(self):
+        client = self._client([httpx.Response(500), httpx.Response(500), httpx.Response(200)],
+                              retries=0, threshold=2)
+        await client.get('https://upstream.test/x')
+        await client.get('https://upstream.test/x')
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            await client.get('https://upstream.test/x')
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(client.metrics.short_circuited, 1)
+
+        self.now = 11
+        self.assertEqual(client.breaker.state, CircuitBreaker.HALF_OPEN)
+        resp = await client.get('https://upstream.test/x')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10, clock=lambda: self.now)
+        for _ in range(3):
+            breaker.record_failure()
+
+        self.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    async def test_cancelled_probe_releases_the_half_open_slot(self):
+        started = asyncio.Event()
+
+        async def hang(request):
+            started.set()
+            await asyncio.Event().wait()
+
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=lambda: self.now)
+        breaker.record_failure()
+        self.now = 10
+        client = IntegrationClient(
+            'test', retries=0, breaker=breaker, client=httpx.AsyncClient(transport=httpx.MockTransport(hang)),
+        )
+
+        probe = asyncio.create_task(client.get('https://upstream.test/x'))
+        await started.wait()
+        self.assertFalse(breaker.allow())
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+    def test_registry_shares_breaker_across_bound_clients(self):
+        github = get_integration('github')
+        bound = github.with_client(httpx.AsyncClient())
+        self.assertIs(get_integration('github'), github)
+        self.assertIs(bound.breaker, github.breaker)
+        self.assertIs(bound.metrics, github.metrics)
+
+
+class IntegrationStatsViewTests(APITestCase):
+    def test_admin_sees_per_upstream_stats(self):
+        get_integration('github')
+        admin = User.objects.create_superuser(username='int-admin', password='pass')
+        self.client.force_login(admin)
+
+        resp = self.client.get(reverse('api-v1:integration-stats'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn('circuit', resp.data['github'])
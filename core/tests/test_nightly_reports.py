@@ -0,0 +1,114 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from core.insights import InsightEngine
+from core.models import ContextSwitch, DevSession, GeneratedReport, Insight
+from core.services import ReportService
+from core.tasks import NIGHTLY_SUMMARY_CACHE_KEY, schedule_nightly_reports
+from devfocus.celery import app as celery_app
+
+User = get_user_model()
+
+
+class NightlyReportTests(TestCase):
+    def setUp(self):
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', eager)
+        cache.delete(NIGHTLY_SUMMARY_CACHE_KEY)
+
+        self.today = timezone.localtime().date()
+        started = timezone.now() - timedelta(minutes=30)
+        self.users = [User.objects.create_user(username=f'nightly-{i}') for i in range(5)]
+        for user in self.users:
+            session = DevSession.objects.create(user=user, title='Work', started_at=started)
+            for _ in range(12):
+                ContextSwitch.objects.create(dev_session=session)
+        inactive = User.objects.create_user(username='nightly-inactive', is_active=False)
+        DevSession.objects.create(user=inactive, title='Ignored', started_at=started)
+        User.objects.create_user(username='nightly-idle')
+
+    def test_chunks_cover_active_users_and_summary_is_recorded(self):
+        result = schedule_nightly_reports(day=self.today.isoformat(), chunk_size=2)
+
+        self.assertEqual(result['chunks'], 3)
+        self.assertEqual(
+            set(GeneratedReport.objects.filter(day=self.today).values_list('user_id', flat=True)),
+            {u.pk for u in self.users},
+        )
+        self.assertTrue(Insight.objects.filter(code='HIGH_CONTEXT_SWITCHING', user=self.users[0]).exists())
+
+        summary = cache.get(NIGHTLY_SUMMARY_CACHE_KEY)
+        self.assertEqual((summary['users'], summary['created'], summary['reused'], summary['failed']), (5, 5, 0, 0))
+        self.assertEqual(summary['chunks'], 3)
+
+    def test_rerun_reuses_reports_with_matching_fingerprints(self):
+        schedule_nightly_reports(day=self.today.isoformat())
+        schedule_nightly_reports(day=self.today.isoformat())
+
+        summary = cache.get(NIGHTLY_SUMMARY_CACHE_KEY)
+        self.assertEqual((summary['created'], summary['reused']), (0, 5))
+        self.assertEqual(GeneratedReport.objects.filter(day=self.today).count(), 5)
+
+    def test_query_count_does_not_grow_with_chunk_size(self):
+        user_ids = [u.pk for u in self.users]
+        # Seven queries plus the savepoint around the report and insight inserts.
+        with self.assertNumQueries(9):
+            ReportService.generate_daily_reports(user_ids[:1], self.today)
+        with self.assertNumQueries(9):
+            ReportService.generate_daily_reports(user_ids[1:], self.today)
+
+    def test_bulk_payload_matches_single_user_path(self):
+        user = self.users[0]
+        ReportService.generate_daily_reports([user.pk], self.today)
+        bulk = GeneratedReport.objects.get(user=user)
+        single, created = ReportService.get_or_generate_daily_report(user, day=self.today)
+
+        self.assertFalse(created)
+        self.assertEqual(single.pk, bulk.pk)
+        self.assertEqual(bulk.payload['totals']['switch_count'], 12)
+
+    def test_failed_insight_pass_leaves_no_reports_for_the_fallback_to_reuse(self):
+        real = InsightEngine.generate
+        calls = []
+
+        def fail_once(engine, reports):
+            calls.append(len(reports))
+            if len(calls) == 1:
+                raise RuntimeError('insights')
+            return real(engine, reports)
+
+        with mock.patch.object(InsightEngine, 'generate', autospec=True, side_effect=fail_once), \
+                self.assertLogs('core.tasks', level='ERROR'):
+            schedule_nightly_reports(day=self.today.isoformat(), chunk_size=10)
+
+        summary = cache.get(NIGHTLY_SUMMARY_CACHE_KEY)
+        self.assertEqual((summary['created'], summary['reused'], summary['failed']), (5, 0, 0))
+        self.assertEqual(GeneratedReport.objects.filter(day=self.today).count(), 5)
+        self.assertEqual(
+            set(Insight.objects.filter(code='HIGH_CONTEXT_SWITCHING').values_list('user_id', flat=True)),
+            {u.pk for u in self.users},
+        )
+
+    def test_failing_chunk_falls_back_per_user_and_counts_failures(self):
+        real = ReportService.get_or_generate_daily_report
+        broken = self.users[0]
+
+        def per_user(user, day=None, force=False):
+            if user.pk == broken.pk:
+                raise RuntimeError('boom')
+            return real(user, day=day, force=force)
+
+        with mock.patch.object(ReportService, 'generate_daily_reports', side_effect=RuntimeError('chunk')), \
+                mock.patch.object(ReportService, 'get_or_generate_daily_report', side_effect=per_user), \
+                self.assertLogs('core.tasks', level='ERROR'):
+            schedule_nightly_reports(day=self.today.isoformat(), chunk_size=10)
+
+        summary = cache.get(NIGHTLY_SUMMARY_CACHE_KEY)
+        self.assertEqual((summary['created'], summary['failed']), (4, 1))
+        self.assertFalse(GeneratedReport.objects.filter(user=broken).exists())
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import ContextSwitch, DevSession, ResourceLink, SessionTask, Task, Team, TeamMembership
+from core.testing import QueryBudgetMixin
+
+User = get_user_model()
+
+ROWS = 12
+
+
+class EndpointQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Endpoint query counts stay fixed as rows grow; ROWS is well above every budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='budget-user')
+        cls.session = DevSession.objects.create(user=cls.user, title='Budget')
+        tasks = Task.objects.bulk_create([Task(title=f'Task {n}') for n in range(ROWS)])
+        SessionTask.objects.bulk_create([
+            SessionTask(dev_session=cls.session, task=task, role=SessionTask.ROLE_SIDE if n % 2 else SessionTask.ROLE_MAIN)
+            for n, task in enumerate(tasks)
+        ])
+        ContextSwitch.objects.bulk_create([ContextSwitch(dev_session=cls.session, user=cls.user) for _ in range(ROWS)])
+        ResourceLink.objects.bulk_create([
+            ResourceLink(dev_session=cls.session, title=f'Link {n}', url='https://example.com') for n in range(ROWS)
+        ])
+        team = Team.objects.create(name='Budget', slug='budget', owner=cls.user)
+        members = User.objects.bulk_create([User(username=f'budget-member-{n}') for n in range(ROWS)])
+        TeamMembership.objects.bulk_create([TeamMembership(team=team, user=member) for member in members])
+        cls.team = team
+        cls.switch = ContextSwitch.objects.filter(dev_session=cls.session).first()
+        cls.link = ResourceLink.objects.filter(dev_session=cls.session).first()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_session_detail_includes_task_roles(self):
+        resp = self.assertEndpointQueries(
+            5, 'get', reverse('api-v1:session-detail', args=[self.session.pk]), expected_status=status.HTTP_200_OK,
+        )
+        self.assertEqual(len(resp.data['tasks']), ROWS)
+        self.assertEqual(
+            [(task['title'], task['role']) for task in resp.data['tasks'][:2]],
+            [('Task 0', SessionTask.ROLE_MAIN), ('Task 1', SessionTask.ROLE_SIDE)],
+        )
+
+    def test_list_endpoints(self):
+        for name in ('task-list', 'session-list', 'context-switch-list', 'resource-list', 'team-list'):
+            with self.subTest(name):
+                self.assertEndpointQueries(5, 'get', reverse(f'api-v1:{name}'), expected_status=status.HTTP_200_OK)
+
+    def test_detail_endpoints_do_not_load_owners(self):
+        for name, pk in (('context-switch-detail', self.switch.pk), ('resource-detail', self.link.pk)):
+            with self.subTest(name):
+                self.assertEndpointQueries(
+                    4, 'get', reverse(f'api-v1:{name}', args=[pk]), expected_status=status.HTTP_200_OK,
+                )
+
+    def test_team_members(self):
+        resp = self.assertEndpointQueries(
+            6, 'get', reverse('api-v1:team-members', args=[self.team.pk]), expected_status=status.HTTP_200_OK,
+        )
+        self.assertEqual(len(resp.data), ROWS)
+
+    def test_budget_failure_lists_the_queries(self):
+        with self.assertRaisesRegex(AssertionError, r'2 queries executed, at most 1 expected'):
+            with self.assertMaxQueries(1):
+                list(Task.objects.all()[:1])
+                list(DevSession.objects.all()[:1])
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import DevSession, ContextSwitch, GeneratedReport, Insight, Task
+from core.services import day_bounds
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'plans are asserted against SQLite EXPLAIN QUERY PLAN output')
+class HotPathQueryPlanTests(TestCase):
+    """The filters used by reports and list endpoints must be index searches, not table scans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='plan-user', password='pass')
+        cls.today = timezone.localtime().date()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+        self.assertNotRegex(plan, r'SCAN core_\w+\b(?! USING)', plan)
+
+    def test_sessions_by_user_and_day(self):
+        start, end = day_bounds(self.today)
+        qs = DevSession.objects.filter(user=self.user, started_at__gte=start, started_at__lt=end)
+        self.assertUsesIndex(qs, 'session_user_started_idx')
+
+    def test_session_list_ordering(self):
+        qs = DevSession.objects.filter(user=self.user).order_by('-created_at', '-pk')[:51]
+        self.assertUsesIndex(qs, 'session_user_created_idx')
+
+    def test_switches_for_session_in_order(self):
+        qs = ContextSwitch.objects.filter(dev_session_id=1).order_by('happened_at')
+        self.assertUsesIndex(qs, 'switch_session_happened_idx')
+
+    def test_cached_report_lookup(self):
+        qs = GeneratedReport.objects.filter(
+            user=self.user, type=GeneratedReport.TYPE_DAILY, day=self.today, fingerprint='x',
+        )
+        plan = qs.explain()
+        self.assertRegex(plan, r'report_user_type_day_idx|core_generatedreport_fingerprint', plan)
+
+    def test_insight_list_ordering(self):
+        qs = Insight.objects.filter(user=self.user).order_by('-created_at', '-pk')[:51]
+        self.assertUsesIndex(qs, 'insight_user_created_idx')
+
+    def test_task_list_ordering(self):
+        qs = Task.objects.order_by('-created_at', '-pk')[:51]
+        self.assertUsesIndex(qs, 'task_created_idx')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'plans are asserted against SQLite EXPLAIN QUERY PLAN output')
+class PaginatedListPlanTests(APITestCase):
+    """EXPLAIN the queries the list endpoints actually run, first page and cursor page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='list-plan-user')
+        sessions = [DevSession.objects.create(user=cls.user, title=f'S{n}') for n in range(3)]
+        for session in sessions:
+            for _ in range(2):
+                ContextSwitch.objects.create(dev_session=session)
+            Insight.objects.create(user=cls.user, code='TEST', message='m', dev_session=session)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assertListPlan(self, name, table, index_name):
+        url = reverse(f'api-v1:{name}')
+        with CaptureQueriesContext(connection) as first:
+            resp = self.client.get(url, {'page_size': 2})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(resp.data['next'])
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(resp.data['next'])
+
+        for captured in (first, second):
+            sql = next(q['sql'] for q in captured.captured_queries if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql'])
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+            self.assertIn(index_name, plan, plan)
+            self.assertNotIn('TEMP B-TREE', plan, plan)
+
+    def test_session_list(self):
+        self.assertListPlan('session-list', 'core_devsession', 'session_user_created_idx')
+
+    def test_context_switch_list(self):
+        self.assertListPlan('context-switch-list', 'core_contextswitch', 'switch_user_happened_idx')
+
+    def test_insight_list(self):
+        self.assertListPlan('insight-list', 'core_insight', 'insight_user_created_idx')
+
+
+class TaskExternalReferenceTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='external-ref', password='pass')
+        self.client.force_login(self.user)
+
+    def test_external_reference_is_unique_per_source(self):
+        Task.objects.create(title='A', external_source=Task.SOURCE_GITHUB, external_id='42')
+        Task.objects.create(title='B', external_source=Task.SOURCE_MANUAL, external_id='42')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.create(title='C', external_source=Task.SOURCE_GITHUB, external_id='42')
+
+    def test_tasks_without_external_id_do_not_collide(self):
+        Task.objects.create(title='A', external_id=None)
+        Task.objects.create(title='B', external_id=None)
+        self.assertEqual(Task.objects.filter(external_id__isnull=True).count(), 2)
+
+    def test_api_stores_blank_external_id_as_null_and_rejects_duplicates(self):
+        url = reverse('api-v1:task-list')
+        resp = self.client.post(url, {'title': 'Blank', 'external_id': ''}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED, resp.data)
+        self.assertIsNone(Task.objects.get(pk=resp.data['id']).external_id)
+
+        self.client.post(url, {'title': 'First', 'external_id': 'X-1'}, format='json')
+        resp = self.client.post(url, {'title': 'Again', 'external_id': 'X-1'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('external_id', resp.data)
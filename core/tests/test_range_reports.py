@@ -0,0 +1,117 @@
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import ReportRequest
+from core.models import DevSession, ContextSwitch, DailyRollup, GeneratedReport
+from core.services import ReportService, SessionService
+from core.tasks import process_report_request
+
+User = get_user_model()
+
+
+def _at(day, hour=10):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+class RangeReportServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='range-user', password='pass')
+        self.monday = date(2025, 3, 3)
+
+        for offset, minutes in ((0, 30), (2, 90)):
+            day = self.monday + timedelta(days=offset)
+            session = DevSession.objects.create(
+                user=self.user,
+                title=f'Day {offset}',
+                started_at=_at(day),
+                ended_at=_at(day) + timedelta(minutes=minutes),
+            )
+            SessionService.close_session(session)
+            ContextSwitch.objects.create(dev_session=session, reason=ContextSwitch.REASON_MEETING)
+
+    def test_weekly_report_has_series_and_totals(self):
+        report = ReportService.generate_weekly_report(self.user, day=self.monday + timedelta(days=4))
+
+        self.assertEqual(report.type, GeneratedReport.TYPE_WEEKLY)
+        payload = report.payload
+        self.assertEqual(payload['start'], '2025-03-03')
+        self.assertEqual(payload['end'], '2025-03-09')
+        self.assertEqual(len(payload['days']), 7)
+        self.assertEqual([d['focus_minutes'] for d in payload['days']], [30, 0, 90, 0, 0, 0, 0])
+        self.assertEqual(payload['totals']['session_count'], 2)
+        self.assertEqual(payload['totals']['switch_count'], 2)
+        self.assertEqual(payload['totals']['switches_by_reason'][ContextSwitch.REASON_MEETING], 2)
+
+    def test_rollups_are_reused_without_grouped_query(self):
+        # rollup lookup + report insert; no fallback query when every day has a rollup
+        with self.assertNumQueries(2):
+            report = ReportService.generate_range_report(self.user, self.monday, self.monday)
+        self.assertEqual(report.payload['totals']['focus_minutes'], 30)
+
+    def test_missing_rollups_fall_back_to_grouped_query(self):
+        DailyRollup.objects.all().delete()
+
+        # rollup lookup, grouped session query, grouped reason query, report insert
+        with self.assertNumQueries(4):
+            report = ReportService.generate_range_report(self.user, self.monday, self.monday + timedelta(days=6))
+
+        totals = report.payload['totals']
+        self.assertEqual(totals['session_count'], 2)
+        self.assertEqual(totals['focus_minutes'], 120)
+        self.assertEqual(totals['switches_by_reason'][ContextSwitch.REASON_MEETING], 2)
+
+    def test_invalid_range_raises(self):
+        with self.assertRaises(ValueError):
+            ReportService.generate_range_report(self.user, self.monday, self.monday - timedelta(days=1))
+
+    def test_weekly_report_request_runs_weekly_generator(self):
+        req = ReportRequest.objects.create(user=self.user, type=ReportRequest.TYPE_WEEKLY, day=self.monday)
+        process_report_request(req.id)
+
+        req.refresh_from_db()
+        self.assertEqual(req.status, ReportRequest.STATUS_DONE)
+        self.assertEqual(req.result_report.type, GeneratedReport.TYPE_WEEKLY)
+
+
+class RangeReportApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='range-api', password='pass')
+        self.client.force_login(self.user)
+
+    def test_range_report_endpoint(self):
+        url = reverse('api-v1:range-report')
+        resp = self.client.post(url, {'start': '2025-03-01', 'end': '2025-03-10'}, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data['type'], GeneratedReport.TYPE_RANGE)
+        self.assertEqual(len(resp.data['payload']['days']), 10)
+
+    def test_range_report_rejects_reversed_range(self):
+        url = reverse('api-v1:range-report')
+        resp = self.client.post(url, {'start': '2025-03-10', 'end': '2025-03-01'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_weekly_report_rejects_malformed_dates(self):
+        url = reverse('api-v1:weekly-report')
+        for body in ({'date': '2025-13-40'}, {'date': 20250301}, ['2025-03-01']):
+            resp = self.client.post(url, body, format='json')
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, body)
+        for body in ({'date': '2025-03-05'}, {'date': ''}, {}):
+            self.assertEqual(self.client.post(url, body, format='json').status_code, status.HTTP_201_CREATED, body)
+
+    def test_range_report_request_requires_end_day(self):
+        url = reverse('api-v1:report-request-list')
+        resp = self.client.post(url, {'type': 'RANGE', 'day': '2025-03-01'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_range_report_request_rejects_over_long_range(self):
+        url = reverse('api-v1:report-request-list')
+        resp = self.client.post(url, {'type': 'RANGE', 'day': '2024-01-01', 'end_day': '2025-03-01'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ReportRequest.objects.exists())
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import ReportRequest
+from core.models import DevSession, ContextSwitch, GeneratedReport, Insight
+from core.services import ReportService
+from core.tasks import process_report_request
+
+User = get_user_model()
+
+
+class ReportFingerprintTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='cache-user', password='pass')
+        self.today = timezone.localtime().date()
+        self.session = DevSession.objects.create(
+            user=self.user,
+            title='Cached',
+            started_at=timezone.now() - timedelta(minutes=10),
+        )
+
+    def test_unchanged_inputs_reuse_report_and_insights(self):
+        first, created = ReportService.get_or_generate_daily_report(self.user, day=self.today)
+        second, created_again = ReportService.get_or_generate_daily_report(self.user, day=self.today)
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(GeneratedReport.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Insight.objects.filter(user=self.user).count(), first.insights.count())
+
+    def test_new_context_switch_invalidates_fingerprint(self):
+        first = ReportService.generate_daily_report(self.user, day=self.today)
+        ContextSwitch.objects.create(dev_session=self.session)
+        second = ReportService.generate_daily_report(self.user, day=self.today)
+
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertNotEqual(first.fingerprint, second.fingerprint)
+        self.assertEqual(second.payload['totals']['switch_count'], 1)
+
+    def test_force_regenerates(self):
+        first = ReportService.generate_daily_report(self.user, day=self.today)
+        forced = ReportService.generate_daily_report(self.user, day=self.today, force=True)
+        self.assertNotEqual(first.pk, forced.pk)
+        self.assertEqual(first.fingerprint, forced.fingerprint)
+        self.assertEqual(ReportService.generate_daily_report(self.user, day=self.today).pk, forced.pk)
+
+    def test_concurrent_generation_stores_the_report_once(self):
+        stored, _ = ReportService.get_or_generate_daily_report(self.user, day=self.today)
+        insights = Insight.objects.count()
+
+        # The cache check misses, as when another worker commits the same
+        # fingerprint between this call's check and its insert.
+        with mock.patch.object(QuerySet, 'first', return_value=None):
+            report, created = ReportService.get_or_generate_daily_report(self.user, day=self.today)
+
+        self.assertEqual((report.pk, created), (stored.pk, False))
+        self.assertEqual(GeneratedReport.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Insight.objects.count(), insights)
+
+    def test_process_report_request_generates_insights_once(self):
+        req = ReportRequest.objects.create(user=self.user, type=ReportRequest.TYPE_DAILY, day=self.today)
+        process_report_request(req.id)
+
+        req.refresh_from_db()
+        codes = list(Insight.objects.filter(report=req.result_report).values_list('code', flat=True))
+        self.assertEqual(len(codes), len(set(codes)))
+
+
+class DailyReportViewCachingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='cache-api', password='pass')
+        self.client.force_login(self.user)
+        DevSession.objects.create(user=self.user, title='API')
+        self.url = reverse('api-v1:daily-report')
+
+    def test_repeat_post_returns_existing_report(self):
+        resp1 = self.client.post(self.url, {}, format='json')
+        resp2 = self.client.post(self.url, {}, format='json')
+
+        self.assertEqual(resp1.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp2.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp1.data['id'], resp2.data['id'])
+
+    def test_force_query_param_creates_new_report(self):
+        resp1 = self.client.post(self.url, {}, format='json')
+        resp2 = self.client.post(f'{self.url}?force=1', {}, format='json')
+
+        self.assertEqual(resp2.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(resp1.data['id'], resp2.data['id'])
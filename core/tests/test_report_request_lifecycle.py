@@ -0,0 +1,157 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import ReportRequest
+from api.report_queue import ReportRequestQueue
+from core.models import GeneratedReport
+from core.services import ReportService
+from core.tasks import process_report_request, reap_report_requests
+
+User = get_user_model()
+
+
+class ReportRequestLifecycleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='queue-user')
+        self.today = timezone.now().date()
+        self.req = ReportRequest.objects.create(user=self.user, type=ReportRequest.TYPE_DAILY, day=self.today)
+
+    def test_claim_is_won_by_one_worker_only(self):
+        first = ReportRequestQueue.claim(self.req.id)
+        second = ReportRequestQueue.claim(self.req.id)
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertEqual((first.status, first.attempts), (ReportRequest.STATUS_RUNNING, 1))
+        self.assertIsNotNone(first.claimed_at)
+
+    def test_duplicate_delivery_generates_once(self):
+        with mock.patch.object(ReportService, 'generate_daily_report',
+                               wraps=ReportService.generate_daily_report) as generate:
+            process_report_request(self.req.id)
+            process_report_request(self.req.id)
+
+        self.assertEqual(generate.call_count, 1)
+        self.req.refresh_from_db()
+        self.assertEqual(self.req.status, ReportRequest.STATUS_DONE)
+
+    def test_identical_active_requests_are_rejected_by_the_database(self):
+        with self.assertRaises(IntegrityError):
+            ReportRequest.objects.create(user=self.user, type=ReportRequest.TYPE_DAILY, day=self.today)
+
+    def test_submit_deduplicates_until_the_request_finishes(self):
+        same, created = ReportRequestQueue.submit(self.user, ReportRequest.TYPE_DAILY, self.today)
+        self.assertEqual((same.pk, created), (self.req.pk, False))
+
+        process_report_request(self.req.id)
+        fresh, created = ReportRequestQueue.submit(self.user, ReportRequest.TYPE_DAILY, self.today)
+        self.assertTrue(created)
+        self.assertNotEqual(fresh.pk, self.req.pk)
+
+    def test_transient_error_is_retried(self):
+        real = ReportService.generate_daily_report
+        with mock.patch.object(ReportService, 'generate_daily_report',
+                               side_effect=[OperationalError('database is locked'), real(self.user, day=self.today)]):
+            process_report_request.apply(args=(self.req.id,))
+
+        self.req.refresh_from_db()
+        self.assertEqual((self.req.status, self.req.attempts), (ReportRequest.STATUS_DONE, 2))
+        self.assertIsNotNone(self.req.result_report)
+
+    @override_settings(REPORT_REQUESTS={'MAX_ATTEMPTS': 2})
+    def test_retries_stop_at_max_attempts(self):
+        with mock.patch.object(ReportService, 'generate_daily_report', side_effect=OperationalError('locked')):
+            result = process_report_request.apply(args=(self.req.id,))
+
+        self.assertTrue(result.failed())
+        self.req.refresh_from_db()
+        self.assertEqual((self.req.status, self.req.attempts), (ReportRequest.STATUS_FAILED, 2))
+
+    def test_other_errors_fail_immediately(self):
+        with mock.patch.object(ReportService, 'generate_daily_report', side_effect=ValueError('bad input')):
+            process_report_request.apply(args=(self.req.id,))
+
+        self.req.refresh_from_db()
+        self.assertEqual((self.req.status, self.req.attempts), (ReportRequest.STATUS_FAILED, 1))
+        self.assertEqual(self.req.error_message, 'bad input')
+
+    def test_late_worker_does_not_overwrite_reaped_request(self):
+        claimed = ReportRequestQueue.claim(self.req.id)
+        ReportRequestQueue.release(claimed, 'reaped')
+
+        self.assertFalse(ReportRequestQueue.complete(claimed, GeneratedReport.objects.create(user=self.user, payload={})))
+        self.req.refresh_from_db()
+        self.assertEqual(self.req.status, ReportRequest.STATUS_PENDING)
+
+    @override_settings(REPORT_REQUESTS={'MAX_ATTEMPTS': 2, 'STUCK_AFTER': 60})
+    def test_reaper_requeues_or_fails_stuck_requests(self):
+        old = timezone.now() - timedelta(minutes=5)
+        ReportRequest.objects.filter(pk=self.req.pk).update(
+            status=ReportRequest.STATUS_RUNNING, claimed_at=old, attempts=1,
+        )
+        exhausted = ReportRequest.objects.create(
+            user=self.user, type=ReportRequest.TYPE_WEEKLY, day=self.today,
+            status=ReportRequest.STATUS_RUNNING, claimed_at=old, attempts=2,
+        )
+        lost = ReportRequest.objects.create(user=self.user, type=ReportRequest.TYPE_DAILY, day=self.today - timedelta(days=1))
+        ReportRequest.objects.filter(pk=lost.pk).update(updated_at=old)
+        fresh = ReportRequest.objects.create(user=self.user, type=ReportRequest.TYPE_WEEKLY, day=self.today - timedelta(days=7))
+
+        with mock.patch('core.tasks.process_report_request.delay') as delay, self.assertLogs('core.tasks', 'WARNING'):
+            result = reap_report_requests()
+
+        self.assertEqual(result, {'requeued': 2, 'failed': 1})
+        self.assertEqual(sorted(c.args[0] for c in delay.call_args_list), sorted([self.req.pk, lost.pk]))
+        statuses = dict(ReportRequest.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[self.req.pk], ReportRequest.STATUS_PENDING)
+        self.assertEqual(statuses[exhausted.pk], ReportRequest.STATUS_FAILED)
+        self.assertEqual(statuses[fresh.pk], ReportRequest.STATUS_PENDING)
+
+        with mock.patch('core.tasks.process_report_request.delay') as delay:
+            self.assertEqual(reap_report_requests(), {'requeued': 0, 'failed': 0})
+        delay.assert_not_called()
+
+    def test_stats_counts_every_state_in_one_query(self):
+        ReportRequest.objects.create(
+            user=self.user, type=ReportRequest.TYPE_WEEKLY, day=self.today, status=ReportRequest.STATUS_DONE,
+        )
+        with self.assertNumQueries(1):
+            stats = ReportRequestQueue.stats()
+
+        self.assertEqual(stats['counts'], {'PENDING': 1, 'RUNNING': 0, 'DONE': 1, 'FAILED': 0})
+        self.assertEqual(stats['queue_depth'], 1)
+        self.assertIsNotNone(stats['oldest_pending_seconds'])
+
+
+class ReportRequestDedupApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='queue-api-user')
+        self.client.force_login(self.user)
+
+    @mock.patch('core.tasks.process_report_request.delay')
+    def test_repeat_post_returns_the_active_request(self, delay):
+        url = reverse('api-v1:report-request-list')
+        first = self.client.post(url, {'type': 'DAILY'}, format='json')
+        second = self.client.post(url, {'type': 'DAILY'}, format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['id'], second.data['id'])
+        delay.assert_called_once_with(first.data['id'])
+
+    def test_queue_stats_are_admin_only(self):
+        url = reverse('api-v1:report-queue-stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(User.objects.create_superuser(username='queue-admin', password='pass'))
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn('queue_depth', resp.data)
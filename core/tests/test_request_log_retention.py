@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.log_retention import ApiRequestLogRetention
+from api.models import ApiRequestLog, ApiRequestLogHourly
+from core.testing import QueryBudgetMixin
+from devfocus.db_routers import ApiRequestLogRouter
+
+User = get_user_model()
+
+NOW = datetime(2026, 3, 20, 12, 30, tzinfo=dt_timezone.utc)
+OLD_HOUR = datetime(2026, 3, 1, 9, tzinfo=dt_timezone.utc)
+
+
+def make_logs(hour, count, route='api-v1:task-list', method='GET', errors=0, path='/api/v1/tasks/'):
+    logs = ApiRequestLog.objects.bulk_create([
+        ApiRequestLog(
+            route=route, path=path, method=method,
+            status_code=500 if n < errors else 200, duration_ms=float(n + 1),
+        )
+        for n in range(count)
+    ])
+    # created_at is auto_now_add, so backdate after the insert.
+    ApiRequestLog.objects.filter(pk__in=[log.pk for log in logs]).update(created_at=hour + timedelta(minutes=5))
+    return logs
+
+
+class ApiRequestLogRetentionTests(QueryBudgetMixin, TestCase):
+    def test_old_hours_are_rolled_up_and_deleted(self):
+        make_logs(OLD_HOUR, 100, errors=3)
+        make_logs(OLD_HOUR, 2, route='api-v1:task-list', method='POST')
+        make_logs(OLD_HOUR + timedelta(hours=2), 1, route='', path='/api/v1/nowhere/')
+        recent = make_logs(NOW - timedelta(days=1), 4)
+
+        result = ApiRequestLogRetention.run(now=NOW)
+
+        self.assertEqual(result, {'hours': 2, 'rolled_up': 103, 'deleted': 103, 'expired_hourly': 0})
+        self.assertEqual(
+            set(ApiRequestLog.objects.values_list('pk', flat=True)), {log.pk for log in recent},
+        )
+        row = ApiRequestLogHourly.objects.get(hour=OLD_HOUR, route='api-v1:task-list', method='GET')
+        self.assertEqual((row.count, row.error_count, row.max_duration_ms), (100, 3, 100.0))
+        self.assertEqual((row.p50_ms, row.p95_ms, row.p99_ms), (51.0, 96.0, 100.0))
+        self.assertEqual(row.total_duration_ms, 5050.0)
+        self.assertTrue(ApiRequestLogHourly.objects.filter(
+            hour=OLD_HOUR + timedelta(hours=2), route='/api/v1/nowhere/',
+        ).exists())
+
+    def test_rerun_does_not_count_an_hour_twice(self):
+        make_logs(OLD_HOUR, 5)
+        ApiRequestLogRetention.run(now=NOW)
+        # Rows that reappear in an hour already rolled up are deleted, not re-counted.
+        make_logs(OLD_HOUR, 5)
+
+        result = ApiRequestLogRetention.run(now=NOW)
+
+        self.assertEqual((result['hours'], result['deleted']), (0, 5))
+        self.assertEqual(ApiRequestLogHourly.objects.get().count, 5)
+        self.assertFalse(ApiRequestLog.objects.exists())
+
+    def test_deletes_in_batches(self):
+        make_logs(OLD_HOUR, 25)
+        with self.assertMaxQueries(25) as captured:
+            result = ApiRequestLogRetention.run(now=NOW, batch_size=10)
+        self.assertEqual(result['deleted'], 25)
+        deletes = [q['sql'] for q in captured.captured_queries if q['sql'].startswith('DELETE FROM "api_apirequestlog"')]
+        self.assertEqual(len(deletes), 3)
+
+    def test_expired_hourly_rows_are_purged(self):
+        ApiRequestLogHourly.objects.create(
+            hour=NOW - timedelta(days=400), route='r', method='GET', count=1, error_count=0,
+            total_duration_ms=1, max_duration_ms=1, p50_ms=1, p95_ms=1, p99_ms=1,
+        )
+        self.assertEqual(ApiRequestLogRetention.run(now=NOW)['expired_hourly'], 1)
+
+    def test_command(self):
+        make_logs(datetime.now(dt_timezone.utc) - timedelta(days=3), 2)
+        out = StringIO()
+        call_command('rollup_request_logs', '--days', '1', '--batch-size', '1', stdout=out)
+        self.assertIn('Rolled 2 requests into 1 hours, deleted 2 raw rows', out.getvalue())
+        self.assertFalse(ApiRequestLog.objects.exists())
+
+
+class ApiRequestLogRouterTests(TestCase):
+    router = ApiRequestLogRouter()
+
+    def test_default_alias_leaves_routing_alone(self):
+        self.assertEqual(self.router.db_for_write(ApiRequestLog), 'default')
+        self.assertIsNone(self.router.allow_migrate('default', 'api', 'apirequestlog'))
+
+    @override_settings(API_REQUEST_LOG_DATABASE='logs')
+    def test_separate_alias(self):
+        self.assertEqual(self.router.db_for_read(ApiRequestLogHourly), 'logs')
+        self.assertIsNone(self.router.db_for_write(ApiRequestLog.user.field.related_model))
+        self.assertTrue(self.router.allow_migrate('logs', 'api', 'apirequestlog'))
+        self.assertFalse(self.router.allow_migrate('default', 'api', 'apirequestloghourly'))
+        self.assertFalse(self.router.allow_migrate('logs', 'core', 'task'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core', 'task'))
+
+
+@override_settings(API_REQUEST_LOG_DATABASE='logs')
+class SeparateLogDatabaseTests(TestCase):
+    databases = {'default', 'logs'}
+
+    def test_deleting_a_user_leaves_its_logs_in_the_log_database(self):
+        user = User.objects.create_user(username='log-db-user')
+        user_id = user.pk
+        log = ApiRequestLog.objects.create(user=user, path='/api/v1/tasks/', method='GET', status_code=200, duration_ms=1)
+        self.assertEqual(log._state.db, 'logs')
+
+        with CaptureQueriesContext(connections['default']) as default_queries:
+            user.delete()
+
+        self.assertFalse(any('api_apirequestlog' in q['sql'] for q in default_queries.captured_queries))
+        self.assertEqual(ApiRequestLog.objects.using('logs').get().user_id, user_id)
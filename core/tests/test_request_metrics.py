@@ -0,0 +1,106 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import ApiRequestLog
+from core.metrics import MetricsRegistry, RequestMetrics, get_metrics_registry
+from core.models import Task
+
+User = get_user_model()
+
+
+class MetricsRegistryTests(TestCase):
+    def test_quantiles_and_prometheus_text(self):
+        registry = MetricsRegistry(window=100)
+        sampled = RequestMetrics()
+        sampled.db_queries = 3
+        for n in range(1, 101):
+            registry.observe('api-v1:task-list', 'GET', 200, n / 1000, 512, sampled if n % 2 else None)
+        registry.observe('api-v1:task-list', 'GET', 503, 0.5)
+
+        text = registry.prometheus()
+        labels = 'route="api-v1:task-list",method="GET"'
+        self.assertIn(f'devfocus_http_requests_total{{{labels},status="2xx"}} 100', text)
+        self.assertIn(f'devfocus_http_requests_total{{{labels},status="5xx"}} 1', text)
+        self.assertIn('# TYPE devfocus_http_request_duration_seconds summary', text)
+        self.assertIn(f'devfocus_http_request_duration_seconds{{{labels},quantile="0.5"}} 0.052', text)
+        self.assertIn(f'devfocus_http_request_duration_seconds_count{{{labels}}} 101', text)
+        self.assertIn(f'devfocus_http_db_queries{{{labels},quantile="0.99"}} 3', text)
+        self.assertIn(f'devfocus_http_db_queries_count{{{labels}}} 50', text)
+
+    def test_window_bounds_the_quantiles_but_not_the_totals(self):
+        registry = MetricsRegistry(window=10)
+        for n in range(100):
+            registry.observe('r', 'GET', 200, float(n))
+        count, total, quantiles = registry.snapshot()[('r', 'GET')]['summaries']['request_duration_seconds']
+        self.assertEqual((count, total), (100, 4950.0))
+        self.assertEqual(quantiles[0.5], 95.0)
+
+
+class RequestMetricsCaptureTests(TestCase):
+    async def test_queries_on_other_threads_connections_are_counted(self):
+        metrics = RequestMetrics()
+        with metrics.capture():
+            await sync_to_async(lambda: User.objects.exists(), thread_sensitive=False)()
+            await sync_to_async(lambda: User.objects.exists())()
+        self.assertEqual(metrics.db_queries, 2)
+        self.assertGreater(metrics.db_seconds, 0)
+
+
+class RequestMetricsMiddlewareTests(APITestCase):
+    def setUp(self):
+        get_metrics_registry().reset()
+        self.addCleanup(get_metrics_registry().reset)
+        self.user = User.objects.create_user(username='metrics-user')
+        self.client.force_login(self.user)
+        Task.objects.bulk_create([Task(title=f'Task {n}') for n in range(5)])
+
+    def test_sampled_requests_record_queries_and_serializer_time(self):
+        resp = self.client.get(reverse('api-v1:task-list'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        log = ApiRequestLog.objects.get(path=reverse('api-v1:task-list'))
+        self.assertGreaterEqual(log.db_queries, 3)
+        self.assertGreater(log.db_ms, 0)
+        self.assertGreater(log.serializer_ms, 0)
+        self.assertEqual(log.response_bytes, len(resp.content))
+
+        stats = get_metrics_registry().snapshot()[('api-v1:task-list', 'GET')]
+        self.assertEqual(stats['statuses'], {'2xx': 1})
+        self.assertEqual(stats['summaries']['db_queries'][0], 1)
+
+    async def test_sampled_asgi_requests_record_queries_and_serializer_time(self):
+        await self.async_client.aforce_login(self.user)
+        resp = await self.async_client.get(reverse('api-v1:task-list'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        log = await ApiRequestLog.objects.aget(path=reverse('api-v1:task-list'))
+        self.assertGreaterEqual(log.db_queries, 3)
+        self.assertGreater(log.serializer_ms, 0)
+
+    @override_settings(METRICS={'SAMPLE_RATE': 0})
+    def test_unsampled_requests_only_record_latency_and_size(self):
+        self.client.get(reverse('api-v1:task-list'))
+
+        log = ApiRequestLog.objects.get()
+        self.assertEqual((log.db_queries, log.db_ms, log.serializer_ms), (None, None, None))
+        summaries = get_metrics_registry().snapshot()[('api-v1:task-list', 'GET')]['summaries']
+        self.assertEqual(summaries['request_duration_seconds'][0], 1)
+        self.assertEqual(summaries['db_queries'][0], 0)
+
+    @override_settings(METRICS={'TOKEN': 'scrape-me'})
+    def test_metrics_endpoint_needs_admin_or_token(self):
+        url = reverse('api-v1:metrics')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.logout()
+        resp = self.client.get(url, HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'devfocus_http_requests_total{route="api-v1:metrics"', resp.content)
+        self.assertEqual(
+            self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, status.HTTP_403_FORBIDDEN,
+        )
@@ -0,0 +1,109 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import Task, DevSession
+from core.search import SQLiteFTSBackend, ContainsSearchBackend, search_queryset
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 index is only created on SQLite')
+class SQLiteFTSBackendTests(TestCase):
+    def setUp(self):
+        self.login = Task.objects.create(title='Fix login redirect', description='OAuth callback loops')
+        self.docs = Task.objects.create(title='Write docs', description='Explain the login flow for admins')
+        self.other = Task.objects.create(title='Refactor exporter', description='')
+
+    def _search(self, query):
+        return list(SQLiteFTSBackend().search(Task.objects.all(), query))
+
+    def test_matches_title_and_description_ranked_by_relevance(self):
+        results = self._search('login')
+        self.assertEqual([t.pk for t in results], [self.login.pk, self.docs.pk])
+        self.assertLessEqual(results[0].search_rank, results[1].search_rank)
+
+    def test_prefix_matching_and_all_terms_required(self):
+        self.assertEqual([t.pk for t in self._search('refac')], [self.other.pk])
+        self.assertEqual([t.pk for t in self._search('login oauth')], [self.login.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.other.title = 'Refactor login exporter'
+        self.other.save()
+        self.assertIn(self.other.pk, [t.pk for t in self._search('login')])
+
+        self.login.delete()
+        self.assertNotIn(self.login.pk, [t.pk for t in self._search('login')])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self._search('"login" OR NEAR('), [])
+        self.assertEqual(self._search('***'), [])
+
+    def test_match_uses_fts_index(self):
+        plan = SQLiteFTSBackend().search(Task.objects.all(), 'login').explain()
+        self.assertIn('VIRTUAL TABLE INDEX', plan)
+
+    def test_many_hits_run_the_match_once(self):
+        Task.objects.bulk_create([
+            Task(title=f'Login bug {n}', description='login ' * (n % 7)) for n in range(300)
+        ])
+        qs = SQLiteFTSBackend().search(Task.objects.all(), 'login')
+
+        self.assertEqual(str(qs.query).count('MATCH'), 1)
+        self.assertNotIn('CORRELATED', qs.explain())
+        with self.assertNumQueries(1):
+            page = list(qs[:51])
+        self.assertEqual(len(page), 51)
+        ranks = [task.search_rank for task in page]
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(qs.count(), 302)
+
+
+class ContainsSearchBackendTests(TestCase):
+    def test_every_term_must_appear_in_title_or_description(self):
+        hit = Task.objects.create(title='Login page', description='broken redirect')
+        Task.objects.create(title='Login page', description='styling')
+
+        results = ContainsSearchBackend().search(Task.objects.all(), 'LOGIN redirect')
+        self.assertEqual(list(results), [hit])
+
+    @override_settings(SEARCH_BACKEND='core.search.ContainsSearchBackend')
+    def test_backend_is_configurable(self):
+        Task.objects.create(title='Configurable', description='')
+        qs = search_queryset(Task.objects.all(), 'config')
+        self.assertEqual(qs.count(), 1)
+        self.assertNotIn('search_rank', qs.query.annotations)
+
+
+class SearchApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='search-user', password='pass')
+        self.other = User.objects.create_user(username='search-other', password='pass')
+        self.client.force_login(self.user)
+
+    def test_session_search_covers_description_and_stays_scoped_to_user(self):
+        mine = DevSession.objects.create(user=self.user, title='Morning', description='payments migration')
+        DevSession.objects.create(user=self.other, title='Payments', description='')
+
+        resp = self.client.get(reverse('api-v1:session-list'), {'search': 'paym'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in resp.data['results']], [mine.id])
+
+    def test_ranked_search_paginates_with_cursor(self):
+        for i in range(5):
+            Task.objects.create(title=f'Cache layer {i}', description='cache ' * i)
+
+        url = reverse('api-v1:task-list')
+        first = self.client.get(url, {'search': 'cache', 'page_size': 3})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(first.data['next'])
+
+        second = self.client.get(first.data['next'])
+        ids = [item['id'] for item in first.data['results'] + second.data['results']]
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import Task, DevSession
+
+User = get_user_model()
+
+
+class StreamingExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='export-user', password='pass')
+        self.other = User.objects.create_user(username='export-other', password='pass')
+        self.client.force_login(self.user)
+
+        Task.objects.bulk_create([
+            Task(title=f'Task {i}', type=Task.TYPE_BUG, external_id=None) for i in range(1200)
+        ])
+        DevSession.objects.create(user=self.user, title='Mine, "quoted"')
+        DevSession.objects.create(user=self.other, title='Not mine')
+
+    def _body(self, resp):
+        self.assertTrue(resp.streaming)
+        return b''.join(resp.streaming_content).decode('utf-8')
+
+    def test_tasks_csv_streams_every_row_in_chunks(self):
+        resp = self.client.get(reverse('api-v1:task-export'), {'format': 'csv'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        chunks = list(resp.streaming_content)
+        self.assertGreater(len(chunks), 1)
+
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        self.assertEqual(rows[0], ['id', 'title', 'type', 'priority', 'external_id', 'created_at', 'updated_at'])
+        self.assertEqual(len(rows), 1201)
+        self.assertEqual(rows[1][4], '')
+
+    def test_tasks_export_does_not_instantiate_models(self):
+        with self.assertNumQueries(4):
+            # session, user, request log, then one values_list query that
+            # only runs once the response body is consumed
+            resp = self.client.get(reverse('api-v1:task-export'), {'format': 'csv'})
+            self._body(resp)
+
+    def test_sessions_ndjson_is_scoped_to_user(self):
+        resp = self.client.get(reverse('api-v1:session-export'), {'format': 'ndjson'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp['Content-Type'], 'application/x-ndjson')
+
+        records = [json.loads(line) for line in self._body(resp).splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['title'], 'Mine, "quoted"')
+        self.assertIn('switch_count', records[0])
+
+    def test_unauthenticated_export_is_rejected(self):
+        self.client.logout()
+        resp = self.client.get(reverse('api-v1:task-export'), {'format': 'csv'})
+        self.assertIn(resp.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
@@ -0,0 +1,83 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.analytics import ContextSwitchAnalytics
+from core.models import ContextSwitch, DevSession, Task
+
+User = get_user_model()
+
+MONDAY = date(2026, 3, 2)
+
+
+def _at(hour, minute=0, day=MONDAY):
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=dt_timezone.utc)
+
+
+class ContextSwitchAnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='analytics-user')
+        self.a = Task.objects.create(title='Feature A')
+        self.b = Task.objects.create(title='Bug B')
+        session = DevSession.objects.create(user=self.user, title='Monday', started_at=_at(9))
+        for minute, from_task, reason in ((10, self.a, 'INTERRUPT'), (40, self.b, 'MEETING'), (60, self.a, 'INTERRUPT')):
+            ContextSwitch.objects.create(
+                dev_session=session, from_task=from_task, reason=reason, happened_at=_at(9) + timedelta(minutes=minute),
+            )
+
+    def test_dwell_time_per_task_and_reason(self):
+        with self.assertNumQueries(3):
+            result = ContextSwitchAnalytics.for_user(self.user, MONDAY, MONDAY)
+
+        self.assertEqual(result['total_switches'], 3)
+        tasks = {t['title']: t for t in result['tasks']}
+        self.assertEqual((tasks['Feature A']['switches'], tasks['Feature A']['dwell_seconds']), (2, 1800.0))
+        self.assertEqual(tasks['Feature A']['avg_dwell_seconds'], 900.0)
+        self.assertEqual(tasks['Bug B']['dwell_seconds'], 1800.0)
+
+        reasons = {r['reason']: r for r in result['reasons']}
+        self.assertEqual((reasons['INTERRUPT']['switches'], reasons['INTERRUPT']['dwell_seconds']), (2, 1800.0))
+        self.assertEqual(reasons['QUICK_FIX']['switches'], 0)
+        self.assertIsNone(reasons['QUICK_FIX']['avg_dwell_seconds'])
+
+    def test_first_segment_is_clipped_to_range_start(self):
+        tuesday = MONDAY + timedelta(days=1)
+        overnight = DevSession.objects.create(user=self.user, title='Overnight', started_at=_at(22))
+        ContextSwitch.objects.create(dev_session=overnight, from_task=self.b, happened_at=_at(0, 30, day=tuesday))
+
+        result = ContextSwitchAnalytics.for_user(self.user, tuesday, tuesday)
+        self.assertEqual(result['tasks'][0]['dwell_seconds'], 1800.0)
+
+    def test_heatmap_follows_current_time_zone(self):
+        result = ContextSwitchAnalytics.for_user(self.user, MONDAY, MONDAY)
+        self.assertEqual((result['heatmap'][0][9], result['heatmap'][0][10]), (2, 1))
+
+        with timezone.override('Asia/Kolkata'):
+            grid = ContextSwitchAnalytics.heatmap(self.user, _at(0), _at(23))
+        self.assertEqual((grid[0][14], grid[0][15]), (1, 2))
+
+    def test_other_users_are_excluded(self):
+        other = User.objects.create_user(username='analytics-other')
+        self.assertEqual(ContextSwitchAnalytics.for_user(other, MONDAY, MONDAY)['total_switches'], 0)
+
+
+class ContextSwitchAnalyticsApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='analytics-api-user')
+        self.client.force_login(self.user)
+        self.url = reverse('api-v1:context-switch-analytics')
+
+    def test_defaults_to_last_thirty_days(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['end'] - resp.data['start'], timedelta(days=29))
+        self.assertEqual(len(resp.data['heatmap']), 7)
+
+    def test_invalid_range_is_rejected(self):
+        resp = self.client.get(self.url, {'start': '2026-03-05', 'end': '2026-03-01'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.sync import DELETED, SyncService, SyncTokenExpired, encode_token
+from core.models import ContextSwitch, DevSession, ResourceLink, Task, Tombstone
+
+User = get_user_model()
+
+
+@override_settings(SYNC={'SETTLE_SECONDS': 0})
+class SyncServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sync-user')
+        self.task = Task.objects.create(title='Synced task')
+        self.session = DevSession.objects.create(user=self.user, title='Synced session')
+        self.switch = ContextSwitch.objects.create(dev_session=self.session, from_task=self.task)
+        self.link = ResourceLink.objects.create(dev_session=self.session, title='Doc', url='https://example.com')
+        DevSession.objects.create(user=User.objects.create_user(username='sync-other'), title='Not mine')
+
+    def _sync_all(self, since=None, limit=None):
+        pages = []
+        while True:
+            page = SyncService.changes(self.user, since=since, limit=limit)
+            pages.append(page)
+            since = page['next']
+            if not page['has_more']:
+                return pages, since
+
+    def test_full_sync_pages_through_every_stream(self):
+        pages, _ = self._sync_all(limit=2)
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([page['has_more'] for page in pages], [True, True, False])
+        seen = {
+            name: [row['id'] for page in pages for row in page['changes'][name]]
+            for name in pages[0]['changes']
+        }
+        self.assertEqual(seen, {
+            'tasks': [self.task.pk],
+            'sessions': [self.session.pk],
+            'context_switches': [self.switch.pk],
+            'resources': [self.link.pk],
+        })
+
+    def test_delta_contains_only_changes_and_deletes(self):
+        _, token = self._sync_all()
+
+        new_task = Task.objects.create(title='New')
+        self.session.title = 'Renamed'
+        self.session.save()
+        link_id = self.link.pk
+        self.link.delete()
+
+        page = SyncService.changes(self.user, since=token)
+        self.assertEqual([row['id'] for row in page['changes']['tasks']], [new_task.pk])
+        self.assertEqual([row['title'] for row in page['changes']['sessions']], ['Renamed'])
+        self.assertEqual(page['changes']['context_switches'], [])
+        self.assertEqual(page['deleted']['resources'], [link_id])
+
+        caught_up = SyncService.changes(self.user, since=page['next'])
+        self.assertFalse(any(caught_up['changes'].values()) or any(caught_up['deleted'].values()))
+
+    def test_cascaded_deletes_leave_only_the_parent_tombstone(self):
+        _, token = self._sync_all()
+        session_id = self.session.pk
+        self.session.delete()
+
+        self.assertEqual(list(Tombstone.objects.values_list('kind', 'object_id')), [('sessions', session_id)])
+        self.assertEqual(SyncService.changes(self.user, since=token)['deleted']['sessions'], [session_id])
+
+    def test_switches_are_resent_when_their_task_is_deleted(self):
+        _, token = self._sync_all()
+
+        task_id = self.task.pk
+        self.task.delete()
+
+        page = SyncService.changes(self.user, since=token)
+        self.assertEqual(page['deleted']['tasks'], [task_id])
+        self.assertEqual(
+            [(row['id'], row['from_task']) for row in page['changes']['context_switches']], [(self.switch.pk, None)],
+        )
+
+    def test_other_users_deletes_are_not_sent(self):
+        _, token = self._sync_all()
+        DevSession.objects.get(title='Not mine').delete()
+        self.assertEqual(SyncService.changes(self.user, since=token)['deleted']['sessions'], [])
+
+    def test_old_tokens_expire_with_their_tombstones(self):
+        old = timezone.now() - timedelta(days=31)
+        Tombstone.objects.create(kind=Tombstone.KIND_TASK, object_id=1)
+        Tombstone.objects.update(updated_at=old)
+
+        with self.assertRaises(SyncTokenExpired):
+            SyncService.changes(self.user, since=encode_token({DELETED: (old, 0)}))
+        self.assertEqual(SyncService.purge_tombstones(), 1)
+
+
+@override_settings(SYNC={'SETTLE_SECONDS': 0})
+class SyncApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sync-api-user')
+        self.client.force_login(self.user)
+        self.url = reverse('api-v1:sync')
+
+    def test_sync_endpoint(self):
+        resp = self.client.get(self.url, {'limit': 10})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertFalse(resp.data['has_more'])
+
+        resp = self.client.get(self.url, {'since': resp.data['next']})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_bad_tokens_and_limits_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'garbage'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'limit': '0'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        expired = encode_token({DELETED: (timezone.now() - timedelta(days=60), 0)})
+        self.assertEqual(self.client.get(self.url, {'since': expired}).status_code, status.HTTP_410_GONE)
@@ -1,8 +1,12 @@
 
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
+from core.checks import check_team_permission_cache
 from core.helper import TeamPermissionService
 from core.models import Team, TeamMembership, GeneratedReport, Insight
 from core.services import InsightService
@@ -33,6 +37,86 @@ class TeamAndPermissionTests(TestCase):
         self.assertFalse(TeamPermissionService.user_in_team(self.other, self.team))
 
 
+class TeamPermissionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='perm-owner')
+        self.admin = User.objects.create_user(username='perm-admin')
+        self.teams = [Team.objects.create(name=f'T{i}', slug=f'perm-t{i}', owner=self.owner) for i in range(3)]
+        for team, role in zip(self.teams, [TeamMembership.ROLE_ADMIN, TeamMembership.ROLE_VIEWER]):
+            TeamMembership.objects.create(team=team, user=self.admin, role=role)
+
+    def _fresh(self, user):
+        return User.objects.get(pk=user.pk)
+
+    def test_roles_load_once_per_user_object(self):
+        user = self._fresh(self.admin)
+        with self.assertNumQueries(1):
+            for team in self.teams:
+                TeamPermissionService.user_in_team(user, team)
+            TeamPermissionService.team_ids(user)
+
+        self.assertEqual(TeamPermissionService.role_in_team(user, self.teams[0]), TeamMembership.ROLE_ADMIN)
+        self.assertIsNone(TeamPermissionService.role_in_team(user, self.teams[2]))
+
+    def test_revoked_membership_is_denied_on_the_next_request(self):
+        self.assertTrue(TeamPermissionService.user_in_team(self._fresh(self.admin), self.teams[0]))
+
+        # No version bump reaches this process, as when another one handled the change.
+        with mock.patch.object(TeamPermissionService, 'invalidate'):
+            TeamMembership.objects.filter(team=self.teams[0], user=self.admin).delete()
+
+        self.assertFalse(TeamPermissionService.user_in_team(self._fresh(self.admin), self.teams[0]))
+
+    @override_settings(TEAM_PERMISSION_CACHE={'SHARED': True, 'TIMEOUT': 300})
+    def test_shared_map_requires_a_shared_cache(self):
+        self.assertEqual([e.id for e in check_team_permission_cache(None)], ['core.E001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                                  'LOCATION': '/tmp/devfocus-check'}}):
+            self.assertEqual(check_team_permission_cache(None), [])
+
+    @override_settings(TEAM_PERMISSION_CACHE={'SHARED': True, 'TIMEOUT': 300})
+    def test_shared_cache_serves_later_requests_until_membership_changes(self):
+        TeamPermissionService.roles(self._fresh(self.admin))
+        later = self._fresh(self.admin)
+        with self.assertNumQueries(0):
+            TeamPermissionService.roles(later)
+
+        TeamMembership.objects.create(team=self.teams[2], user=self.admin, role=TeamMembership.ROLE_MEMBER)
+        self.assertIn(self.teams[2].pk, TeamPermissionService.team_ids(self._fresh(self.admin)))
+
+        TeamMembership.objects.filter(team=self.teams[0], user=self.admin).delete()
+        self.assertNotIn(self.teams[0].pk, TeamPermissionService.team_ids(self._fresh(self.admin)))
+
+    def test_ownership_transfer_updates_both_users(self):
+        TeamPermissionService.roles(self._fresh(self.owner))
+        TeamPermissionService.roles(self._fresh(self.admin))
+        team = self.teams[2]
+        team.owner = self.admin
+        team.save()
+
+        self.assertFalse(TeamPermissionService.has_role(self._fresh(self.owner), team))
+        self.assertEqual(TeamPermissionService.role_in_team(self._fresh(self.admin), team), TeamMembership.ROLE_OWNER)
+
+    def test_min_role_filters_teams_and_querysets(self):
+        user = self._fresh(self.admin)
+        self.assertEqual(TeamPermissionService.team_ids(user, TeamMembership.ROLE_ADMIN), {self.teams[0].pk})
+        self.assertEqual(TeamPermissionService.team_ids(user), {self.teams[0].pk, self.teams[1].pk})
+        self.assertTrue(TeamPermissionService.has_role(user, self.teams[1], TeamMembership.ROLE_VIEWER))
+        self.assertFalse(TeamPermissionService.has_role(user, self.teams[1], TeamMembership.ROLE_MEMBER))
+
+        visible = TeamPermissionService.filter_queryset(user, Team.objects.all(), team_field='pk')
+        self.assertEqual(set(visible.values_list('pk', flat=True)), {self.teams[0].pk, self.teams[1].pk})
+
+    @override_settings(TEAM_PERMISSION_CACHE={'SHARED': False})
+    def test_without_shared_cache_each_user_object_loads_once(self):
+        TeamPermissionService.roles(self._fresh(self.admin))
+        user = self._fresh(self.admin)
+        with self.assertNumQueries(1):
+            TeamPermissionService.roles(user)
+            TeamPermissionService.roles(user)
+
+
 class InsightServiceTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='insight-user', password='pass')
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import ContextSwitch, DevSession, Team, TeamMembership
+from core.services import TeamStatsService
+
+User = get_user_model()
+
+
+class TeamStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='stats-owner')
+        self.member = User.objects.create_user(username='stats-member')
+        self.viewer = User.objects.create_user(username='stats-viewer')
+        self.team = Team.objects.create(name='Stats', slug='stats', owner=self.owner)
+        TeamMembership.objects.create(team=self.team, user=self.member, role=TeamMembership.ROLE_MEMBER)
+        TeamMembership.objects.create(team=self.team, user=self.viewer, role=TeamMembership.ROLE_VIEWER)
+
+        self.today = timezone.now().date()
+        recent = timezone.now() - timedelta(hours=1)
+        DevSession.objects.create(user=self.owner, title='Owner', started_at=recent, total_focus_minutes=30)
+        self.session = DevSession.objects.create(
+            user=self.member, title='Member', started_at=recent, total_focus_minutes=90, switch_count=4,
+        )
+        DevSession.objects.create(
+            user=self.member, title='Old', started_at=recent - timedelta(days=30), total_focus_minutes=500,
+        )
+
+    def _stats(self):
+        return TeamStatsService.stats(self.team, self.today - timedelta(days=6), self.today)
+
+    def test_members_and_totals_come_from_one_grouped_query(self):
+        with self.assertNumQueries(1):
+            result = TeamStatsService.compute(
+                self.team, [self.owner.pk, self.member.pk, self.viewer.pk], self.today - timedelta(days=6), self.today,
+            )
+
+        members = {m['username']: m for m in result['members']}
+        self.assertEqual(members['stats-owner']['role'], TeamMembership.ROLE_OWNER)
+        self.assertEqual(
+            (members['stats-member']['sessions'], members['stats-member']['focus_minutes'], members['stats-member']['switches']),
+            (1, 90, 4),
+        )
+        self.assertEqual((members['stats-viewer']['sessions'], members['stats-viewer']['focus_minutes']), (0, 0))
+        self.assertEqual(result['totals'], {'sessions': 2, 'focus_minutes': 120, 'switches': 4, 'members': 3})
+
+    def test_repeat_reads_are_served_from_cache(self):
+        first = self._stats()
+        with self.assertNumQueries(0):
+            self.assertEqual(self._stats(), first)
+
+    def test_new_session_data_invalidates(self):
+        self._stats()
+        ContextSwitch.objects.create(dev_session=self.session)
+        self.assertEqual(self._stats()['totals']['switches'], 5)
+
+        DevSession.objects.create(user=self.viewer, title='New', total_focus_minutes=15)
+        self.assertEqual(self._stats()['totals']['focus_minutes'], 135)
+
+    def test_roster_change_invalidates(self):
+        self._stats()
+        newcomer = User.objects.create_user(username='stats-newcomer')
+        TeamMembership.objects.create(team=self.team, user=newcomer)
+        self.assertEqual(self._stats()['totals']['members'], 4)
+
+        TeamMembership.objects.filter(user=newcomer).delete()
+        self.assertEqual(self._stats()['totals']['members'], 3)
+
+
+class TeamStatsApiTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='stats-api-owner')
+        self.team = Team.objects.create(name='Stats API', slug='stats-api', owner=self.owner)
+
+    def test_members_get_stats_and_outsiders_do_not(self):
+        url = reverse('api-v1:team-stats', args=[self.team.pk])
+        self.client.force_login(self.owner)
+        resp = self.client.get(url, {'start': '2026-03-01', 'end': '2026-03-07'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['totals']['members'], 1)
+
+        self.client.force_login(User.objects.create_user(username='stats-api-outsider'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,45 @@
+from django.conf import settings
+
+# Models that live in API_REQUEST_LOG_DATABASE.
+LOG_MODELS = {'apirequestlog', 'apirequestloghourly'}
+
+
+def log_database() -> str:
+    return getattr(settings, 'API_REQUEST_LOG_DATABASE', 'default')
+
+
+def is_log_model(app_label: str, model_name) -> bool:
+    return app_label == 'api' and (model_name or '').lower() in LOG_MODELS
+
+
+class ApiRequestLogRouter:
+    """
+    Sends the request log and its hourly rollups to ``API_REQUEST_LOG_DATABASE``.
+
+    With the default alias this changes nothing. With a separate alias, log
+    writes and retention deletes stop competing with product data for
+    locks, and the log tables are only migrated there
+    (``migrate --database <alias>``).
+    """
+
+    def db_for_read(self, model, **hints):
+        if is_log_model(model._meta.app_label, model._meta.model_name):
+            return log_database()
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # ApiRequestLog.user points across databases; its FK has no constraint.
+        if any(is_log_model(obj._meta.app_label, obj._meta.model_name) for obj in (obj1, obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if log_database() == 'default':
+            return None
+        if is_log_model(app_label, model_name):
+            return db == log_database()
+        if db == log_database():
+            return False
+        return None
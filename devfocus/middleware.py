@@ -1,15 +1,50 @@
-from api.models import ApiRequestLog
+from api.log_buffer import get_request_log_buffer
 
+from contextlib import contextmanager
+from functools import partial
 from typing import Optional
 import time
 
+from asgiref.sync import sync_to_async
 from django.utils.deprecation import MiddlewareMixin
 from django.http import HttpRequest, HttpResponse
+from django.utils.functional import SimpleLazyObject
 
+from core.metrics import RequestMetrics, get_metrics_registry, metrics_settings, should_sample
 from core.models import DevSession
+from core.services import ActiveSessionService
 
 
 class ApiRequestLoggingMiddleware(MiddlewareMixin):
+    """
+    Logs every API call and feeds the per-route metrics registry.
+
+    A sampled request (``METRICS['SAMPLE_RATE']``) also counts its database
+    queries and time, and its serializer time, under WSGI and ASGI alike
+    (see ``RequestMetrics``). The others only pay for the wall clock and
+    the response size.
+    """
+
+    def __call__(self, request: HttpRequest):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self.measure(request):
+            return super().__call__(request)
+
+    async def __acall__(self, request: HttpRequest):
+        with self.measure(request):
+            return await super().__acall__(request)
+
+    @staticmethod
+    @contextmanager
+    def measure(request: HttpRequest):
+        request._metrics = None
+        if not request.path.startswith('/api/') or not should_sample():
+            yield
+            return
+        request._metrics = RequestMetrics()
+        with request._metrics.capture():
+            yield
 
     def process_request(self, request: HttpRequest):
         request._start_time = time.perf_counter()
@@ -22,41 +57,56 @@ class ApiRequestLoggingMiddleware(MiddlewareMixin):
 
         if request.path.startswith('/api/'):
             user = getattr(request, 'user', None)
-            ApiRequestLog.objects.create(
-                user=user if getattr(user, 'is_authenticated', False) else None,
+            metrics: Optional[RequestMetrics] = getattr(request, '_metrics', None)
+            response_bytes = None if response.streaming else len(response.content)
+            match = getattr(request, 'resolver_match', None)
+            if metrics_settings()['ENABLED']:
+                get_metrics_registry().observe(
+                    match.view_name if match else 'unmatched', request.method, response.status_code,
+                    (duration_ms or 0.0) / 1000.0, response_bytes, metrics,
+                )
+            get_request_log_buffer().add(dict(
+                user_id=user.pk if getattr(user, 'is_authenticated', False) else None,
                 path=request.path,
+                route=match.view_name[:128] if match else '',
                 method=request.method,
                 status_code=response.status_code,
                 duration_ms=duration_ms or 0.0,
+                db_queries=metrics.db_queries if metrics else None,
+                db_ms=metrics.db_seconds * 1000.0 if metrics else None,
+                serializer_ms=metrics.serializer_seconds * 1000.0 if metrics else None,
+                response_bytes=response_bytes,
                 user_agent=request.META.get('HTTP_USER_AGENT', '')[:512],
                 remote_addr=request.META.get('REMOTE_ADDR'),
-            )
+            ))
 
         return response
 
 
 class DevSessionMiddleware(MiddlewareMixin):
+    """
+    Attaches the active session named by ``X-Dev-Session-Id`` (or
+    ``?dev_session_id=``) as ``request.dev_session``.
 
-    def process_request(self, request):
-
-        request.dev_session: Optional[DevSession] = None
+    Without an id the attribute is ``None``. With one it is a lazy object,
+    like ``request.user``: nothing is queried unless a view reads it, and
+    then the lookup goes through ``ActiveSessionService``'s cache. An unknown
+    or closed id evaluates falsy rather than ``None``, so read the session
+    with ``get_dev_session``, or ``aget_dev_session`` in async views.
+    """
 
+    def process_request(self, request):
         session_id = (
             request.headers.get('X-Dev-Session-Id')
             or request.GET.get('dev_session_id')
         )
+        request.dev_session = SimpleLazyObject(partial(ActiveSessionService.get, session_id)) if session_id else None
 
-        if not session_id:
-            return
-
-        try:
-            session = DevSession.objects.select_related('user').get(
-                pk=session_id,
-                status__in=[DevSession.STATUS_OPEN, DevSession.STATUS_PAUSED],
-            )
-        except (DevSession.DoesNotExist, ValueError):
-            return
 
-        request.dev_session = session
+def get_dev_session(request) -> Optional[DevSession]:
+    session = getattr(request, 'dev_session', None)
+    return session if session else None
 
 
+async def aget_dev_session(request) -> Optional[DevSession]:
+    return await sync_to_async(get_dev_session)(request)
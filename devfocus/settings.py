@@ -1,11 +1,38 @@
+import sys
 from pathlib import Path
 
+from celery.schedules import crontab
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'change-me-in-production'
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/1'
+CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULE = {
+    'nightly-daily-reports': {
+        'task': 'core.tasks.schedule_nightly_reports',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'reap-report-requests': {
+        'task': 'core.tasks.reap_report_requests',
+        'schedule': crontab(minute='*/5'),
+    },
+    'purge-sync-tombstones': {
+        'task': 'core.tasks.purge_sync_tombstones',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'rollup-api-request-logs': {
+        'task': 'core.tasks.rollup_api_request_logs',
+        'schedule': crontab(minute=15),
+    },
+}
 DEBUG = True
+TESTING = sys.argv[1:2] == ['test']
+if TESTING:
+    # In-memory transports so eager chords run without Redis.
+    CELERY_BROKER_URL = 'memory://'
+    CELERY_RESULT_BACKEND = 'cache+memory://'
 
 ALLOWED_HOSTS = []
 
@@ -61,6 +88,17 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+if TESTING:
+    # Spare alias for tests that move the request log to its own database.
+    DATABASES['logs'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'logs.sqlite3',
+    }
+
+# ApiRequestLog and its hourly rollups go to API_REQUEST_LOG_DATABASE; point it
+# at another DATABASES alias to keep log traffic off the product tables.
+DATABASE_ROUTERS = ['devfocus.db_routers.ApiRequestLogRouter']
+API_REQUEST_LOG_DATABASE = 'default'
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -82,3 +120,128 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
+
+# ApiRequestLog rows are buffered in-process and written with bulk_create by a
+# background thread. OVERFLOW_POLICY is one of 'drop_oldest', 'drop_newest' or
+# 'block' (wait up to BLOCK_TIMEOUT seconds for the flusher to make room).
+# Without BACKGROUND every record is written synchronously.
+API_REQUEST_LOG_BUFFER = {
+    'MAX_SIZE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,
+    'OVERFLOW_POLICY': 'drop_oldest',
+    'BLOCK_TIMEOUT': 0.05,
+    'BACKGROUND': not TESTING,
+}
+
+# Async views answer inline within LATENCY_BUDGET seconds and hand slower
+# work to Celery with a 202.
+ASYNC_OFFLOAD = {
+    'LATENCY_BUDGET': 2.0,
+}
+
+# Pooled client used for outbound integration calls (core.http).
+OUTBOUND_HTTP = {
+    'TIMEOUT': 10.0,
+    'CONNECT_TIMEOUT': 3.0,
+    'MAX_CONNECTIONS': 100,
+    'MAX_KEEPALIVE_CONNECTIONS': 20,
+    'KEEPALIVE_EXPIRY': 30.0,
+    'HTTP2': True,  # used only when the optional h2 package is installed
+}
+
+# Per-upstream retry and circuit breaker settings (core.http.get_integration).
+INTEGRATIONS = {
+    'github': {
+        'RETRIES': 2,
+        'BACKOFF': 0.2,
+        'FAILURE_THRESHOLD': 5,
+        'RECOVERY_TIMEOUT': 30.0,
+    },
+    'enrichment': {
+        'RETRIES': 0,
+        'FAILURE_THRESHOLD': 3,
+        'RECOVERY_TIMEOUT': 60.0,
+    },
+}
+
+# Cache behind DevSessionMiddleware's X-Dev-Session-Id lookup.
+DEV_SESSION_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 30,
+}
+
+# Server-Sent Events (api/events/stream). The in-process broker only reaches
+# streams in the same process; point BROKER at a shared implementation when
+# running several ASGI workers. REPLAY_SIZE events are kept per user for
+# Last-Event-ID resumes, for the REPLAY_USERS most recently active users.
+EVENT_STREAM = {
+    'BROKER': 'core.events.InProcessBroker',
+    'REPLAY_SIZE': 500,
+    'REPLAY_USERS': 10000,
+    'QUEUE_SIZE': 100,
+    'HEARTBEAT_INTERVAL': 15,
+    'RETRY_MS': 3000,
+}
+# Nightly daily-report run (core.tasks.schedule_nightly_reports): active users
+# are split into chunks of CHUNK_SIZE, one Celery task per chunk.
+NIGHTLY_REPORTS = {
+    'CHUNK_SIZE': 500,
+}
+# ReportRequest processing (api.report_queue). Transient failures are retried
+# after RETRY_BACKOFF * 2**(attempt - 1) seconds, capped at MAX_BACKOFF. The
+# reaper re-queues requests left running or pending for STUCK_AFTER seconds
+# and fails them once MAX_ATTEMPTS is reached.
+REPORT_REQUESTS = {
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 30,
+    'MAX_BACKOFF': 600,
+    'STUCK_AFTER': 900,
+}
+# Team dashboards (/teams/{id}/stats/). Entries are keyed by version tokens
+# that change with the roster and each member's session data. The tokens live
+# in the default cache, which is per process unless CACHES points at a shared
+# backend (e.g. Redis); until then a change is only seen by the process that
+# made it, and TIMEOUT is how long the others may serve stale numbers.
+TEAM_STATS_CACHE = {
+    'TIMEOUT': 300,
+}
+# TeamPermissionService loads a user's {team: role} map once per request.
+# With SHARED it is also kept in the default cache, keyed by a version token
+# that membership and ownership changes bump. Only turn it on with a CACHES
+# backend every process shares (e.g. Redis): with the per-process LocMemCache
+# a revoked member would keep access in the other processes until TIMEOUT.
+TEAM_PERMISSION_CACHE = {
+    'SHARED': False,
+    'TIMEOUT': 300,
+}
+# Delta sync (/sync/, api.sync). Pages hold PAGE_SIZE rows unless ?limit= asks
+# for fewer or more, up to MAX_PAGE_SIZE. Rows are served once they are
+# SETTLE_SECONDS old, so a late-committing transaction is not skipped.
+# Tombstones are kept TOMBSTONE_DAYS; older tokens get 410 and a full sync.
+SYNC = {
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 1000,
+    'SETTLE_SECONDS': 2,
+    'TOMBSTONE_DAYS': 30,
+}
+# Per-route request metrics (core.metrics), served to Prometheus at
+# /api/internal/metrics/ to admins or with "Authorization: Bearer <TOKEN>".
+# Every API request records its latency and response size. SAMPLE_RATE of
+# them also count DB queries, DB time and serializer time. Quantiles are
+# taken over the last WINDOW requests per route.
+METRICS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'WINDOW': 1024,
+    'TOKEN': None,
+}
+# ApiRequestLog retention (api.log_retention), run hourly by Celery beat and by
+# `manage.py rollup_request_logs`. Raw rows older than RAW_DAYS are rolled into
+# per-hour, per-route ApiRequestLogHourly rows and deleted DELETE_BATCH_SIZE at
+# a time; hourly rows are kept HOURLY_DAYS.
+API_REQUEST_LOG_RETENTION = {
+    'RAW_DAYS': 14,
+    'HOURLY_DAYS': 365,
+    'DELETE_BATCH_SIZE': 5000,
+}